@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Micro-benchmark of JSON codecs on recorded devtools protocol traffic.
+
+Usage::
+
+    python benchmarks/codec.py [TRAFFIC_FILE] [-n NUMBER]
+
+``TRAFFIC_FILE`` contains one protocol message per line. Lines of pyppeteer
+debug logs (``logLevel=logging.DEBUG``) are also accepted, so real traffic can
+be recorded by saving the log output; only ``SEND:``/``RECV:`` lines are
+replayed. Defaults to ``cdp_traffic.jsonl`` in this directory.
+"""
+
+import argparse
+from pathlib import Path
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pyppeteer.codec import get_codec  # noqa: E402
+
+DEFAULT_TRAFFIC = Path(__file__).resolve().parent / 'cdp_traffic.jsonl'
+
+
+def load_traffic(path: Path) -> List[str]:
+    """Load raw messages from traffic file or debug log."""
+    messages = []
+    with path.open(encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            for marker in ('SEND: ', 'RECV: '):
+                if marker in line:
+                    line = line.split(marker, 1)[1]
+                    break
+            if line.startswith('{'):
+                messages.append(line)
+    return messages
+
+
+def bench(name: str, messages: List[str], number: int) -> None:
+    """Decode and re-encode all messages ``number`` times with the codec."""
+    try:
+        codec = get_codec(name)
+    except ImportError:
+        print(f'{name:>8}: not installed')
+        return
+    loads = codec.loads
+    dumps = codec.dumps
+    decode_time = encode_time = 0.0
+    for _ in range(number):
+        start = time.perf_counter()
+        objs = [loads(msg) for msg in messages]
+        decode_time += time.perf_counter() - start
+        start = time.perf_counter()
+        for obj in objs:
+            dumps(obj)
+        encode_time += time.perf_counter() - start
+    count = len(messages) * number
+    print(f'{name:>8}: decode {decode_time / count * 1e6:8.2f} us/msg, '
+          f'encode {encode_time / count * 1e6:8.2f} us/msg')
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('traffic', nargs='?', default=str(DEFAULT_TRAFFIC))
+    parser.add_argument('-n', '--number', type=int, default=200)
+    args = parser.parse_args()
+    messages = load_traffic(Path(args.traffic))
+    size = sum(len(msg) for msg in messages)
+    print(f'{len(messages)} messages, {size} bytes, {args.number} rounds')
+    for name in ('json', 'orjson', 'msgspec'):
+        bench(name, messages, args.number)
+
+
+if __name__ == '__main__':
+    main()
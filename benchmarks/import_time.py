@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Benchmark of ``import pyppeteer`` time with a budget.
+
+Usage::
+
+    python benchmarks/import_time.py [-s STATEMENT] [-n NUMBER] [-b BUDGET]
+
+Run ``STATEMENT`` (defaults to ``import pyppeteer``) in a fresh interpreter
+with ``python -X importtime`` ``NUMBER`` times, and print the median of total
+import time and the slowest modules. Exit with status 1 if the median exceeds
+``BUDGET`` milliseconds, so this can be used as a check in CI.
+"""
+
+import argparse
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BUDGET = 60  # milliseconds
+
+
+def measure(statement: str) -> Tuple[int, Dict[str, int]]:
+    """Run ``statement`` and return total and per-module cumulative time.
+
+    Times are in microseconds. Total is the sum of cumulative time of
+    top-level imports.
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=str(ROOT),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    total = 0
+    modules: Dict[str, int] = dict()
+    # Only imports caused by the statement, not by interpreter startup.
+    lines = proc.stderr.decode().splitlines()
+    for line in lines[_startup_lines():]:
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules[name.strip()] = int(cumulative)
+        if not name.startswith('  '):
+            total += int(cumulative)
+    return total, modules
+
+
+_startup: List[int] = list()
+
+
+def _startup_lines() -> int:
+    """Get number of importtime lines printed for interpreter startup."""
+    if not _startup:
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'pass'],
+            cwd=str(ROOT),
+            stderr=subprocess.PIPE,
+            check=True,
+        )
+        _startup.append(len(proc.stderr.decode().splitlines()))
+    return _startup[0]
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-s', '--statement', default='import pyppeteer')
+    parser.add_argument('-n', '--number', type=int, default=10)
+    parser.add_argument('-b', '--budget', type=float, default=DEFAULT_BUDGET,
+                        help='budget in milliseconds')
+    parser.add_argument('--top', type=int, default=10,
+                        help='number of slowest modules to show')
+    args = parser.parse_args()
+
+    results = [measure(args.statement) for _ in range(args.number)]
+    median = statistics.median(total for total, _ in results) / 1000
+    print(f'{args.statement!r}: {median:.1f} ms '
+          f'(median of {args.number} runs, budget {args.budget:.0f} ms)')
+    _, modules = results[-1]
+    for name, us in sorted(modules.items(), key=lambda m: -m[1])[:args.top]:
+        print(f'{us / 1000:8.1f} ms  {name}')
+    if median > args.budget:
+        print('over budget')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,18 +3,17 @@
 
 """Meta data for pyppeteer."""
 
+import importlib
 import logging
 import os
-
-from appdirs import AppDirs
+import sys
+from typing import Any, List
 
 __author__ = """Hiroyuki Takagi"""
 __email__ = 'miyako.dev@gmail.com'
 __version__ = '0.0.25'
 __chromium_revision__ = '588429'
 __base_puppeteer_version__ = 'v1.6.0'
-__pyppeteer_home__ = os.environ.get(
-    'PYPPETEER_HOME', AppDirs('pyppeteer').user_data_dir)  # type: str
 DEBUG = False
 
 # Setup root logger
@@ -27,8 +26,52 @@ _log_handler.setLevel(logging.DEBUG)
 _logger.addHandler(_log_handler)
 _logger.propagate = False
 
-from pyppeteer.launcher import connect, launch, executablePath  # noqa: E402
-from pyppeteer.launcher import defaultArgs  # noqa: E402
+# Public functions are imported on first access, so that ``import pyppeteer``
+# does not load the whole package (browser, page, network, ...).
+_lazy_attrs = {
+    'connect': 'pyppeteer.launcher',
+    'launch': 'pyppeteer.launcher',
+    'launch_many': 'pyppeteer.launcher',
+    'executablePath': 'pyppeteer.launcher',
+    'defaultArgs': 'pyppeteer.launcher',
+}
+
+
+def _pyppeteer_home() -> str:
+    """Get pyppeteer home directory; ``appdirs`` is used only if needed."""
+    home = os.environ.get('PYPPETEER_HOME')
+    if home is None:
+        from appdirs import AppDirs
+        home = AppDirs('pyppeteer').user_data_dir
+    return home
+
+
+def __getattr__(name: str) -> Any:
+    """Import public functions on first access (PEP 562).
+
+    ``__pyppeteer_home__`` is also computed on first access.
+    """
+    if name == '__pyppeteer_home__':
+        value = _pyppeteer_home()
+    elif name in _lazy_attrs:
+        value = getattr(importlib.import_module(_lazy_attrs[name]), name)
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """Return attributes of this module including lazily imported ones."""
+    return sorted(set(globals()) | set(_lazy_attrs) | {'__pyppeteer_home__'})
+
+
+if sys.version_info < (3, 7):
+    # Module ``__getattr__`` is not supported; import eagerly.
+    __pyppeteer_home__ = _pyppeteer_home()
+    from pyppeteer.launcher import connect, launch, executablePath  # noqa: E402,E501,F401
+    from pyppeteer.launcher import launch_many  # noqa: E402,F401
+    from pyppeteer.launcher import defaultArgs  # noqa: E402,F401
 
 version = __version__
 version_info = tuple(int(i) for i in version.split('.'))
@@ -36,6 +79,7 @@ version_info = tuple(int(i) for i in version.split('.'))
 __all__ = [
     'connect',
     'launch',
+    'launch_many',
     'executablePath',
     'defaultArgs',
     'version',
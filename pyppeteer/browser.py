@@ -14,6 +14,7 @@ from pyppeteer.connection import Connection
 from pyppeteer.errors import BrowserError
 from pyppeteer.page import Page
 from pyppeteer.target import Target
+from pyppeteer.util import merge_dict
 
 logger = logging.getLogger(__name__)
 
@@ -197,23 +198,47 @@ class Browser(EventEmitter):
         """Return websocket end point url."""
         return self._connection.url
 
-    async def newPage(self) -> Page:
-        """Make new page on this browser and return its object."""
-        return await self._defaultContext.newPage()
+    async def newPage(self, options: dict = None, **kwargs: Any) -> Page:
+        """Make new page on this browser and return its object.
+
+        Available options are:
+
+        * ``domains`` (List[str]): Optional protocol domains to use in the
+          page. By default all of them are used. Skipping unused domains
+          reduces protocol traffic (e.g. ``domains=[]`` for a service which
+          only takes screenshots).
+
+          * ``'Network'``: Request and response events and related methods
+            like :meth:`~pyppeteer.page.Page.setRequestInterception`.
+            Without this domain, :meth:`~pyppeteer.page.Page.goto` returns
+            ``None``.
+          * ``'Target'``: Workers (:meth:`~pyppeteer.page.Page.workers`).
+          * ``'Log'``: Browser log entries (e.g. network errors) in
+            ``console`` events. Messages of the ``console`` API are emitted
+            without this domain.
+          * ``'Performance'``: :meth:`~pyppeteer.page.Page.metrics` and
+            ``metrics`` events.
+
+          ``'Log'`` and ``'Performance'`` domains are enabled when the first
+          ``console`` or ``metrics`` listener is added to the page.
+        """
+        return await self._defaultContext.newPage(options, **kwargs)
 
-    async def _createPageInContext(self, contextId: Optional[str]) -> Page:
-        options = {'url': 'about:blank'}
+    async def _createPageInContext(self, contextId: Optional[str],
+                                   options: dict = None) -> Page:
+        options = options or {}
+        targetOptions = {'url': 'about:blank'}
         if contextId:
-            options['browserContextId'] = contextId
+            targetOptions['browserContextId'] = contextId
 
         targetId = (await self._connection.send(
-            'Target.createTarget', options)).get('targetId')
+            'Target.createTarget', targetOptions)).get('targetId')
         target = self._targets.get(targetId)
         if target is None:
             raise BrowserError('Failed to create target for page.')
         if not await target._initializedPromise:
             raise BrowserError('Failed to create target for page.')
-        page = await target.page()
+        page = await target._getPage(options.get('domains'))
         if page is None:
             raise BrowserError('Failed to create page.')
         return page
@@ -350,9 +375,14 @@ class BrowserContext(EventEmitter):
         """
         return bool(self._id)
 
-    async def newPage(self) -> Page:
-        """Create a new page in the browser context."""
-        return await self._browser._createPageInContext(self._id)
+    async def newPage(self, options: dict = None, **kwargs: Any) -> Page:
+        """Create a new page in the browser context.
+
+        Available options are the same as
+        :meth:`~pyppeteer.browser.Browser.newPage`.
+        """
+        return await self._browser._createPageInContext(
+            self._id, merge_dict(options, kwargs))
 
     @property
     def browser(self) -> Browser:
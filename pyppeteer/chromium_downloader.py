@@ -3,19 +3,33 @@
 
 """Chromium download module."""
 
-from io import BytesIO
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import hashlib
+import json
 import logging
 import os
 from pathlib import Path
+import re
+import shutil
 import stat
 import sys
-from zipfile import ZipFile
-
-import urllib3
-from tqdm import tqdm
+import tempfile
+import threading
+import time
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
+from typing import Tuple, TYPE_CHECKING, Union
 
 from pyppeteer import __chromium_revision__, __pyppeteer_home__
 
+if TYPE_CHECKING:
+    import urllib3  # noqa: F401
+
+# urllib3, tqdm and zipfile are imported when they are used, since importing
+# them takes a long time compared to pyppeteer itself and most programs
+# never download chromium.
+
 logger = logging.getLogger(__name__)
 
 DOWNLOADS_FOLDER = Path(__pyppeteer_home__) / 'local-chromium'
@@ -31,22 +45,39 @@ NO_PROGRESS_BAR = os.environ.get('PYPPETEER_NO_PROGRESS_BAR', '')
 if NO_PROGRESS_BAR.lower() in ('1', 'true'):
     NO_PROGRESS_BAR = True  # type: ignore
 
-downloadURLs = {
-    'linux': f'{BASE_URL}/Linux_x64/{REVISION}/chrome-linux.zip',
-    'mac': f'{BASE_URL}/Mac/{REVISION}/chrome-mac.zip',
-    'win32': f'{BASE_URL}/Win/{REVISION}/chrome-win32.zip',
-    'win64': f'{BASE_URL}/Win_x64/{REVISION}/chrome-win32.zip',
+DOWNLOAD_SEGMENTS = int(os.environ.get('PYPPETEER_DOWNLOAD_SEGMENTS', '1'))
+CHROMIUM_DIGEST = os.environ.get('PYPPETEER_CHROMIUM_DIGEST') or None
+DOWNLOAD_RETRIES = 5
+DOWNLOAD_TIMEOUT = {'connect': 30, 'read': 60}
+CHUNK_SIZE = 64 * 1024
+
+downloadPaths = {
+    'linux': 'Linux_x64/{revision}/chrome-linux.zip',
+    'mac': 'Mac/{revision}/chrome-mac.zip',
+    'win32': 'Win/{revision}/chrome-win32.zip',
+    'win64': 'Win_x64/{revision}/chrome-win32.zip',
 }
 
-chromiumExecutable = {
-    'linux': DOWNLOADS_FOLDER / REVISION / 'chrome-linux' / 'chrome',
-    'mac': (DOWNLOADS_FOLDER / REVISION / 'chrome-mac' / 'Chromium.app' /
-            'Contents' / 'MacOS' / 'Chromium'),
-    'win32': DOWNLOADS_FOLDER / REVISION / 'chrome-win32' / 'chrome.exe',
-    'win64': DOWNLOADS_FOLDER / REVISION / 'chrome-win32' / 'chrome.exe',
+# Path of the executable in the extracted archive.
+executablePaths = {
+    'linux': Path('chrome-linux') / 'chrome',
+    'mac': (Path('chrome-mac') / 'Chromium.app' / 'Contents' / 'MacOS' /
+            'Chromium'),
+    'win32': Path('chrome-win32') / 'chrome.exe',
+    'win64': Path('chrome-win32') / 'chrome.exe',
 }
 
 
+def install_path(revision: str = None, platform: str = None) -> Path:
+    """Get directory where chromium of ``revision`` is installed.
+
+    Each build is installed in its own directory keyed by ``platform`` and
+    ``revision``, so multiple revisions can be used side by side.
+    """
+    return (DOWNLOADS_FOLDER /
+            f'{platform or current_platform()}-{revision or REVISION}')
+
+
 def current_platform() -> str:
     """Get current platform name by short string."""
     if sys.platform.startswith('linux'):
@@ -62,75 +93,313 @@ def current_platform() -> str:
     raise OSError('Unsupported platform: ' + sys.platform)
 
 
-def get_url() -> str:
+def get_url(revision: str = None, platform: str = None) -> str:
     """Get chromium download url."""
-    return downloadURLs[current_platform()]
+    path = downloadPaths[platform or current_platform()]
+    return f'{BASE_URL}/' + path.format(revision=revision or REVISION)
+
+
+downloadURLs = {
+    platform: get_url(REVISION, platform) for platform in downloadPaths
+}
+
+chromiumExecutable = {
+    platform: install_path(REVISION, platform) / executablePaths[platform]
+    for platform in downloadPaths
+}
+
+
+def _range_header(segment: '_Segment') -> Dict[str, str]:
+    if segment.end is not None:
+        return {'Range': f'bytes={segment.offset}-{segment.end - 1}'}
+    if segment.offset:
+        return {'Range': f'bytes={segment.offset}-'}
+    return {}
+
+
+def _content_end(resp: Any) -> Optional[int]:
+    """Get end offset (exclusive) of the response body in the file."""
+    if resp.status == 206:
+        match = re.match(r'bytes (\d+)-(\d+)/',
+                         resp.headers.get('content-range', ''))
+        if match:
+            return int(match.group(2)) + 1
+        return None
+    try:
+        return int(resp.headers['content-length'])
+    except (KeyError, ValueError):
+        return None
+
+
+class _Segment(object):
+    """Byte range ``[offset, end)`` of the file to download.
+
+    ``start`` is where the segment started, so ``offset - start`` bytes are
+    already downloaded.
+    """
+
+    def __init__(self, offset: int, end: Optional[int] = None,
+                 start: int = 0) -> None:
+        self.offset = offset
+        self.end = end
+        self.start = start
+
+
+def _restart(url: str, f: BinaryIO, segment: _Segment,
+             progress: Callable[[int], None]) -> None:
+    """Start over when the server ignored Range header."""
+    if segment.end is not None:
+        raise IOError(f'Server does not support range request: {url}')
+    progress(-segment.offset)
+    segment.offset = 0
+    f.truncate(0)
+
+
+def _fetch(http: 'urllib3.PoolManager', url: str, f: BinaryIO,
+           segment: _Segment, progress: Callable[[int], None]) -> None:
+    resp = http.request('GET', url, headers=_range_header(segment),
+                        preload_content=False)
+    try:
+        if resp.status not in (200, 206):
+            raise IOError(f'Failed to download {url}: HTTP {resp.status}')
+        if resp.status == 200 and segment.offset:
+            _restart(url, f, segment, progress)
+        if segment.end is None:
+            segment.end = _content_end(resp)
+        f.seek(segment.offset)
+        for chunk in resp.stream(CHUNK_SIZE):
+            f.write(chunk)
+            segment.offset += len(chunk)
+            progress(len(chunk))
+    finally:
+        resp.release_conn()
+    if segment.end is not None and segment.offset < segment.end:
+        from urllib3.exceptions import ProtocolError
+        raise ProtocolError(
+            f'Connection broken at {segment.offset} bytes')
+
+
+def _fetch_segment(http: 'urllib3.PoolManager', url: str, path: Path,
+                   segment: _Segment, progress: Callable[[int], None]
+                   ) -> None:
+    """Download ``segment`` into ``path``, resuming on network errors."""
+    from urllib3.exceptions import HTTPError
+    if segment.end is not None and segment.offset >= segment.end:
+        return
+    with path.open('r+b') as f:
+        for retry in range(DOWNLOAD_RETRIES + 1):
+            try:
+                return _fetch(http, url, f, segment, progress)
+            except (HTTPError, ConnectionError) as e:
+                if retry == DOWNLOAD_RETRIES:
+                    raise
+                logger.warning(f'download interrupted ({e}), resume from '
+                               f'{segment.offset} bytes.')
+                time.sleep(min(2 ** retry, 30) / 10)
+
+
+def _probe(http: 'urllib3.PoolManager', url: str
+           ) -> Tuple[Optional[int], bool, Any]:
+    """Get size, range support and headers of ``url``."""
+    resp = http.request('HEAD', url)
+    if resp.status != 200:
+        return None, False, resp.headers
+    try:
+        size: Optional[int] = int(resp.headers['content-length'])
+    except (KeyError, ValueError):
+        size = None
+    ranges = resp.headers.get('accept-ranges', '').lower() == 'bytes'
+    return size, ranges, resp.headers
+
+
+def _state_path(part: Path) -> Path:
+    """Get path of the file which keeps progress of segments of ``part``."""
+    return part.with_name(part.name + '.json')
+
+
+def _save_plan(part: Path, size: int, plan: List[_Segment]) -> None:
+    state = {'size': size,
+             'segments': [[s.start, s.offset, s.end] for s in plan]}
+    _state_path(part).write_text(json.dumps(state))
+
+
+def _load_plan(part: Path, size: Optional[int]) -> Optional[List[_Segment]]:
+    """Load segments saved by :func:`_save_plan`.
+
+    Return ``None`` if the state is broken or does not match ``size``.
+    """
+    try:
+        state = json.loads(_state_path(part).read_text())
+        if state['size'] != size or part.stat().st_size != size:
+            return None
+        return [_Segment(offset, end, start)
+                for start, offset, end in state['segments']]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _plan(part: Path, size: Optional[int], segments: int
+          ) -> List[_Segment]:
+    """Split download into segments.
+
+    ``size`` is the file size if the server supports range requests.
+    """
+    state = _state_path(part)
+    if part.exists():
+        if not state.exists():
+            # Resume interrupted sequential download.
+            return [_Segment(part.stat().st_size, size)]
+        plan = _load_plan(part, size)
+        if plan is not None:
+            # Resume interrupted segmented download.
+            return plan
+        # Holes of the pre-allocated file can not be told from data.
+        logger.warning('segment state is not usable, restart download.')
+        part.unlink()
+    if state.exists():
+        state.unlink()
+    part.touch()
+    if segments <= 1 or not size:
+        return [_Segment(0)]
+    step = -(-size // segments)
+    plan = [_Segment(start, min(start + step, size), start)
+            for start in range(0, size, step)]
+    # Save state before the file is pre-allocated, so that a zero-filled
+    # file is never taken for a sequential download.
+    _save_plan(part, size, plan)
+    with part.open('r+b') as f:
+        f.truncate(size)
+    return plan
+
+
+def server_digest(headers: Any) -> Optional[str]:
+    """Get digest of the content from response headers if available.
+
+    Google Cloud Storage sends MD5 of objects in ``x-goog-hash`` header.
+    """
+    for value in headers.get('x-goog-hash', '').split(','):
+        name, _, b64 = value.strip().partition('=')
+        if name == 'md5' and b64:
+            return 'md5:' + base64.b64decode(b64).hex()
+    return None
 
 
-def download_zip(url: str) -> BytesIO:
-    """Download data from url."""
+def verify_digest(path: Path, digest: str) -> None:
+    """Verify file at ``path`` by ``digest``.
+
+    ``digest`` is ``'<algorithm>:<hex digest>'``, e.g. ``'sha256:...'``.
+    Raise :class:`IOError` if not matched.
+    """
+    algorithm, _, expected = digest.partition(':')
+    h = hashlib.new(algorithm)
+    with path.open('rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            h.update(chunk)
+    if h.hexdigest() != expected.lower():
+        raise IOError(f'Digest mismatch of {path}: expected {digest}, '
+                      f'got {algorithm}:{h.hexdigest()}')
+
+
+def download_zip(url: str, path: Path = None, segments: int = None,
+                 digest: Optional[str] = None) -> Path:
+    """Download data from url to file and return its path.
+
+    Data is streamed into ``<path>.part`` file. If the file is left by an
+    interrupted download, or the connection is broken while downloading, the
+    download resumes from there by HTTP Range request. Progress of parallel
+    segments is kept in ``<path>.part.json`` to resume each of them.
+
+    :arg Path path: Path of the downloaded file. Defaults to a file under
+                    the download folder.
+    :arg int segments: Number of parallel connections to download ranges of
+                       the file. Defaults to ``$PYPPETEER_DOWNLOAD_SEGMENTS``
+                       or ``1``. Used only for a new download from a server
+                       which supports range requests.
+    :arg str digest: Expected digest of the file like ``'sha256:<hex>'``.
+                     Defaults to MD5 provided by the server, if any.
+    """
+    if path is None:
+        path = DOWNLOADS_FOLDER / f'{REVISION}-{url.rsplit("/", 1)[-1]}'
+    if segments is None:
+        segments = DOWNLOAD_SEGMENTS
+    part = path.with_name(path.name + '.part')
+    part.parent.mkdir(parents=True, exist_ok=True)
     logger.warning('start chromium download.\n'
                    'Download may take a few minutes.')
 
+    import urllib3
+
     # disable warnings so that we don't need a cert.
     # see https://urllib3.readthedocs.io/en/latest/advanced-usage.html for more
     urllib3.disable_warnings()
 
-    with urllib3.PoolManager() as http:
-        # Get data from url.
-        # set preload_content=False means using stream later.
-        data = http.request('GET', url, preload_content=False)
+    timeout = urllib3.Timeout(**DOWNLOAD_TIMEOUT)
+    with urllib3.PoolManager(maxsize=segments, timeout=timeout) as http:
+        size, ranges, headers = _probe(http, url)
+        plan = _plan(part, size if ranges else None, segments)
+        _download(http, url, part, plan, size)
+    digest = digest or server_digest(headers)
+    try:
+        if digest:
+            verify_digest(part, digest)
+    except IOError:
+        # Do not resume from broken data next time.
+        part.unlink()
+        raise
+    part.replace(path)
+    logger.warning('\nchromium download done.')
+    return path
+
 
+def _download(http: 'urllib3.PoolManager', url: str, path: Path,
+              plan: List[_Segment], size: Optional[int]) -> None:
+    from tqdm import tqdm
+    process_bar = tqdm(
+        total=size or 0,
+        initial=sum(segment.offset - segment.start for segment in plan),
+        file=os.devnull if NO_PROGRESS_BAR else None,
+    )
+    lock = threading.Lock()
+
+    def progress(n: int) -> None:
+        with lock:
+            process_bar.update(n)
+
+    try:
+        if len(plan) == 1:
+            _fetch_segment(http, url, path, plan[0], progress)
+            return
         try:
-            total_length = int(data.headers['content-length'])
-        except (KeyError, ValueError, AttributeError):
-            total_length = 0
-
-        process_bar = tqdm(
-            total=total_length,
-            file=os.devnull if NO_PROGRESS_BAR else None,
-        )
-
-        # 10 * 1024
-        _data = BytesIO()
-        for chunk in data.stream(10240):
-            _data.write(chunk)
-            process_bar.update(len(chunk))
+            with ThreadPoolExecutor(len(plan)) as executor:
+                futures = [executor.submit(_fetch_segment, http, url, path,
+                                           segment, progress)
+                           for segment in plan]
+                for future in futures:
+                    future.result()
+        except BaseException:
+            # All workers are finished here; keep their progress to resume.
+            _save_plan(path, size or 0, plan)
+            raise
+        _state_path(path).unlink()
+    finally:
         process_bar.close()
 
-    logger.warning('\nchromium download done.')
-    return _data
 
+def extract_zip(data: Union[Path, BinaryIO], path: Path,
+                platform: str = None) -> None:
+    """Extract zip file to path.
 
-def extract_zip(data: BytesIO, path: Path) -> None:
-    """Extract zipped data to path."""
+    ``data`` is a path of the zip file or a file-like object. Archive members
+    are read from the file one by one, so the archive is not loaded on memory.
+    """
     # On mac zipfile module cannot extract correctly, so use unzip instead.
     if current_platform() == 'mac':
-        import subprocess
-        import shutil
-        zip_path = path / 'chrome.zip'
-        if not path.exists():
-            path.mkdir(parents=True)
-        with zip_path.open('wb') as f:
-            f.write(data.getvalue())
-        if not shutil.which('unzip'):
-            raise OSError('Failed to automatically extract chromium.'
-                          f'Please unzip {zip_path} manually.')
-        proc = subprocess.run(
-            ['unzip', str(zip_path)],
-            cwd=str(path),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-        )
-        if proc.returncode != 0:
-            logger.error(proc.stdout.decode())
-            raise OSError(f'Failed to unzip {zip_path}.')
-        if chromium_executable().exists() and zip_path.exists():
-            zip_path.unlink()
+        _unzip(data, path)
     else:
-        with ZipFile(data) as zf:
+        from zipfile import ZipFile
+        with ZipFile(data if not isinstance(data, Path) else str(data)) as zf:
             zf.extractall(str(path))
-    exec_path = chromium_executable()
+    exec_path = path / executablePaths[platform or current_platform()]
     if not exec_path.exists():
         raise IOError('Failed to extract chromium.')
     exec_path.chmod(exec_path.stat().st_mode | stat.S_IXOTH | stat.S_IXGRP |
@@ -138,9 +407,110 @@ def extract_zip(data: BytesIO, path: Path) -> None:
     logger.warning(f'chromium extracted to: {path}')
 
 
+def _unzip(data: Union[Path, BinaryIO], path: Path) -> None:
+    import subprocess
+    if not path.exists():
+        path.mkdir(parents=True)
+    if isinstance(data, Path):
+        zip_path = data
+    else:
+        zip_path = path / 'chrome.zip'
+        with zip_path.open('wb') as f:
+            shutil.copyfileobj(data, f)
+    if not shutil.which('unzip'):
+        raise OSError('Failed to automatically extract chromium.'
+                      f'Please unzip {zip_path} manually.')
+    proc = subprocess.run(
+        ['unzip', str(zip_path)],
+        cwd=str(path),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    if proc.returncode != 0:
+        logger.error(proc.stdout.decode())
+        raise OSError(f'Failed to unzip {zip_path}.')
+    if zip_path.parent == path:
+        zip_path.unlink()
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive lock of ``path`` across processes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('a+b') as f:
+        _lock(f.fileno())
+        try:
+            yield
+        finally:
+            _unlock(f.fileno())
+
+
+def _lock(fd: int) -> None:
+    if sys.platform == 'win32':
+        import msvcrt
+        while True:
+            try:
+                # Retries for 10 seconds and raises OSError if not locked.
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)  # type: ignore
+                return
+            except OSError:
+                continue
+    import fcntl
+    fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+def _unlock(fd: int) -> None:
+    if sys.platform == 'win32':
+        import msvcrt
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)  # type: ignore
+    else:
+        import fcntl
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def install_chromium(revision: str = None, platform: str = None) -> Path:
+    """Install chromium if not installed and return path of the executable.
+
+    Installed chromium is found without network access. Otherwise, the
+    archive is downloaded and extracted into a temporary directory, which is
+    renamed to :func:`install_path` after extraction completed, so partially
+    extracted files are never used. Concurrent installs of the same build by
+    multiple processes are serialized by a lock file; processes which waited
+    for the lock use chromium installed by the first one.
+    """
+    revision = revision or REVISION
+    platform = platform or current_platform()
+    exec_path = chromium_executable(revision, platform)
+    if exec_path.exists():
+        return exec_path
+    dest = install_path(revision, platform)
+    with file_lock(dest.with_name(f'.{dest.name}.lock')):
+        if exec_path.exists():
+            # Installed by another process while waiting for the lock.
+            return exec_path
+        digest = CHROMIUM_DIGEST if revision == REVISION else None
+        zip_path = download_zip(get_url(revision, platform),
+                                dest.with_name(f'{dest.name}.zip'),
+                                digest=digest)
+        tmp = Path(tempfile.mkdtemp(prefix=f'.{dest.name}-',
+                                    dir=str(DOWNLOADS_FOLDER)))
+        try:
+            extract_zip(zip_path, tmp, platform)
+            if dest.exists():
+                # Broken install (e.g. the executable was removed).
+                shutil.rmtree(str(dest))
+            tmp.rename(dest)
+        finally:
+            if tmp.exists():
+                shutil.rmtree(str(tmp), ignore_errors=True)
+        zip_path.unlink()
+    return exec_path
+
+
 def download_chromium() -> None:
     """Download and extract chromium."""
-    extract_zip(download_zip(get_url()), DOWNLOADS_FOLDER / REVISION)
+    install_chromium()
 
 
 def chromium_excutable() -> Path:
@@ -155,11 +525,20 @@ def chromium_excutable() -> Path:
     return chromium_executable()
 
 
-def chromium_executable() -> Path:
+def chromium_executable(revision: str = None, platform: str = None
+                        ) -> Path:
     """Get path of the chromium executable."""
-    return chromiumExecutable[current_platform()]
+    revision = revision or REVISION
+    platform = platform or current_platform()
+    exec_path = install_path(revision, platform) / executablePaths[platform]
+    if not exec_path.exists():
+        # Installed by older versions of pyppeteer.
+        legacy = DOWNLOADS_FOLDER / revision / executablePaths[platform]
+        if legacy.exists():
+            return legacy
+    return exec_path
 
 
-def check_chromium() -> bool:
+def check_chromium(revision: str = None) -> bool:
     """Check if chromium is placed at correct path."""
-    return chromium_executable().exists()
+    return chromium_executable(revision).exists()
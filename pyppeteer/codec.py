@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""JSON codec module for devtools protocol messages."""
+
+import json
+from typing import Any, Callable, Dict, Union
+
+__all__ = [
+    'JSONCodec',
+    'StdlibCodec',
+    'OrjsonCodec',
+    'MsgspecCodec',
+    'get_codec',
+]
+
+
+class JSONCodec(object):
+    """Base class of JSON codecs used by the protocol layer.
+
+    Subclasses implement :meth:`dumps`, which must return ``str`` (protocol
+    messages are sent as text frames), and :meth:`loads`, which accepts
+    ``str`` or ``bytes``.
+    """
+
+    #: Name of this codec.
+    name = ''
+
+    def dumps(self, obj: Any) -> str:
+        """Encode ``obj`` to JSON string."""
+        raise NotImplementedError
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Decode JSON ``data`` to python object."""
+        raise NotImplementedError
+
+
+class StdlibCodec(JSONCodec):
+    """JSON codec using the standard library :mod:`json` module."""
+
+    name = 'json'
+
+    def __init__(self) -> None:
+        self.dumps = json.dumps  # type: ignore
+        self.loads = json.loads  # type: ignore
+
+
+class OrjsonCodec(JSONCodec):
+    r"""JSON codec using `orjson <https://pypi.org/project/orjson/>`_.
+
+    Objects which orjson rejects but the standard library accepts, e.g. dict
+    with non-str keys or integers wider than 64 bits, are encoded by the
+    standard library. Likewise, messages which orjson can't decode, e.g.
+    strings with lone surrogates like ``"\ud800"``, are decoded by the
+    standard library.
+    """
+
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        import orjson
+        self._dumps = orjson.dumps
+        self._loads = orjson.loads
+
+    def dumps(self, obj: Any) -> str:
+        """Encode ``obj`` to JSON string."""
+        try:
+            return self._dumps(obj).decode()
+        except TypeError:
+            return json.dumps(obj)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Decode JSON ``data`` to python object."""
+        try:
+            return self._loads(data)
+        except ValueError:
+            return json.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    """JSON codec using `msgspec <https://pypi.org/project/msgspec/>`_.
+
+    As :class:`OrjsonCodec`, data which msgspec can't handle is encoded or
+    decoded by the standard library.
+    """
+
+    name = 'msgspec'
+
+    def __init__(self) -> None:
+        import msgspec
+        self._encode = msgspec.json.Encoder().encode
+        self._decode = msgspec.json.Decoder().decode
+
+    def dumps(self, obj: Any) -> str:
+        """Encode ``obj`` to JSON string."""
+        try:
+            return self._encode(obj).decode()
+        except (TypeError, ValueError):
+            return json.dumps(obj)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Decode JSON ``data`` to python object."""
+        try:
+            return self._decode(data)
+        except ValueError:
+            return json.loads(data)
+
+
+_codecs: Dict[str, Callable[[], JSONCodec]] = {
+    'json': StdlibCodec,
+    'orjson': OrjsonCodec,
+    'msgspec': MsgspecCodec,
+}
+
+# Order of preference for the ``'auto'`` codec.
+_auto_codecs = ['orjson', 'msgspec', 'json']
+
+
+def get_codec(codec: Union[str, JSONCodec, None] = 'auto') -> JSONCodec:
+    """Get JSON codec.
+
+    ``codec`` is one of ``'auto'``, ``'orjson'``, ``'msgspec'``, ``'json'``,
+    or an instance of :class:`JSONCodec`. ``'auto'`` (or ``None``) selects the
+    fastest installed library and falls back to the standard library.
+
+    Raise :class:`ImportError` if the specified library is not installed.
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec is None or codec == 'auto':
+        for name in _auto_codecs:
+            try:
+                return _codecs[name]()
+            except ImportError:
+                continue
+    if codec not in _codecs:
+        raise ValueError(f'Unknown JSON codec: {codec}')
+    return _codecs[codec]()  # type: ignore
@@ -4,13 +4,15 @@
 """Connection/Session management module."""
 
 import asyncio
-import json
+from collections import deque
 import logging
-from typing import Awaitable, Callable, Dict, Union, TYPE_CHECKING
+from typing import Any, Awaitable, Callable, Deque, Dict, Tuple, Union
+from typing import TYPE_CHECKING
 
 from pyee import EventEmitter
 import websockets
 
+from pyppeteer.codec import JSONCodec, get_codec
 from pyppeteer.errors import NetworkError
 
 if TYPE_CHECKING:
@@ -25,24 +27,43 @@ class Connection(EventEmitter):
     """Connection management class."""
 
     def __init__(self, url: str, loop: asyncio.AbstractEventLoop,
-                 delay: int = 0) -> None:
+                 delay: int = 0, flatten: bool = False,
+                 codec: Union[str, JSONCodec, None] = None,
+                 transport: Any = None) -> None:
         """Make connection.
 
         :arg str url: WebSocket url to connect devtool.
         :arg int delay: delay to wait before processing received messages.
+        :arg bool flatten: attach to targets in flatten mode, which routes
+                           session messages by the top-level ``sessionId``
+                           instead of nesting them in
+                           ``Target.sendMessageToTarget``.
+        :arg codec: JSON codec to encode/decode protocol messages. See
+                    :func:`~pyppeteer.codec.get_codec`.
+        :arg transport: Transport used instead of WebSocket, such as
+                        :class:`~pyppeteer.pipe_transport.PipeTransport`.
         """
         super().__init__()
         self._url = url
         self._lastId = 0
         self._callbacks: Dict[int, asyncio.Future] = dict()
         self._delay = delay / 1000
+        self._flatten = flatten
+        self._codec = get_codec(codec)
         self._loop = loop
         self._sessions: Dict[str, CDPSession] = dict()
         self.connection: CDPSession
         self._connected = False
-        self._ws = websockets.client.connect(
-            self._url, max_size=None, loop=self._loop)
+        self._connectedEvent = asyncio.Event()
+        # Outbound messages are written by a single writer coroutine
+        self._sendQueue: Deque[Tuple[str, int]] = deque()
+        self._sendEvent = asyncio.Event()
+        if transport is None:
+            transport = websockets.client.connect(
+                self._url, max_size=None, loop=self._loop)
+        self._ws = transport
         self._recv_fut = self._loop.create_task(self._recv_loop())
+        self._send_fut = self._loop.create_task(self._send_loop())
         self._closeCallback: Optional[Callable[[], None]] = None
 
     @property
@@ -54,6 +75,7 @@ class Connection(EventEmitter):
         async with self._ws as connection:
             self._connected = True
             self.connection = connection
+            self._connectedEvent.set()
             while self._connected:
                 try:
                     resp = await self.connection.recv()
@@ -62,21 +84,26 @@ class Connection(EventEmitter):
                 except (websockets.ConnectionClosed, ConnectionResetError):
                     logger.info('connection closed')
                     break
-                await asyncio.sleep(0)
         if self._connected:
             self._loop.create_task(self.dispose())
 
-    async def _async_send(self, msg: str, callback_id: int) -> None:
-        while not self._connected:
-            await asyncio.sleep(self._delay)
-        try:
-            await self.connection.send(msg)
-        except websockets.ConnectionClosed:
-            logger.error('connection unexpectedly closed')
-            callback = self._callbacks.get(callback_id, None)
-            if callback and not callback.done():
-                callback.set_result(None)
-                await self.dispose()
+    async def _send_loop(self) -> None:
+        await self._connectedEvent.wait()
+        while self._connected:
+            await self._sendEvent.wait()
+            self._sendEvent.clear()
+            # Write all messages queued while waiting at once
+            while self._sendQueue:
+                msg, callback_id = self._sendQueue.popleft()
+                try:
+                    await self.connection.send(msg)
+                except (websockets.ConnectionClosed, ConnectionResetError):
+                    logger.error('connection unexpectedly closed')
+                    callback = self._callbacks.get(callback_id, None)
+                    if callback and not callback.done():
+                        callback.set_result(None)
+                        self._loop.create_task(self.dispose())
+                    return
 
     def send(self, method: str, params: dict = None) -> Awaitable:
         """Send message via the connection."""
@@ -85,21 +112,22 @@ class Connection(EventEmitter):
             raise ConnectionError('Connection is closed')
         if params is None:
             params = dict()
-        self._lastId += 1
-        _id = self._lastId
-        msg = json.dumps(dict(
-            id=_id,
-            method=method,
-            params=params,
-        ))
-        logger_connection.debug(f'SEND: {msg}')
-        self._loop.create_task(self._async_send(msg, _id))
+        _id = self._rawSend(dict(method=method, params=params))
         callback = self._loop.create_future()
         self._callbacks[_id] = callback
         callback.error: Exception = NetworkError()  # type: ignore
         callback.method: str = method  # type: ignore
         return callback
 
+    def _rawSend(self, message: Dict) -> int:
+        self._lastId += 1
+        _id = self._lastId
+        msg = self._codec.dumps(dict(id=_id, **message))
+        logger_connection.debug(f'SEND: {msg}')
+        self._sendQueue.append((msg, _id))
+        self._sendEvent.set()
+        return _id
+
     def _on_response(self, msg: dict) -> None:
         callback = self._callbacks.pop(msg.get('id', -1))
         if msg.get('error'):
@@ -122,22 +150,36 @@ class Connection(EventEmitter):
             if session:
                 session._on_message(params.get('message'))
         elif method == 'Target.detachedFromTarget':
-            session = self._sessions.get(sessionId)
-            if session:
-                session._on_closed()
-                del self._sessions[sessionId]
+            self._closeSession(sessionId)
         else:
             self.emit(method, params)
 
+    def _on_session_message(self, msg: dict) -> None:
+        # In flatten mode, messages of all sessions (including the sessions
+        # auto-attached to other sessions) come to the connection directly.
+        method = msg.get('method', '')
+        params = msg.get('params', {})
+        if method == 'Target.attachedToTarget':
+            self._createSession(params['targetInfo']['type'],
+                                params['sessionId'])
+        elif method == 'Target.detachedFromTarget':
+            self._closeSession(params.get('sessionId'))
+        session = self._sessions.get(msg['sessionId'])
+        if session:
+            session._on_protocol_message(msg)
+
     def setClosedCallback(self, callback: Callable[[], None]) -> None:
         """Set closed callback."""
         self._closeCallback = callback
 
     async def _on_message(self, message: str) -> None:
-        await asyncio.sleep(self._delay)
+        if self._delay:
+            await asyncio.sleep(self._delay)
         logger_connection.debug(f'RECV: {message}')
-        msg = json.loads(message)
-        if msg.get('id') in self._callbacks:
+        msg = self._codec.loads(message)
+        if msg.get('sessionId'):
+            self._on_session_message(msg)
+        elif msg.get('id') in self._callbacks:
             self._on_response(msg)
         else:
             self._on_query(msg)
@@ -163,6 +205,9 @@ class Connection(EventEmitter):
             await self.connection.close()
         if not self._recv_fut.done():
             self._recv_fut.cancel()
+        if not self._send_fut.done():
+            self._send_fut.cancel()
+        self._sendQueue.clear()
 
     async def dispose(self) -> None:
         """Close all connection."""
@@ -171,15 +216,27 @@ class Connection(EventEmitter):
 
     async def createSession(self, targetInfo: Dict) -> 'CDPSession':
         """Create new session."""
-        resp = await self.send(
-            'Target.attachToTarget',
-            {'targetId': targetInfo['targetId']}
-        )
-        sessionId = resp.get('sessionId')
-        session = CDPSession(self, targetInfo['type'], sessionId, self._loop)
-        self._sessions[sessionId] = session
+        params = {'targetId': targetInfo['targetId']}
+        if self._flatten:
+            params['flatten'] = True
+        resp = await self.send('Target.attachToTarget', params)
+        return self._createSession(targetInfo['type'], resp.get('sessionId'))
+
+    def _createSession(self, targetType: str, sessionId: str
+                       ) -> 'CDPSession':
+        # In flatten mode, the session may be already registered by the
+        # `Target.attachedToTarget` event.
+        session = self._sessions.get(sessionId)
+        if session is None:
+            session = CDPSession(self, targetType, sessionId, self._loop)
+            self._sessions[sessionId] = session
         return session
 
+    def _closeSession(self, sessionId: str) -> None:
+        session = self._sessions.pop(sessionId, None)
+        if session:
+            session._on_closed()
+
 
 class CDPSession(EventEmitter):
     """Chrome Devtools Protocol Session.
@@ -206,6 +263,9 @@ class CDPSession(EventEmitter):
         self._sessionId = sessionId
         self._sessions: Dict[str, CDPSession] = dict()
         self._loop = loop
+        self._flatten = isinstance(connection, Connection) and \
+            connection._flatten
+        self._codec: JSONCodec = connection._codec
 
     def send(self, method: str, params: dict = None) -> Awaitable:
         """Send message to the connected session.
@@ -218,15 +278,21 @@ class CDPSession(EventEmitter):
                 f'Protocol Error ({method}): Session closed. Most likely the '
                 f'{self._targetType} has been closed.'
             )
+        if self._flatten:
+            # Session messages share id sequence of the root connection.
+            _id = self._connection._rawSend(dict(  # type: ignore
+                sessionId=self._sessionId,
+                method=method,
+                params=params,
+            ))
+            return self._addCallback(_id, method)
+
         self._lastId += 1
         _id = self._lastId
-        msg = json.dumps(dict(id=_id, method=method, params=params))
+        msg = self._codec.dumps(dict(id=_id, method=method, params=params))
         logger_session.debug(f'SEND: {msg}')
 
-        callback = self._loop.create_future()
-        self._callbacks[_id] = callback
-        callback.error: Exception = NetworkError()  # type: ignore
-        callback.method: str = method  # type: ignore
+        callback = self._addCallback(_id, method)
         try:
             self._connection.send('Target.sendMessageToTarget', {
                 'sessionId': self._sessionId,
@@ -243,9 +309,18 @@ class CDPSession(EventEmitter):
                 ))
         return callback
 
-    def _on_message(self, msg: str) -> None:  # noqa: C901
+    def _addCallback(self, _id: int, method: str) -> asyncio.Future:
+        callback = self._loop.create_future()
+        self._callbacks[_id] = callback
+        callback.error: Exception = NetworkError()  # type: ignore
+        callback.method: str = method  # type: ignore
+        return callback
+
+    def _on_message(self, msg: str) -> None:
         logger_session.debug(f'RECV: {msg}')
-        obj = json.loads(msg)
+        self._on_protocol_message(self._codec.loads(msg))
+
+    def _on_protocol_message(self, obj: Dict) -> None:  # noqa: C901
         _id = obj.get('id')
         if _id:
             callback = self._callbacks.get(_id)
@@ -296,6 +371,9 @@ class CDPSession(EventEmitter):
         self._connection = None
 
     def _createSession(self, targetType: str, sessionId: str) -> 'CDPSession':
+        if self._flatten:
+            return self._connection._createSession(  # type: ignore
+                targetType, sessionId)
         session = CDPSession(self, targetType, sessionId, self._loop)
         self._sessions[sessionId] = session
         return session
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""DOM snapshot module.
+
+:meth:`pyppeteer.page.Page.domSnapshot` returns the result of
+``DOMSnapshot.captureSnapshot`` as columns: each property of nodes and layout
+objects is stored in one array, and strings are kept as indices of the
+shared string table. No python object is created per node. If `numpy
+<https://numpy.org/>`_ is installed, the columns are numpy arrays and the
+filters are vectorized; otherwise they are :mod:`array` arrays and lists.
+"""
+
+from array import array
+from typing import Any, Dict, List, Optional, Sequence
+
+__all__ = ['DOMSnapshot', 'SnapshotDocument']
+
+_numpy_module: List[Any] = list()
+_dtypes = {'i': 'int32', 'd': 'float64'}
+
+
+def _numpy() -> Any:
+    """Get numpy module, or ``None`` if not installed."""
+    if not _numpy_module:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy_module.append(numpy)
+    return _numpy_module[0]
+
+
+class DOMSnapshot(object):
+    """Snapshot of the DOM tree, layout and computed styles of a page.
+
+    Snapshot of each document (the main frame and iframes) is available as
+    :attr:`documents`, and all documents share :attr:`strings` table.
+    """
+
+    def __init__(self, result: Dict[str, Any], computedStyles: Sequence[str],
+                 useNumpy: bool = None) -> None:
+        if useNumpy is None:
+            useNumpy = _numpy() is not None
+        self._np = _numpy() if useNumpy else None
+        #: Table of strings referred by indices from the columns.
+        self.strings: List[str] = result['strings']
+        #: Names of the computed styles captured.
+        self.computedStyles: List[str] = list(computedStyles)
+        self._stringIndex: Optional[Dict[str, int]] = None
+        #: List of :class:`SnapshotDocument`.
+        self.documents = [SnapshotDocument(self, doc)
+                          for doc in result['documents']]
+
+    @property
+    def document(self) -> 'SnapshotDocument':
+        """Snapshot of the main frame document."""
+        return self.documents[0]
+
+    def string(self, index: int) -> Optional[str]:
+        """Get string of ``index`` in the string table.
+
+        Return ``None`` for ``-1``, which is used for missing strings.
+        """
+        return self.strings[index] if index >= 0 else None
+
+    def stringIndex(self, value: str) -> int:
+        """Get index of ``value`` in the string table, or ``-1``."""
+        if self._stringIndex is None:
+            self._stringIndex = {s: i for i, s in enumerate(self.strings)}
+        return self._stringIndex.get(value, -1)
+
+    def _column(self, values: List[Any], typecode: str = 'i') -> Any:
+        if self._np is not None:
+            return self._np.asarray(values, dtype=_dtypes[typecode])
+        return array(typecode, values)
+
+    def _table(self, rows: List[List[Any]], width: int,
+               typecode: str = 'i') -> Any:
+        if self._np is not None:
+            table = self._np.asarray(rows, dtype=_dtypes[typecode])
+            return table.reshape(len(rows), width)
+        return rows
+
+    def _rects(self, rows: List[List[float]]) -> Any:
+        """Make table of rectangles, where missing ones are empty rows.
+
+        Missing rectangles are ``nan`` in numpy table.
+        """
+        if self._np is not None:
+            missing = [float('nan')] * 4
+            return self._table([row or missing for row in rows], 4, 'd')
+        return rows
+
+    def _equal(self, column: Any, value: int) -> Any:
+        """Get indices of ``column`` items equal to string index ``value``."""
+        if value < 0:
+            # Not in the string table.
+            return self._column([])
+        if self._np is not None:
+            return self._np.flatnonzero(column == value)
+        return [i for i, v in enumerate(column) if v == value]
+
+
+class SnapshotDocument(object):
+    """Snapshot of a document.
+
+    Nodes and layout objects are referred by their indices. Node columns are
+    indexed by node index, and layout columns are indexed by layout index;
+    :attr:`layoutNodeIndex` maps layout index to node index.
+
+    Filter methods return an array of indices, which can be combined with
+    the other filters, e.g.
+    ``set(doc.nodesByTag('a')) & set(doc.layoutNodes(doc.layoutInBox(...)))``.
+    """
+
+    def __init__(self, snapshot: DOMSnapshot, data: Dict[str, Any]) -> None:
+        self._snapshot = snapshot
+        string = snapshot.string
+        column = snapshot._column
+        nodes = data['nodes']
+        layout = data['layout']
+        #: URL of this document.
+        self.url = string(data.get('documentURL', -1))
+        #: Title of this document.
+        self.title = string(data.get('title', -1))
+        #: Frame ID of this document.
+        self.frameId = string(data.get('frameId', -1))
+
+        #: Index of the parent node (``-1`` for the root).
+        self.parentIndex = column(nodes.get('parentIndex', []))
+        #: Node type (e.g. ``1`` for elements, ``3`` for text nodes).
+        self.nodeType = column(nodes.get('nodeType', []))
+        #: String index of the node name (upper case for HTML elements).
+        self.nodeName = column(nodes.get('nodeName', []))
+        #: String index of the node value (e.g. text of text nodes).
+        self.nodeValue = column(nodes.get('nodeValue', []))
+        #: Backend node ID of the node.
+        self.backendNodeId = column(nodes.get('backendNodeId', []))
+        self._attributes: List[List[int]] = nodes.get('attributes', [])
+
+        #: Node index of the layout object.
+        self.layoutNodeIndex = column(layout.get('nodeIndex', []))
+        #: Bounding boxes of layout objects as rows of
+        #: ``(x, y, width, height)``.
+        self.bounds = snapshot._table(layout.get('bounds', []), 4, 'd')
+        #: String indices of computed styles of layout objects; columns are
+        #: in the order of :attr:`DOMSnapshot.computedStyles`.
+        self.styles = snapshot._table(
+            layout.get('styles', []), len(snapshot.computedStyles))
+        #: String index of the text of layout objects.
+        self.layoutText = column(layout.get('text', []))
+        #: Paint order of layout objects; captured by ``includePaintOrder``
+        #: option, otherwise empty.
+        self.paintOrders = column(layout.get('paintOrders', []))
+        #: Offset rects of layout objects as rows of ``(x, y, width,
+        #: height)``; captured by ``includeDOMRects`` option, otherwise
+        #: empty.
+        self.offsetRects = snapshot._rects(layout.get('offsetRects', []))
+        #: Scroll rects of layout objects, same as :attr:`offsetRects`.
+        self.scrollRects = snapshot._rects(layout.get('scrollRects', []))
+        #: Client rects of layout objects, same as :attr:`offsetRects`.
+        self.clientRects = snapshot._rects(layout.get('clientRects', []))
+
+    def __len__(self) -> int:
+        """Get number of nodes."""
+        return len(self.nodeType)
+
+    def name(self, index: int) -> Optional[str]:
+        """Get node name of the node at ``index``."""
+        return self._snapshot.string(self.nodeName[index])
+
+    def value(self, index: int) -> Optional[str]:
+        """Get node value of the node at ``index``."""
+        return self._snapshot.string(self.nodeValue[index])
+
+    def attributes(self, index: int) -> Dict[str, str]:
+        """Get attributes of the node at ``index`` as a dictionary."""
+        strings = self._snapshot.strings
+        attrs = self._attributes[index] if self._attributes else []
+        return {strings[attrs[i]]: strings[attrs[i + 1]]
+                for i in range(0, len(attrs), 2)}
+
+    def nodesByTag(self, tag: str) -> Any:
+        """Get indices of element nodes whose tag name is ``tag``.
+
+        ``tag`` is case-insensitive for HTML elements.
+        """
+        index = self._snapshot.stringIndex(tag.upper())
+        if index < 0:
+            index = self._snapshot.stringIndex(tag)
+        return self._snapshot._equal(self.nodeName, index)
+
+    def layoutNodes(self, layoutIndices: Any) -> Any:
+        """Convert layout indices to node indices."""
+        if self._snapshot._np is not None:
+            return self.layoutNodeIndex[layoutIndices]
+        return [self.layoutNodeIndex[i] for i in layoutIndices]
+
+    def layoutByStyle(self, name: str, value: str) -> Any:
+        """Get indices of layout objects whose computed style is ``value``.
+
+        ``name`` must be one of the ``computedStyles`` captured.
+        """
+        try:
+            column = self._snapshot.computedStyles.index(name)
+        except ValueError:
+            raise ValueError(f'Style {name!r} is not captured.') from None
+        index = self._snapshot.stringIndex(value)
+        if self._snapshot._np is not None:
+            return self._snapshot._equal(self.styles[:, column], index)
+        return self._snapshot._equal(
+            [row[column] for row in self.styles], index)
+
+    def layoutInBox(self, x: float, y: float, width: float, height: float,
+                    contain: bool = False) -> Any:
+        """Get indices of layout objects in the box.
+
+        By default, layout objects which intersect the box are returned. If
+        ``contain`` is ``True``, only ones entirely inside the box are
+        returned.
+        """
+        right, bottom = x + width, y + height
+        np = self._snapshot._np
+        if np is not None:
+            b = self.bounds
+            x0, y0 = b[:, 0], b[:, 1]
+            x1, y1 = x0 + b[:, 2], y0 + b[:, 3]
+            if contain:
+                mask = (x0 >= x) & (y0 >= y) & (x1 <= right) & (y1 <= bottom)
+            else:
+                mask = (x0 < right) & (y0 < bottom) & (x1 > x) & (y1 > y)
+            return np.flatnonzero(mask)
+        if contain:
+            return [i for i, (bx, by, bw, bh) in enumerate(self.bounds)
+                    if bx >= x and by >= y and
+                    bx + bw <= right and by + bh <= bottom]
+        return [i for i, (bx, by, bw, bh) in enumerate(self.bounds)
+                if bx < right and by < bottom and
+                bx + bw > x and by + bh > y]
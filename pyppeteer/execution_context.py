@@ -3,10 +3,14 @@
 
 """Execution Context Module."""
 
+import asyncio
+from collections import OrderedDict
 import logging
 import math
 import re
-from typing import Any, Dict, Optional, TYPE_CHECKING
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+import weakref
 
 from pyppeteer import helper
 from pyppeteer.connection import CDPSession
@@ -20,11 +24,36 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 EVALUATION_SCRIPT_URL = '__pyppeteer_evaluation_script__'
+# Call the function installed by script cache (``this``) with arguments.
+CALL_CACHED_FUNCTION = 'function(...args) { return this(...args); }'
 SOURCE_URL_REGEX = re.compile(
     r'^[\040\t]*//[@#] sourceURL=\s*(\S*?)\s*$',
     re.MULTILINE,
 )
 
+# Handle scopes entered by the current task, innermost last. Scopes are
+# task-local so that handles made by other tasks are not released with them.
+if sys.version_info >= (3, 7):
+    import contextvars
+
+    # Tasks created in a scope inherit it.
+    _scopesVar: 'contextvars.ContextVar[Tuple[HandleScope, ...]]' = \
+        contextvars.ContextVar('pyppeteer_handle_scopes', default=())
+
+    def _currentScopes() -> Tuple['HandleScope', ...]:
+        return _scopesVar.get()
+
+    def _setCurrentScopes(scopes: Tuple['HandleScope', ...]) -> None:
+        _scopesVar.set(scopes)
+else:
+    _taskScopes: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _currentScopes() -> Tuple['HandleScope', ...]:
+        return _taskScopes.get(asyncio.Task.current_task(), ())
+
+    def _setCurrentScopes(scopes: Tuple['HandleScope', ...]) -> None:
+        _taskScopes[asyncio.Task.current_task()] = scopes
+
 
 class ExecutionContext(object):
     """Execution Context class."""
@@ -38,81 +67,222 @@ class ExecutionContext(object):
         auxData = contextPayload.get('auxData', {'isDefault': False})
         self._isDefault = bool(auxData.get('isDefault'))
         self._objectHandleFactory = objectHandleFactory
+        # function text -> future of objectId of the installed function
+        self._scriptCache: Optional[OrderedDict[str, asyncio.Future]] = None
+        self._scriptCacheSize = 0
+        self._handleCount = 0
 
     @property
     def frame(self) -> Optional['Frame']:
         """Return frame associated with this execution context."""
         return self._frame
 
+    @property
+    def handleCount(self) -> int:
+        """Number of live (not disposed) handles to objects in this context.
+
+        Handles to primitive values are not counted since they do not hold
+        remote objects.
+        """
+        return self._handleCount
+
+    def handleScope(self) -> 'HandleScope':
+        """Make a scope to release handles created in it at once.
+
+        Return an async context manager. Objects of handles created in this
+        context while the scope is active (by :meth:`evaluateHandle` and
+        methods using it, e.g. ``querySelector`` of pages and element
+        handles) belong to an object group of the browser, and they are
+        released with a single protocol call on exit. The handles are
+        disposed on exit.
+
+        .. code::
+
+            async with context.handleScope():
+                for element in await frame.querySelectorAll('a'):
+                    ...
+
+        Scopes can be nested; the innermost scope takes the handles. Only
+        handles created by the task which entered the scope belong to it,
+        not ones created by other tasks running concurrently in the same
+        context. On Python 3.7 or later, tasks created in the scope also
+        inherit it.
+        """
+        return HandleScope(self)
+
     async def evaluate(self, pageFunction: str, *args: Any,
                        force_expr: bool = False) -> Any:
         """Execute ``pageFunction`` on this context.
 
         Details see :meth:`pyppeteer.page.Page.evaluate`.
         """
-        handle = await self.evaluateHandle(
-            pageFunction, *args, force_expr=force_expr)
+        # Get the result by value in the same call, instead of making a
+        # handle, getting its value and releasing it (three round trips).
         try:
-            result = await handle.jsonValue()
+            remoteObject = await self._evaluate(
+                pageFunction, args, force_expr, returnByValue=True)
         except NetworkError as e:
             if 'Object reference chain is too long' in e.args[0]:
                 return
             if 'Object couldn\'t be returned by value' in e.args[0]:
                 return
             raise
-        await handle.dispose()
-        return result
+        return helper.valueFromRemoteObject(remoteObject)
 
-    async def evaluateHandle(self, pageFunction: str, *args: Any,  # noqa: C901
+    async def evaluateHandle(self, pageFunction: str, *args: Any,
                              force_expr: bool = False) -> 'JSHandle':
         """Execute ``pageFunction`` on this context.
 
         Details see :meth:`pyppeteer.page.Page.evaluateHandle`.
         """
-        suffix = f'//# sourceURL={EVALUATION_SCRIPT_URL}'
+        return await self._evaluateHandle(pageFunction, args, force_expr)
+
+    async def _evaluateHandle(self, pageFunction: str, args: Sequence[Any],
+                              force_expr: bool = False, scoped: bool = True
+                              ) -> 'JSHandle':
+        """Evaluate and return handle.
+
+        If ``scoped`` is ``False``, the handle does not belong to the active
+        handle scope (e.g. for handles cached by frames).
+        """
+        scope = self._activeScope() if scoped else None
+        remoteObject = await self._evaluate(
+            pageFunction, args, force_expr, returnByValue=False, scope=scope)
+        handle = self._objectHandleFactory(remoteObject)
+        if scope is not None:
+            scope._add(handle)
+        return handle
+
+    def _activeScope(self) -> Optional['HandleScope']:
+        """Get the innermost scope of this context entered by this task."""
+        for scope in reversed(_currentScopes()):
+            if scope._context is self and not scope._released:
+                return scope
+        return None
 
+    async def _evaluate(self, pageFunction: str, args: Sequence[Any],
+                        force_expr: bool, returnByValue: bool,
+                        scope: Optional['HandleScope'] = None) -> Dict:
+        """Evaluate ``pageFunction`` and return the result remote object."""
         if force_expr or (not args and not helper.is_jsfunc(pageFunction)):
-            try:
-                if SOURCE_URL_REGEX.match(pageFunction):
-                    expressionWithSourceUrl = pageFunction
-                else:
-                    expressionWithSourceUrl = f'{pageFunction}\n{suffix}'
-                _obj = await self._client.send('Runtime.evaluate', {
-                    'expression': expressionWithSourceUrl,
-                    'contextId': self._contextId,
-                    'returnByValue': False,
-                    'awaitPromise': True,
-                    'userGesture': True,
-                })
-            except Exception as e:
-                _rewriteError(e)
-
-            exceptionDetails = _obj.get('exceptionDetails')
-            if exceptionDetails:
-                raise ElementHandleError(
-                    'Evaluation failed: {}'.format(
-                        helper.getExceptionMessage(exceptionDetails)))
-            remoteObject = _obj.get('result')
-            return self._objectHandleFactory(remoteObject)
+            method = 'Runtime.evaluate'
+            params = self._expressionParams(pageFunction)
+        else:
+            method = 'Runtime.callFunctionOn'
+            params = await self._functionParams(pageFunction, args)
+        params.update({
+            'returnByValue': returnByValue,
+            'awaitPromise': True,
+            'userGesture': True,
+        })
+        if scope is not None:
+            params['objectGroup'] = scope.objectGroup
+
+        try:
+            _obj = await self._client.send(method, params)
+        except Exception as e:
+            _rewriteError(e)
+
+        exceptionDetails = _obj.get('exceptionDetails')
+        if exceptionDetails:
+            raise ElementHandleError('Evaluation failed: {}'.format(
+                helper.getExceptionMessage(exceptionDetails)))
+        return _obj.get('result')
+
+    def _expressionParams(self, expression: str) -> Dict:
+        if not SOURCE_URL_REGEX.match(expression):
+            expression = (f'{expression}\n'
+                          f'//# sourceURL={EVALUATION_SCRIPT_URL}')
+        return {
+            'expression': expression,
+            'contextId': self._contextId,
+        }
+
+    async def _functionParams(self, pageFunction: str, args: Sequence[Any]
+                              ) -> Dict:
+        params: Dict[str, Any] = {
+            'arguments': [self._convertArgument(arg) for arg in args],
+        }
+        functionId = await self._cachedFunction(pageFunction)
+        if functionId:
+            # Call the installed function instead of sending its source.
+            params['functionDeclaration'] = CALL_CACHED_FUNCTION
+            params['objectId'] = functionId
+        else:
+            params['functionDeclaration'] = \
+                f'{pageFunction}\n//# sourceURL={EVALUATION_SCRIPT_URL}\n'
+            params['executionContextId'] = self._contextId
+        return params
+
+    def _setScriptCache(self, size: int) -> None:
+        """Enable script cache of ``size`` functions, or disable if ``0``."""
+        self._scriptCacheSize = size
+        if not size:
+            self._clearScriptCache()
+            self._scriptCache = None
+        elif self._scriptCache is None:
+            self._scriptCache = OrderedDict()
+        else:
+            self._evictScripts()
+
+    def _clearScriptCache(self) -> None:
+        """Forget installed functions (e.g. the context was destroyed)."""
+        if self._scriptCache is not None:
+            self._scriptCache.clear()
+
+    async def _cachedFunction(self, pageFunction: str) -> Optional[str]:
+        """Get objectId of ``pageFunction`` installed in this context.
+
+        Return ``None`` if script cache is disabled or ``pageFunction`` is
+        not a function.
+        """
+        cache = self._scriptCache
+        if cache is None:
+            return None
+        fut = cache.get(pageFunction)
+        if fut is None:
+            fut = asyncio.ensure_future(self._installFunction(pageFunction))
+            cache[pageFunction] = fut
+            self._evictScripts()
+        else:
+            cache.move_to_end(pageFunction)
+        try:
+            return await asyncio.shield(fut)
+        except Exception:
+            if cache.get(pageFunction) is fut:
+                del cache[pageFunction]
+            raise
 
+    async def _installFunction(self, pageFunction: str) -> Optional[str]:
+        suffix = f'//# sourceURL={EVALUATION_SCRIPT_URL}'
         try:
-            _obj = await self._client.send('Runtime.callFunctionOn', {
-                'functionDeclaration': f'{pageFunction}\n{suffix}\n',
-                'executionContextId': self._contextId,
-                'arguments': [self._convertArgument(arg) for arg in args],
+            _obj = await self._client.send('Runtime.evaluate', {
+                'expression': f'({pageFunction})\n{suffix}',
+                'contextId': self._contextId,
                 'returnByValue': False,
-                'awaitPromise': True,
-                'userGesture': True,
             })
         except Exception as e:
             _rewriteError(e)
-
         exceptionDetails = _obj.get('exceptionDetails')
         if exceptionDetails:
             raise ElementHandleError('Evaluation failed: {}'.format(
                 helper.getExceptionMessage(exceptionDetails)))
-        remoteObject = _obj.get('result')
-        return self._objectHandleFactory(remoteObject)
+        remoteObject = _obj.get('result', {})
+        if remoteObject.get('type') != 'function':
+            await helper.releaseObject(self._client, remoteObject)
+            return None
+        return remoteObject.get('objectId')
+
+    def _evictScripts(self) -> None:
+        cache = self._scriptCache
+        while cache is not None and len(cache) > self._scriptCacheSize:
+            _, fut = cache.popitem(last=False)
+            fut.add_done_callback(self._releaseFunction)
+
+    def _releaseFunction(self, fut: asyncio.Future) -> None:
+        if fut.cancelled() or fut.exception() or not fut.result():
+            return
+        helper.releaseObject(self._client, {'objectId': fut.result()})
 
     def _convertArgument(self, arg: Any) -> Dict:  # noqa: C901
         if arg == math.inf:
@@ -148,6 +318,62 @@ class ExecutionContext(object):
         return self._objectHandleFactory(response.get('objects'))
 
 
+class HandleScope(object):
+    """Scope to release handles at once.
+
+    Made by :meth:`ExecutionContext.handleScope`,
+    :meth:`~pyppeteer.frame_manager.Frame.handleScope` or
+    :meth:`~pyppeteer.page.Page.handleScope`.
+    """
+
+    _lastId = 0
+
+    def __init__(self, context: ExecutionContext = None,
+                 frame: 'Frame' = None) -> None:
+        self._context = context
+        self._frame = frame
+        self._handles: List[JSHandle] = list()
+        self._released = False
+        HandleScope._lastId += 1
+        #: Object group name of this scope.
+        self.objectGroup = f'pyppeteer-scope-{HandleScope._lastId}'
+
+    async def __aenter__(self) -> 'HandleScope':
+        if self._context is None and self._frame is not None:
+            self._context = await self._frame.executionContext()
+        if self._context is None:
+            raise ElementHandleError('No execution context for handle scope.')
+        self._released = False
+        _setCurrentScopes(_currentScopes() + (self,))
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.release()
+
+    def _add(self, handle: 'JSHandle') -> None:
+        if handle._remoteObject.get('objectId'):
+            handle._scope = self
+            self._handles.append(handle)
+
+    async def release(self) -> None:
+        """Dispose all handles in this scope and end the scope."""
+        context = self._context
+        if context is None or self._released:
+            return
+        self._released = True
+        _setCurrentScopes(tuple(s for s in _currentScopes() if s is not self))
+        handles, self._handles = self._handles, []
+        for handle in handles:
+            handle._markDisposed()
+        try:
+            await self._context._client.send('Runtime.releaseObjectGroup', {
+                'objectGroup': self.objectGroup,
+            })
+        except Exception as e:
+            # The context may have been destroyed with the objects.
+            debugError(logger, e)
+
+
 class JSHandle(object):
     """JSHandle class.
 
@@ -161,6 +387,9 @@ class JSHandle(object):
         self._client = client
         self._remoteObject = remoteObject
         self._disposed = False
+        self._scope: Optional[HandleScope] = None
+        if remoteObject.get('objectId'):
+            context._handleCount += 1
 
     @property
     def executionContext(self) -> ExecutionContext:
@@ -190,8 +419,11 @@ class JSHandle(object):
         for prop in response['result']:
             if not prop.get('enumerable'):
                 continue
-            result[prop.get('name')] = self._context._objectHandleFactory(
-                prop.get('value'))
+            handle = self._context._objectHandleFactory(prop.get('value'))
+            if self._scope is not None:
+                # Properties belong to the object group of this object.
+                self._scope._add(handle)
+            result[prop.get('name')] = handle
         return result
 
     async def jsonValue(self) -> Dict:
@@ -211,11 +443,18 @@ class JSHandle(object):
         """Return either null or the object handle itself."""
         return None
 
+    def _markDisposed(self) -> None:
+        if self._disposed:
+            return
+        self._disposed = True
+        if self._remoteObject.get('objectId'):
+            self._context._handleCount -= 1
+
     async def dispose(self) -> None:
         """Stop referencing the handle."""
         if self._disposed:
             return
-        self._disposed = True
+        self._markDisposed()
         try:
             await helper.releaseObject(self._client, self._remoteObject)
         except Exception as e:
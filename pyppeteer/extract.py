@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Declarative data extraction module.
+
+An extraction spec is compiled to a plan (plain JSON data), which is passed
+to a constant in-page function. The whole extraction runs in the page and
+only the result is returned, so extracting thousands of fields costs a
+single protocol round trip.
+"""
+
+import re
+from typing import Any, Dict
+
+# Getter suffix of a field spec, recognised or not.
+_SUFFIX_RE = re.compile(r'\s*(::\w+.*|@[^\s\]]*)$', re.DOTALL)
+_GETTER_RE = re.compile(
+    r'::(?P<getter>text|html|prop\((?P<prop>[\w$]+)\))'
+    r'|@(?P<attr>[\w:.-]+)',
+    re.DOTALL,
+)
+
+EXTRACT_FUNCTION = '''
+function (plan) {
+  function read(el, node) {
+    switch (node.g) {
+      case 'text': return (el.textContent || '').trim();
+      case 'html': return el.innerHTML;
+      case 'attr': return el.getAttribute(node.n);
+      default: {
+        const value = el[node.n];
+        return value === undefined ? null : value;
+      }
+    }
+  }
+  function run(node, scope) {
+    switch (node.t) {
+      case 'field': {
+        if (!node.s && scope === document)
+          scope = document.documentElement;
+        const el = node.s ? scope.querySelector(node.s) : scope;
+        return el ? read(el, node) : null;
+      }
+      case 'all':
+        return Array.from(
+          scope.querySelectorAll(node.s), el => run(node.f, el));
+      default: {
+        const result = {};
+        for (const key of Object.keys(node.f))
+          result[key] = run(node.f[key], scope);
+        return result;
+      }
+    }
+  }
+  return run(plan, document);
+}
+'''
+
+
+def _compile_field(spec: str) -> Dict[str, Any]:
+    selector = spec.strip()
+    plan: Dict[str, Any] = {'t': 'field', 'g': 'text'}
+    suffix = _SUFFIX_RE.search(selector)
+    if suffix is not None:
+        match = _GETTER_RE.fullmatch(suffix.group(1))
+        if match is None:
+            raise ValueError(f'Invalid field spec: {spec!r}')
+        selector = selector[:suffix.start()]
+        if match.group('attr'):
+            plan.update(g='attr', n=match.group('attr'))
+        elif match.group('prop'):
+            plan.update(g='prop', n=match.group('prop'))
+        else:
+            plan['g'] = match.group('getter')
+    plan['s'] = selector
+    return plan
+
+
+def compile_spec(spec: Any) -> Dict[str, Any]:
+    """Compile extraction ``spec`` to a plan for the in-page function.
+
+    See :meth:`pyppeteer.page.Page.extract` for the spec format. Raise
+    :class:`ValueError` if ``spec`` is invalid.
+    """
+    if isinstance(spec, str):
+        return _compile_field(spec)
+    if isinstance(spec, dict):
+        fields = dict()
+        for key, value in spec.items():
+            if not isinstance(key, str):
+                raise ValueError(f'Field name must be str: {key!r}')
+            fields[key] = compile_spec(value)
+        return {'t': 'obj', 'f': fields}
+    if isinstance(spec, (tuple, list)):
+        if len(spec) != 2 or not isinstance(spec[0], str) or not spec[0]:
+            raise ValueError(
+                f'List spec must be (selector, spec) pair: {spec!r}')
+        return {'t': 'all', 's': spec[0], 'f': compile_spec(spec[1])}
+    raise ValueError(f'Invalid extraction spec: {spec!r}')
@@ -15,7 +15,9 @@ from pyppeteer import helper
 from pyppeteer.connection import CDPSession
 from pyppeteer.element_handle import ElementHandle
 from pyppeteer.errors import NetworkError
-from pyppeteer.execution_context import ExecutionContext, JSHandle
+from pyppeteer.execution_context import ExecutionContext, HandleScope
+from pyppeteer.execution_context import JSHandle
+from pyppeteer.extract import EXTRACT_FUNCTION, compile_spec
 from pyppeteer.errors import ElementHandleError, PageError, TimeoutError
 from pyppeteer.util import merge_dict
 
@@ -41,6 +43,7 @@ class FrameManager(EventEmitter):
         self._frames: OrderedDict[str, Frame] = OrderedDict()
         self._mainFrame: Optional[Frame] = None
         self._contextIdToContext: Dict[str, ExecutionContext] = dict()
+        self._scriptCacheSize = 0
 
         client.on('Page.frameAttached',
                   lambda event: self._onFrameAttached(
@@ -183,6 +186,8 @@ class FrameManager(EventEmitter):
             _createJSHandle,
             frame,
         )
+        if self._scriptCacheSize:
+            context._setScriptCache(self._scriptCacheSize)
         self._contextIdToContext[contextPayload['id']] = context
 
         if frame:
@@ -193,6 +198,7 @@ class FrameManager(EventEmitter):
         if not context:
             return
         del self._contextIdToContext[executionContextId]
+        context._clearScriptCache()
 
         frame = context.frame
         if frame:
@@ -200,11 +206,17 @@ class FrameManager(EventEmitter):
 
     def _onExecutionContextsCleared(self) -> None:
         for context in self._contextIdToContext.values():
+            context._clearScriptCache()
             frame = context.frame
             if frame:
                 frame._removeExecutionContext(context)
         self._contextIdToContext.clear()
 
+    def _setScriptCache(self, size: int) -> None:
+        self._scriptCacheSize = size
+        for context in self._contextIdToContext.values():
+            context._setScriptCache(size)
+
     def executionContextById(self, contextId: str) -> ExecutionContext:
         """Get stored ``ExecutionContext`` by ``id``."""
         context = self._contextIdToContext.get(contextId)
@@ -251,6 +263,8 @@ class Frame(object):
         self._setDefaultContext(None)
 
         self._waitTasks: Set[WaitTask] = set()  # maybe list
+        self._waitDispatcherContext: Optional[ExecutionContext] = None
+        self._waitDispatcherPromise: Optional[Awaitable[JSHandle]] = None
         self._loaderId = ''
         self._lifecycleEvents: Set[str] = set()
         self._childFrames: Set[Frame] = set()  # maybe list
@@ -273,6 +287,8 @@ class Frame(object):
                 self._client._loop.create_task(waitTask.rerun())
         else:
             self._documentPromise = None
+            self._waitDispatcherContext = None
+            self._waitDispatcherPromise = None
             self._contextPromise = self._client._loop.create_future()
             self._contextResolveCallback = (
                 lambda _context: self._contextPromise.set_result(_context)
@@ -286,6 +302,29 @@ class Frame(object):
         """
         return await self._contextPromise
 
+    def _waitDispatcher(self, context: ExecutionContext
+                        ) -> Awaitable[JSHandle]:
+        """Get the wait dispatcher installed in ``context``.
+
+        The dispatcher is installed once per execution context and runs
+        predicates of all wait tasks of this frame on shared observers.
+        """
+        promise = self._waitDispatcherPromise
+        if promise is None or self._waitDispatcherContext is not context:
+            self._waitDispatcherContext = context
+            promise = self._client._loop.create_task(
+                context._evaluateHandle(
+                    waitDispatcherPageFunction, (), scoped=False))
+            self._waitDispatcherPromise = promise
+        return asyncio.shield(promise)
+
+    def handleScope(self) -> HandleScope:
+        """Make a scope to release handles created in this frame at once.
+
+        Details see :meth:`pyppeteer.page.Page.handleScope`.
+        """
+        return HandleScope(frame=self)
+
     async def evaluateHandle(self, pageFunction: str, *args: Any) -> JSHandle:
         """Execute function on this frame.
 
@@ -323,7 +362,9 @@ class Frame(object):
         context = await self.executionContext()
         if context is None:
             raise PageError('No context exists.')
-        document = (await context.evaluateHandle('document')).asElement()
+        # Cached while the context lives; not released by handle scopes.
+        document = (await context._evaluateHandle(
+            'document', (), scoped=False)).asElement()
         self._documentPromise = document
         if document is None:
             raise PageError('Could not find `document`.')
@@ -368,6 +409,16 @@ class Frame(object):
         value = await document.querySelectorAll(selector)
         return value
 
+    async def extract(self, spec: Any) -> Any:
+        """Extract data from this frame by declarative ``spec``.
+
+        Details see :meth:`pyppeteer.page.Page.extract`.
+        """
+        return await self._extract(compile_spec(spec))
+
+    async def _extract(self, plan: Dict[str, Any]) -> Any:
+        return await self.evaluate(EXTRACT_FUNCTION, plan)
+
     #: Alias to :meth:`querySelector`
     J = querySelector
     #: Alias to :meth:`xpath`
@@ -725,35 +776,18 @@ function(html) {
         timeout = options.get('timeout', 30000)
         waitForVisible = bool(options.get('visible'))
         waitForHidden = bool(options.get('hidden'))
-        polling = 'raf' if waitForHidden or waitForVisible else 'mutation'
+        polling = options.get(
+            'polling',
+            'raf' if waitForHidden or waitForVisible else 'mutation',
+        )
         title = '{} "{}"{}'.format(
             'XPath' if isXPath else 'selector',
             selectorOrXPath,
             ' to be hidden' if waitForHidden else '',
         )
 
-        predicate = '''
-(selectorOrXPath, isXPath, waitForVisible, waitForHidden) => {
-    const node = isXPath
-        ? document.evaluate(selectorOrXPath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
-        : document.querySelector(selectorOrXPath);
-    if (!node)
-        return waitForHidden;
-    if (!waitForVisible && !waitForHidden)
-        return node;
-    const element = /** @type {Element} */ (node.nodeType === Node.TEXT_NODE ? node.parentElement : node);
-
-    const style = window.getComputedStyle(element);
-    const isVisible = style && style.visibility !== 'hidden' && hasVisibleBoundingBox();
-    const success = (waitForVisible === isVisible || waitForHidden === !isVisible)
-    return success ? node : null
-
-    function hasVisibleBoundingBox() {
-        const rect = element.getBoundingClientRect();
-        return !!(rect.top || rect.bottom || rect.width || rect.height);
-    }
-}
-        '''  # noqa: E501
+        # Predicate is built in the wait dispatcher of the page.
+        predicate = '(...args) => $pyppeteer.selector(...args)'
 
         return WaitTask(
             self,
@@ -807,11 +841,16 @@ class WaitTask(object):
     Instance of this class is awaitable.
     """
 
+    #: Available polling modes other than an interval.
+    Pollings = ('raf', 'mutation', 'idle', 'backoff')
+
+    _lastId = 0
+
     def __init__(self, frame: Frame, predicateBody: str,  # noqa: C901
                  title: str, polling: Union[str, int], timeout: float,
                  loop: asyncio.AbstractEventLoop, *args: Any) -> None:
         if isinstance(polling, str):
-            if polling not in ['raf', 'mutation']:
+            if polling not in self.Pollings:
                 raise ValueError(f'Unknown polling: {polling}')
         elif isinstance(polling, (int, float)):
             if polling <= 0:
@@ -830,6 +869,10 @@ class WaitTask(object):
         else:
             self._predicateBody = f'return {predicateBody}'
         self._args = args
+        WaitTask._lastId += 1
+        self._id = WaitTask._lastId
+        self._invocations = 0
+        self._predicateTime = 0.0
         self._runCount = 0
         self._terminated = False
         self._timeoutError = False
@@ -855,6 +898,22 @@ class WaitTask(object):
             raise result
         return result
 
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Statistics of the predicate evaluation of this task.
+
+        * ``invocations`` (int): Number of times the predicate was called.
+        * ``predicateTime`` (float): Total time spent in the predicate in
+          milliseconds.
+
+        Statistics are updated when the predicate in the page settles
+        (returns a truthy value or times out).
+        """
+        return {
+            'invocations': self._invocations,
+            'predicateTime': self._predicateTime,
+        }
+
     def terminate(self, error: Exception) -> None:
         """Terminate this task."""
         self._terminated = True
@@ -867,22 +926,29 @@ class WaitTask(object):
         runCount = self._runCount = self._runCount + 1
         success: Optional[JSHandle] = None
         error = None
+        isFalsy = False
 
         try:
             context = await self._frame.executionContext()
             if context is None:
                 raise PageError('No execution context.')
+            dispatcher = await self._frame._waitDispatcher(context)
             success = await context.evaluateHandle(
-                waitForPredicatePageFunction,
+                '(dispatcher, ...args) => dispatcher.wait(...args)',
+                dispatcher,
+                self._id,
                 self._predicateBody,
                 self._polling,
                 self._timeout,
                 *self._args,
             )
+            isFalsy = await self._settle(context, dispatcher, success)
         except Exception as e:
             error = e
 
         if self.promise.done():
+            if success:
+                await success.dispose()
             return
 
         if self._terminated or runCount != self._runCount:
@@ -890,15 +956,8 @@ class WaitTask(object):
                 await success.dispose()
             return
 
-        # Add try/except referring to puppeteer.
-        try:
-            if not error and success and (
-                    await self._frame.evaluate('s => !s', success)):
-                await success.dispose()
-                return
-        except NetworkError:
-            if success is not None:
-                await success.dispose()
+        if not error and isFalsy and success:
+            await success.dispose()
             return
 
         # page is navigated and context is destroyed.
@@ -919,96 +978,178 @@ class WaitTask(object):
 
         self._cleanup()
 
+    async def _settle(self, context: ExecutionContext, dispatcher: JSHandle,
+                      success: JSHandle) -> bool:
+        """Collect statistics and return if ``success`` is falsy."""
+        try:
+            isFalsy, stats = await context.evaluate(
+                '(s, dispatcher, id) => [!s, dispatcher.takeStats(id)]',
+                success, dispatcher, self._id)
+        except NetworkError:
+            return True
+        if stats:
+            self._invocations += stats['invocations']
+            self._predicateTime += stats['time']
+        return isFalsy
+
     def _cleanup(self) -> None:
         if self._timeout and not self._timeoutError:
             self._timeoutTimer.cancel()
         self._frame._waitTasks.remove(self)
 
 
-waitForPredicatePageFunction = """
-async function waitForPredicatePageFunction(predicateBody, polling, timeout, ...args) {
-  const predicate = new Function('...args', predicateBody);
-  let timedOut = false;
-  if (timeout)
-    setTimeout(() => timedOut = true, timeout);
-  if (polling === 'raf')
-    return await pollRaf();
-  if (polling === 'mutation')
-    return await pollMutation();
-  if (typeof polling === 'number')
-    return await pollInterval(polling);
-
-  /**
-   * @return {!Promise<*>}
-   */
-  function pollMutation() {
-    const success = predicate.apply(null, args);
+waitDispatcherPageFunction = """
+function createWaitDispatcher() {
+  // Pending predicates grouped by polling. Each group shares one observer,
+  // rAF loop, idle callback loop or interval timer, which stops when the
+  // group becomes empty. Backoff polling has a timer per predicate.
+  const BACKOFF_MIN = 10;
+  const BACKOFF_MAX = 1000;
+  const IDLE_TIMEOUT = 1000;
+  const channels = new Map();
+  const backoffs = new Set();
+  const builtins = {selector};
+  const stats = new Map();
+  return {wait, pending, takeStats};
+
+  function wait(id, predicateBody, polling, timeout, ...args) {
+    const compiled = new Function('$pyppeteer', '...args', predicateBody);
+    const stat = {invocations: 0, time: 0};
+    stats.set(id, stat);
+    const predicate = () => {
+      const start = performance.now();
+      try {
+        return compiled(builtins, ...args);
+      } finally {
+        stat.invocations++;
+        stat.time += performance.now() - start;
+      }
+    };
+    const success = predicate();
     if (success)
       return Promise.resolve(success);
-
-    let fulfill;
-    const result = new Promise(x => fulfill = x);
-    const observer = new MutationObserver(mutations => {
-      if (timedOut) {
-        observer.disconnect();
-        fulfill();
+    return new Promise((fulfill, reject) => {
+      let timer = null;
+      const remove = add(polling, () => {
+        let success;
+        try {
+          success = predicate();
+        } catch (e) {
+          done();
+          reject(e);
+          return;
+        }
+        if (success) {
+          done();
+          fulfill(success);
+        }
+      });
+      if (timeout)
+        timer = setTimeout(() => { done(); fulfill(); }, timeout);
+
+      function done() {
+        remove();
+        clearTimeout(timer);
       }
-      const success = predicate.apply(null, args);
-      if (success) {
-        observer.disconnect();
-        fulfill(success);
-      }
-    });
-    observer.observe(document, {
-      childList: true,
-      subtree: true,
-      attributes: true
     });
-    return result;
   }
 
-  /**
-   * @return {!Promise<*>}
-   */
-  function pollRaf() {
-    let fulfill;
-    const result = new Promise(x => fulfill = x);
-    onRaf();
-    return result;
-
-    function onRaf() {
-      if (timedOut) {
-        fulfill();
-        return;
+  function pending(polling) {
+    if (polling === 'backoff')
+      return backoffs.size;
+    const channel = channels.get(polling);
+    return channel ? channel.waiters.size : 0;
+  }
+
+  function takeStats(id) {
+    const stat = stats.get(id) || null;
+    stats.delete(id);
+    return stat;
+  }
+
+  function add(polling, waiter) {
+    if (polling === 'backoff')
+      return addBackoff(waiter);
+    let channel = channels.get(polling);
+    if (!channel) {
+      const waiters = new Set();
+      const run = () => {
+        for (const w of Array.from(waiters))
+          w();
+      };
+      channel = {waiters, stop: start(polling, run)};
+      channels.set(polling, channel);
+    }
+    channel.waiters.add(waiter);
+    return () => {
+      channel.waiters.delete(waiter);
+      if (!channel.waiters.size && channels.get(polling) === channel) {
+        channels.delete(polling);
+        channel.stop();
       }
-      const success = predicate.apply(null, args);
-      if (success)
-        fulfill(success);
-      else
-        requestAnimationFrame(onRaf);
+    };
+  }
+
+  function addBackoff(waiter) {
+    let delay = BACKOFF_MIN;
+    let id = setTimeout(function onTimeout() {
+      delay = Math.min(delay * 2, BACKOFF_MAX);
+      id = setTimeout(onTimeout, delay);
+      waiter();
+    }, delay);
+    backoffs.add(waiter);
+    return () => {
+      backoffs.delete(waiter);
+      clearTimeout(id);
+    };
+  }
+
+  function start(polling, run) {
+    if (polling === 'raf') {
+      let id = requestAnimationFrame(function onRaf() {
+        id = requestAnimationFrame(onRaf);
+        run();
+      });
+      return () => cancelAnimationFrame(id);
+    }
+    if (polling === 'idle') {
+      let id = requestIdleCallback(function onIdle() {
+        id = requestIdleCallback(onIdle, {timeout: IDLE_TIMEOUT});
+        run();
+      }, {timeout: IDLE_TIMEOUT});
+      return () => cancelIdleCallback(id);
     }
+    if (polling === 'mutation') {
+      const observer = new MutationObserver(run);
+      observer.observe(document, {
+        childList: true,
+        subtree: true,
+        attributes: true
+      });
+      return () => observer.disconnect();
+    }
+    const id = setInterval(run, polling);
+    return () => clearInterval(id);
   }
 
-  /**
-   * @param {number} pollInterval
-   * @return {!Promise<*>}
-   */
-  function pollInterval(pollInterval) {
-    let fulfill;
-    const result = new Promise(x => fulfill = x);
-    onTimeout();
-    return result;
-
-    function onTimeout() {
-      if (timedOut) {
-        fulfill();
-        return;
-      }
-      const success = predicate.apply(null, args);
-      if (success)
-        fulfill(success);
-      else
-        setTimeout(onTimeout, pollInterval);
+  function selector(selectorOrXPath, isXPath, waitForVisible, waitForHidden) {
+    const node = isXPath
+      ? document.evaluate(selectorOrXPath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+      : document.querySelector(selectorOrXPath);
+    if (!node)
+      return waitForHidden;
+    if (!waitForVisible && !waitForHidden)
+      return node;
+    const element = /** @type {Element} */ (node.nodeType === Node.TEXT_NODE ? node.parentElement : node);
+
+    const style = window.getComputedStyle(element);
+    const isVisible = style && style.visibility !== 'hidden' && hasVisibleBoundingBox();
+    const success = (waitForVisible === isVisible || waitForHidden === !isVisible);
+    return success ? node : null;
+
+    function hasVisibleBoundingBox() {
+      const rect = element.getBoundingClientRect();
+      return !!(rect.top || rect.bottom || rect.width || rect.height);
     }
   }
 }
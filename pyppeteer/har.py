@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""HAR (HTTP Archive) module.
+
+:class:`HAR` records requests of a page to a `HAR 1.2
+<http://www.softwareishard.com/blog/har-12-spec/>`_ file and replays
+recorded responses through request interception.
+"""
+
+import asyncio
+import base64
+from datetime import datetime, timezone
+from http.client import responses as statusTexts
+import json
+import logging
+from pathlib import Path
+import time
+from typing import Any, Dict, IO, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from pyppeteer import helper
+from pyppeteer.errors import PageError
+from pyppeteer.helper import debugError
+from pyppeteer.network_manager import NetworkManager, Request
+from pyppeteer.util import merge_dict
+
+logger = logging.getLogger(__name__)
+
+# Headers which do not apply to the decoded body of the recorded content.
+_bodyHeaders = frozenset([
+    'content-encoding',
+    'content-length',
+    'transfer-encoding',
+])
+
+
+def _nameValues(items: Any) -> List[Dict[str, str]]:
+    return [{'name': k, 'value': v} for k, v in items]
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class HAR(object):
+    """HAR class.
+
+    Record requests of a page to a HAR file by :meth:`start` and
+    :meth:`stop`, and replay the file by :meth:`replay`.
+
+    .. code::
+
+        await page.har.start('example.har', content=True)
+        await page.goto('https://example.com')
+        await page.har.stop()
+
+        # Later, without network:
+        await page.har.replay('example.har')
+        await page.goto('https://example.com')
+    """
+
+    def __init__(self, networkManager: NetworkManager) -> None:
+        self._networkManager = networkManager
+        self._loop = networkManager._client._loop
+        self._file: Optional[IO[str]] = None
+        self._count = 0
+        self._content = False
+        self._eventListeners: List[Dict] = list()
+        # Request to (start time, response time).
+        self._timings: Dict[Request, List[Optional[float]]] = dict()
+        self._pending: List[asyncio.Task] = list()
+        self._replay: Optional[HarReplay] = None
+
+    @property
+    def recording(self) -> bool:
+        """Whether recording is in progress."""
+        return self._file is not None
+
+    async def start(self, path: Union[str, Path], options: dict = None,
+                    **kwargs: Any) -> None:
+        """Start recording requests to ``path``.
+
+        Each request is written to the file as soon as it is finished or
+        failed, so memory usage does not grow with the number of requests.
+        The file is a valid HAR after :meth:`stop`.
+
+        Available options are:
+
+        * ``content`` (bool): Record response bodies. Defaults to ``False``.
+        """
+        if self._file is not None:
+            raise PageError('HAR recording is already started.')
+        options = merge_dict(options, kwargs)
+        from pyppeteer import __version__
+        self._content = bool(options.get('content'))
+        self._count = 0
+        self._file = Path(path).open('w', encoding='utf-8')
+        creator = {'name': 'pyppeteer', 'version': __version__}
+        self._file.write('{"log": {"version": "1.2", "creator": '
+                         f'{json.dumps(creator)}, "pages": [], "entries": [')
+        nm = self._networkManager
+        self._eventListeners = [
+            helper.addEventListener(
+                nm, NetworkManager.Events.Request, self._onRequest),
+            helper.addEventListener(
+                nm, NetworkManager.Events.Response, self._onResponse),
+            helper.addEventListener(
+                nm, NetworkManager.Events.RequestFinished, self._onFinished),
+            helper.addEventListener(
+                nm, NetworkManager.Events.RequestFailed, self._onFinished),
+        ]
+
+    async def stop(self) -> None:
+        """Stop recording and finish the HAR file.
+
+        Requests which are not finished yet are not recorded.
+        """
+        if self._file is None:
+            raise PageError('HAR recording is not started.')
+        helper.removeEventListeners(self._eventListeners)
+        if self._pending:
+            await asyncio.gather(*self._pending)
+        self._file.write('\n]}}\n')
+        self._file.close()
+        self._file = None
+        self._timings.clear()
+
+    def _onRequest(self, request: Request) -> None:
+        self._timings[request] = [time.time(), None]
+
+    def _onResponse(self, response: Any) -> None:
+        timing = self._timings.get(response.request)
+        if timing is not None:
+            timing[1] = time.time()
+
+    def _onFinished(self, request: Request) -> None:
+        timing = self._timings.pop(request, None)
+        if timing is None:
+            return
+        end = time.time()
+        if not self._content or request.response is None:
+            self._write(self._entry(request, timing, end, None))
+            return
+        task = self._loop.create_task(self._record(request, timing, end))
+        self._pending.append(task)
+        task.add_done_callback(self._pending.remove)
+
+    async def _record(self, request: Request, timing: List[Optional[float]],
+                      end: float) -> None:
+        body: Optional[bytes] = None
+        try:
+            body = await request.response.buffer()  # type: ignore
+        except Exception as e:
+            # e.g. redirect responses, or the page is closed.
+            debugError(logger, e)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        if self._file is not None:
+            self._write(self._entry(request, timing, end, body))
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        self._file.write(',\n' if self._count else '\n')  # type: ignore
+        self._file.write(json.dumps(entry))  # type: ignore
+        self._count += 1
+
+    def _entry(self, request: Request, timing: List[Optional[float]],
+               end: float, body: Optional[bytes]) -> Dict[str, Any]:
+        start, responded = timing
+        responded = responded or end
+        entry = {
+            'startedDateTime': _isoformat(start),  # type: ignore
+            'time': (end - start) * 1000,  # type: ignore
+            'request': self._request(request),
+            'response': self._response(request, body),
+            'cache': {},
+            'timings': {
+                'send': 0,
+                'wait': (responded - start) * 1000,  # type: ignore
+                'receive': (end - responded) * 1000,
+            },
+            '_resourceType': request.resourceType,
+        }
+        if request.failure():
+            entry['_failureText'] = request.failure()['errorText']  # type: ignore  # noqa: E501
+        return entry
+
+    def _request(self, request: Request) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            'method': request.method,
+            'url': request.url,
+            'httpVersion': '',
+            'cookies': [],
+            'headers': _nameValues(request.headers.items()),
+            'queryString': _nameValues(parse_qsl(
+                urlsplit(request.url).query, keep_blank_values=True)),
+            'headersSize': -1,
+            'bodySize': len(request.postData or ''),
+        }
+        if request.postData is not None:
+            result['postData'] = {
+                'mimeType': request.headers.get('content-type', ''),
+                'text': request.postData,
+            }
+        return result
+
+    def _response(self, request: Request, body: Optional[bytes]
+                  ) -> Dict[str, Any]:
+        response = request.response
+        status = response.status if response else 0
+        headers = response.headers if response else {}
+        content: Dict[str, Any] = {
+            'size': len(body) if body is not None else -1,
+            'mimeType': headers.get('content-type', ''),
+        }
+        if body is not None:
+            try:
+                content['text'] = body.decode('utf-8')
+            except UnicodeDecodeError:
+                content['text'] = base64.b64encode(body).decode('ascii')
+                content['encoding'] = 'base64'
+        return {
+            'status': status,
+            'statusText': statusTexts.get(status, ''),
+            'httpVersion': '',
+            'cookies': [],
+            'headers': _nameValues(headers.items()),
+            'content': content,
+            'redirectURL': headers.get('location', ''),
+            'headersSize': -1,
+            'bodySize': -1,
+        }
+
+    async def replay(self, path: Union[str, Path], options: dict = None,
+                     **kwargs: Any) -> None:
+        """Serve requests from the HAR file of ``path``.
+
+        Requests are paused on the ``Fetch`` domain and fulfilled with the
+        recorded response of the same method and URL. If the URL is recorded
+        multiple times, the responses are served in the recorded order and
+        the last one is repeated. Failed requests are failed again. Rules of
+        :meth:`~pyppeteer.page.Page.addRoute` take precedence.
+
+        Available options are:
+
+        * ``notFound`` (str): What to do with requests not in the file;
+          ``abort`` (default) fails them, so that no request goes to the
+          network, and ``continue`` sends them to the network.
+
+        The ``Fetch`` domain is available on Chromium 74 or later. On older
+        browsers, raise :class:`~pyppeteer.errors.BrowserError`.
+        """
+        options = merge_dict(options, kwargs)
+        with Path(path).open(encoding='utf-8') as f:
+            har = json.load(f)
+        replay = HarReplay(har['log']['entries'],
+                           options.get('notFound', 'abort'))
+        await self._networkManager.setReplay(replay)
+        self._replay = replay
+
+    async def stopReplay(self) -> None:
+        """Stop serving requests from the HAR file."""
+        self._replay = None
+        await self._networkManager.setReplay(None)
+
+
+class HarReplay(object):
+    """Responses of a HAR file to serve paused requests."""
+
+    def __init__(self, entries: List[Dict[str, Any]], notFound: str = 'abort'
+                 ) -> None:
+        if notFound not in ('abort', 'continue'):
+            raise ValueError(f'Unknown notFound option: {notFound}')
+        self._notFound = notFound
+        self._entries: Dict[Tuple[str, str], List[Dict[str, Any]]] = dict()
+        for entry in entries:
+            request = entry['request']
+            key = (request['method'], request['url'])
+            self._entries.setdefault(key, []).append(entry)
+
+    def _patterns(self) -> List[Dict[str, str]]:
+        return [{'urlPattern': '*', 'requestStage': 'Request'}]
+
+    def _command(self, event: Dict) -> Optional[Dict[str, Any]]:
+        """Get protocol command to serve paused request.
+
+        Return ``None`` if the request should be continued.
+        """
+        requestId = event['requestId']
+        request = event.get('request', {})
+        entries = self._entries.get(
+            (request.get('method'), request.get('url')))
+        if not entries:
+            if self._notFound == 'continue':
+                return None
+            return {'method': 'Fetch.failRequest', 'params': {
+                'requestId': requestId, 'errorReason': 'InternetDisconnected'}}
+        entry = entries.pop(0) if len(entries) > 1 else entries[0]
+        response = entry['response']
+        if not response.get('status'):
+            return {'method': 'Fetch.failRequest', 'params': {
+                'requestId': requestId, 'errorReason': 'Failed'}}
+        content = response.get('content', {})
+        text = content.get('text', '')
+        if content.get('encoding') == 'base64':
+            body = base64.b64decode(text)
+        else:
+            body = text.encode('utf-8')
+        return {'method': 'Fetch.fulfillRequest', 'params': {
+            'requestId': requestId,
+            'responseCode': response['status'],
+            'responseHeaders': [
+                h for h in response.get('headers', [])
+                if h['name'].lower() not in _bodyHeaders],
+            'body': base64.b64encode(body).decode('ascii'),
+        }}
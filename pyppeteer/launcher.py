@@ -6,30 +6,30 @@
 import asyncio
 import atexit
 from copy import copy
-import json
-from urllib.request import urlopen
-from urllib.error import URLError
 import logging
 import os
 import os.path
 from pathlib import Path
-import shutil
+import re
 import signal
 import subprocess
 import sys
 import tempfile
-import time
-from typing import Any, Dict, List, TYPE_CHECKING
+import threading
+from typing import Any, AsyncIterator, Awaitable, Dict, IO, List
+from typing import TYPE_CHECKING
 
 from pyppeteer import __pyppeteer_home__
 from pyppeteer.browser import Browser
 from pyppeteer.connection import Connection
 from pyppeteer.chromium_downloader import current_platform
-from pyppeteer.errors import BrowserError
+from pyppeteer.errors import BrowserError, TimeoutError
 from pyppeteer.helper import addEventListener, debugError, removeEventListeners
+from pyppeteer.pipe_transport import PipeTransport, create_pipes
+from pyppeteer.pipe_transport import redirect_browser_pipes
+from pyppeteer.profile import clone_profile, get_reaper, mark_owner
 from pyppeteer.target import Target
-from pyppeteer.util import check_chromium, chromium_executable
-from pyppeteer.util import download_chromium, merge_dict, get_free_port
+from pyppeteer.util import chromium_executable, install_chromium, merge_dict
 
 if TYPE_CHECKING:
     from typing import Optional  # noqa: F401
@@ -71,8 +71,11 @@ class Launcher(object):
         """Make new launcher."""
         options = merge_dict(options, kwargs)
 
-        self.port = get_free_port()
-        self.url = f'http://127.0.0.1:{self.port}'
+        self.pipe = bool(options.get('pipe', False))
+        if self.pipe and current_platform().startswith('win'):
+            raise BrowserError('`pipe` option is not supported on Windows.')
+        # Let chrome pick a free port; the endpoint is read from its output.
+        self.port: Optional[int] = None if self.pipe else 0
         self._loop = options.get('loop', asyncio.get_event_loop())
         self.chromeClosed = True
 
@@ -89,6 +92,14 @@ class Launcher(object):
         self.slowMo = options.get('slowMo', 0)
         self.timeout = options.get('timeout', 30000)
         self.autoClose = options.get('autoClose', True)
+        self.flatten = options.get('flatten', False)
+        self.jsonCodec = options.get('jsonCodec', 'auto')
+        self.profileTemplate = options.get('profileTemplate')
+        self.profileTemplateMethod = options.get('profileTemplateMethod',
+                                                 'auto')
+        if self.profileTemplate and not os.path.isdir(self.profileTemplate):
+            raise BrowserError(
+                f'Profile template not found: {self.profileTemplate}')
 
         logLevel = options.get('logLevel')
         if logLevel:
@@ -109,54 +120,77 @@ class Launcher(object):
 
         if not any(arg for arg in self.chromeArguments
                    if arg.startswith('--remote-debugging-')):
-            self.chromeArguments.append(f'--remote-debugging-port={self.port}')
+            if self.pipe:
+                self.chromeArguments.append('--remote-debugging-pipe')
+            else:
+                self.chromeArguments.append(
+                    f'--remote-debugging-port={self.port}')
 
         if not any(arg for arg in self.chromeArguments
                    if arg.startswith('--user-data-dir')):
             if not CHROME_PROFILE_PATH.exists():
                 CHROME_PROFILE_PATH.mkdir(parents=True)
             self.temporaryUserDataDir = tempfile.mkdtemp(dir=str(CHROME_PROFILE_PATH))  # noqa: E501
+            mark_owner(self.temporaryUserDataDir)
             self.chromeArguments.append(f'--user-data-dir={self.temporaryUserDataDir}')  # noqa: E501
 
         self.chromeExecutable = executablePath
         if not self.chromeExecutable:
-            if not check_chromium():
-                download_chromium()
-            self.chromeExecutable = str(chromium_executable())
+            self.chromeExecutable = str(
+                install_chromium(options.get('chromiumRevision')))
 
         self.cmd = [self.chromeExecutable] + self.chromeArguments
 
     def _cleanup_tmp_user_data_dir(self) -> None:
-        for retry in range(100):
-            if self.temporaryUserDataDir and os.path.exists(
-                    self.temporaryUserDataDir):
-                shutil.rmtree(self.temporaryUserDataDir, ignore_errors=True)
-                if os.path.exists(self.temporaryUserDataDir):
-                    time.sleep(0.01)
-            else:
-                break
-        else:
-            raise IOError('Unable to remove Temporary User Data')
+        # Deleting a large profile takes time; do it in background thread.
+        if self.temporaryUserDataDir:
+            get_reaper().reap(self.temporaryUserDataDir)
 
     async def launch(self) -> Browser:  # noqa: C901
         """Start chrome process and return `Browser` object."""
         self.chromeClosed = False
         self.connection: Optional[Connection] = None
+        get_reaper().sweep(CHROME_PROFILE_PATH)
+
+        if self.profileTemplate and self.temporaryUserDataDir:
+            await self._loop.run_in_executor(
+                None, clone_profile, self.profileTemplate,
+                self.temporaryUserDataDir, self.profileTemplateMethod)
 
         options = dict()
         options['env'] = self.env
-        if not self.dumpio:
+        if self.dumpio:
+            options['stderr'] = subprocess.PIPE
+        else:
             options['stdout'] = subprocess.PIPE
             options['stderr'] = subprocess.STDOUT
-
-        self.proc = subprocess.Popen(  # type: ignore
-            self.cmd,
-            **options,
-        )
+        if self.pipe:
+            (pipeRead, pipeWrite), browserPipes = create_pipes()
+            options['preexec_fn'] = lambda: redirect_browser_pipes(
+                *browserPipes)
+            # Keep only fd 3 and 4 made by ``redirect_browser_pipes``.
+            options['pass_fds'] = (3, 4)
+
+        try:
+            self.proc = subprocess.Popen(  # type: ignore
+                self.cmd,
+                **options,
+            )
+        finally:
+            if self.pipe:
+                # Browser side of pipes are now owned by the browser process
+                for fd in browserPipes:
+                    os.close(fd)
+        # The endpoint is not printed when connected over pipes.
+        self._endpointFuture: Optional[asyncio.Future] = (
+            None if self.pipe else self._loop.create_future())
+        output = self.proc.stderr if self.dumpio else self.proc.stdout
+        self._readOutput(output)  # type: ignore
 
         def _close_process(*args: Any, **kwargs: Any) -> None:
             if not self.chromeClosed:
                 self._loop.run_until_complete(self.killChrome())
+                get_reaper().join()
 
         # don't forget to close browser process
         if self.autoClose:
@@ -171,12 +205,25 @@ class Launcher(object):
                 signal.signal(signal.SIGHUP, _close_process)
 
         connectionDelay = self.slowMo
-        self.browserWSEndpoint = self._get_ws_endpoint()
-        logger.info(f'Browser listening on: {self.browserWSEndpoint}')
+        if self.pipe:
+            self.browserWSEndpoint = ''
+            transport = PipeTransport(pipeRead, pipeWrite, self._loop)
+        else:
+            try:
+                self.browserWSEndpoint = await self._get_ws_endpoint()
+            except Exception:
+                self.waitForChromeToClose()
+                self._cleanup_tmp_user_data_dir()
+                raise
+            logger.info(f'Browser listening on: {self.browserWSEndpoint}')
+            transport = None
         self.connection = Connection(
             self.browserWSEndpoint,
             self._loop,
             connectionDelay,
+            self.flatten,
+            self.jsonCodec,
+            transport,
         )
         browser = await Browser.create(
             self.connection, [], self.ignoreHTTPSErrors, self.defaultViewport,
@@ -203,23 +250,58 @@ class Launcher(object):
         await initialPagePromise
         removeEventListeners(listeners)
 
-    def _get_ws_endpoint(self) -> str:
-        url = self.url + '/json/version'
-        while self.proc.poll() is None:
-            time.sleep(0.1)
-            try:
-                with urlopen(url) as f:
-                    data = json.loads(f.read().decode())
-                break
-            except URLError:
-                continue
-        else:
-            raise BrowserError(
-                'Browser closed unexpectedly:\n{}'.format(
-                    self.proc.stdout.read().decode()
-                )
+    def _readOutput(self, output: IO[bytes]) -> None:  # noqa: C901
+        """Read browser output in a background thread.
+
+        Find the endpoint from ``DevTools listening on ws://...`` line, and
+        keep reading after that so that the browser never blocks on writing
+        to a full pipe. If ``dumpio`` is enabled, output is written to
+        ``sys.stderr``.
+        """
+        lines: List[str] = []
+        future = self._endpointFuture
+
+        def resolve(endpoint: str) -> None:
+            if future is not None and not future.done():
+                future.set_result(endpoint)
+
+        def reject() -> None:
+            if future is not None and not future.done():
+                future.set_exception(BrowserError(
+                    'Browser closed unexpectedly:\n' + ''.join(lines)))
+
+        def read() -> None:
+            for data in iter(output.readline, b''):
+                line = data.decode('utf-8', 'replace')
+                if self.dumpio:
+                    sys.stderr.write(line)
+                    sys.stderr.flush()
+                if future is None or future.done():
+                    continue
+                lines.append(line)
+                match = re.match(r'^DevTools listening on (ws://.*)$', line)
+                if match:
+                    self._loop.call_soon_threadsafe(
+                        resolve, match.group(1).strip())
+            output.close()
+            if not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(reject)
+
+        threading.Thread(target=read, daemon=True).start()
+
+    async def _get_ws_endpoint(self) -> str:
+        if self._endpointFuture is None:
+            raise BrowserError('Browser is connected over pipes.')
+        try:
+            return await asyncio.wait_for(
+                self._endpointFuture,
+                self.timeout / 1000 if self.timeout else None,
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f'Timed out after {self.timeout} ms while trying to connect '
+                'to the browser.'
             )
-        return data['webSocketDebuggerUrl']
 
     def waitForChromeToClose(self) -> None:
         """Terminate chrome."""
@@ -261,6 +343,10 @@ async def launch(options: dict = None, **kwargs: Any) -> Browser:
       ``True`` unless ``appMode`` or ``devtools`` options is ``True``.
     * ``executablePath`` (str): Path to a Chromium or Chrome executable to run
       instead of default bundled Chromium.
+    * ``chromiumRevision`` (str): Revision of the bundled Chromium to run.
+      Defaults to ``$PYPPETEER_CHROMIUM_REVISION`` or
+      ``pyppeteer.__chromium_revision__``. The revision is downloaded if not
+      installed yet. Ignored if ``executablePath`` is specified.
     * ``slowMo`` (int|float): Slow down pyppeteer operations by the specified
       amount of milliseconds.
     * ``defaultViewport`` (dict): Set a consistent viewport for each page.
@@ -291,6 +377,16 @@ async def launch(options: dict = None, **kwargs: Any) -> Browser:
       ``True``.
     * ``dumpio`` (bool): Whether to pipe the browser process stdout and stderr
       into ``process.stdout`` and ``process.stderr``. Defaults to ``False``.
+    * ``profileTemplate`` (str): Path to a profile directory to clone into the
+      temporary user data directory, so that the browser starts with warm
+      caches and without first-run setup. Ignored if ``userDataDir`` is
+      specified. See :func:`~pyppeteer.profile.create_profile_template`.
+    * ``profileTemplateMethod`` (str): How to clone ``profileTemplate``; one
+      of ``'auto'``, ``'reflink'``, ``'hardlink'``, or ``'copy'``. See
+      :func:`~pyppeteer.profile.clone_profile`. Defaults to ``'auto'``.
+    * ``timeout`` (int): Maximum time in milliseconds to wait for the browser
+      to start. Pass ``0`` to disable timeout. Defaults to ``30000`` (30
+      seconds).
     * ``userDataDir`` (str): Path to a user data directory.
     * ``env`` (dict): Specify environment variables that will be visible to the
       browser. Defaults to same as python process.
@@ -301,6 +397,20 @@ async def launch(options: dict = None, **kwargs: Any) -> Browser:
       root logger.
     * ``autoClose`` (bool): Automatically close browser process when script
       completed. Defaults to ``True``.
+    * ``flatten`` (bool): Attach to targets in flatten mode of the devtools
+      protocol. Session messages are sent and received without double JSON
+      encoding via ``Target.sendMessageToTarget``. Requires the browser which
+      supports the ``flatten`` parameter of ``Target.attachToTarget``.
+      Defaults to ``False``.
+    * ``jsonCodec`` (str|JSONCodec): JSON library to encode/decode protocol
+      messages; one of ``'auto'``, ``'orjson'``, ``'msgspec'``, ``'json'``, or
+      an instance of :class:`~pyppeteer.codec.JSONCodec`. ``'auto'`` uses
+      orjson or msgspec if installed, otherwise the standard library.
+      Defaults to ``'auto'``.
+    * ``pipe`` (bool): Connect to the browser over pipes
+      (``--remote-debugging-pipe``) instead of WebSocket. No TCP port is
+      used, and :attr:`~pyppeteer.browser.Browser.wsEndpoint` is empty.
+      Not supported on Windows. Defaults to ``False``.
     * ``loop`` (asyncio.AbstractEventLoop): Event loop (**experimental**).
     * ``appMode`` (bool): Deprecated.
 
@@ -330,6 +440,57 @@ async def launch(options: dict = None, **kwargs: Any) -> Browser:
     return await Launcher(options, **kwargs).launch()
 
 
+def launch_many(n: int, options: dict = None, **kwargs: Any
+                ) -> AsyncIterator[Browser]:
+    """Start ``n`` chrome processes in parallel.
+
+    Return an async iterator which yields
+    :class:`~pyppeteer.browser.Browser` objects in the order they become
+    ready. Available options are the same as :func:`launch`.
+
+    The executable check (and download of chromium if necessary) and
+    preparation of the profile directory are done only once before
+    launching browsers. Each browser gets its own temporary user data
+    directory unless ``userDataDir`` is specified.
+
+    .. code::
+
+        async for browser in launch_many(8, headless=True):
+            browsers.append(browser)
+
+    All ``n`` browsers are launched even if the iteration is stopped early;
+    the caller is responsible for closing them. If launching a browser
+    fails, the exception is raised at its turn of the iteration.
+    """
+    options = merge_dict(options, kwargs)
+    if not options.get('executablePath'):
+        options['executablePath'] = str(
+            install_chromium(options.get('chromiumRevision')))
+    if not CHROME_PROFILE_PATH.exists():
+        CHROME_PROFILE_PATH.mkdir(parents=True)
+    loop = options.get('loop', asyncio.get_event_loop())
+    tasks = [loop.create_task(Launcher(options).launch()) for _ in range(n)]
+    return _BrowserIterator(tasks)
+
+
+class _BrowserIterator(object):
+    """Async iterator of browsers launched by :func:`launch_many`."""
+
+    def __init__(self, tasks: List[Awaitable[Browser]]) -> None:
+        self._tasks = tasks
+        self._iterator = iter(asyncio.as_completed(tasks))
+
+    def __aiter__(self) -> '_BrowserIterator':
+        return self
+
+    async def __anext__(self) -> Browser:
+        try:
+            fut = next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+        return await fut
+
+
 async def connect(options: dict = None, **kwargs: Any) -> Browser:
     """Connect to the existing chrome.
 
@@ -361,6 +522,10 @@ async def connect(options: dict = None, **kwargs: Any) -> Browser:
       milliseconds.
     * ``logLevel`` (int|str): Log level to print logs. Defaults to same as the
       root logger.
+    * ``flatten`` (bool): Attach to targets in flatten mode of the devtools
+      protocol. See :func:`launch`. Defaults to ``False``.
+    * ``jsonCodec`` (str|JSONCodec): JSON library to encode/decode protocol
+      messages. See :func:`launch`. Defaults to ``'auto'``.
     * ``loop`` (asyncio.AbstractEventLoop): Event loop (**experimental**).
     """
     options = merge_dict(options, kwargs)
@@ -374,7 +539,9 @@ async def connect(options: dict = None, **kwargs: Any) -> Browser:
     connectionDelay = options.get('slowMo', 0)
     connection = Connection(browserWSEndpoint,
                             options.get('loop', asyncio.get_event_loop()),
-                            connectionDelay)
+                            connectionDelay,
+                            options.get('flatten', False),
+                            options.get('jsonCodec', 'auto'))
     browserContextIds = (await connection.send('Target.getBrowserContexts')
                          ).get('browserContextIds', [])
     ignoreHTTPSErrors = bool(options.get('ignoreHTTPSErrors', False))
@@ -4,65 +4,72 @@
 """Multimap module."""
 
 from collections import OrderedDict
-from typing import Any, List, Optional
+from typing import Any, Generic, Hashable, List, TypeVar
 
+K = TypeVar('K', bound=Hashable)
 
-class Multimap(object):
-    """Multimap class."""
+
+class Multimap(Generic[K]):
+    """Multimap class.
+
+    Values of each key are kept in insertion order. All operations except
+    :meth:`get` and :meth:`valuesArray` take constant time. Keys can be any
+    hashable objects.
+    """
 
     def __init__(self) -> None:
         """Make new multimap."""
-        # maybe defaultdict(set) is better
-        self._map: OrderedDict[Optional[str], List[Any]] = OrderedDict()
+        # Values are keys of OrderedDict, which works as an ordered set.
+        self._map: OrderedDict[K, OrderedDict[Any, None]] = \
+            OrderedDict()
 
-    def set(self, key: Optional[str], value: Any) -> None:
+    def set(self, key: K, value: Any) -> None:
         """Set value."""
         _set = self._map.get(key)
-        if not _set:
-            _set = list()
+        if _set is None:
+            _set = OrderedDict()
             self._map[key] = _set
-        if value not in _set:
-            _set.append(value)
+        _set[value] = None
 
-    def get(self, key: Optional[str]) -> List[Any]:
+    def get(self, key: K) -> List[Any]:
         """Get values."""
-        return self._map.get(key, list())
+        return list(self._map.get(key, ()))
 
-    def has(self, key: Optional[str]) -> bool:
+    def has(self, key: K) -> bool:
         """Check key is in this map."""
         return key in self._map
 
-    def hasValue(self, key: Optional[str], value: Any) -> bool:
+    def hasValue(self, key: K, value: Any) -> bool:
         """Check value is in this map."""
-        _set = self._map.get(key, list())
-        return value in _set
+        _set = self._map.get(key)
+        return _set is not None and value in _set
 
     def size(self) -> int:
         """Length of this map."""
         return len(self._map)
 
-    def delete(self, key: Optional[str], value: Any) -> bool:
+    def delete(self, key: K, value: Any) -> bool:
         """Delete value from key."""
-        values = self.get(key)
-        result = value in values
-        if result:
-            values.remove(value)
-        if len(values) == 0:
+        _set = self._map.get(key)
+        if _set is None:
+            return False
+        result = _set.pop(value, _missing) is not _missing
+        if not _set:
             self._map.pop(key)
         return result
 
-    def deleteAll(self, key: Optional[str]) -> None:
+    def deleteAll(self, key: K) -> None:
         """Delete all value of the key."""
         self._map.pop(key, None)
 
-    def firstValue(self, key: Optional[str]) -> Any:
+    def firstValue(self, key: K) -> Any:
         """Get first value of the key."""
         _set = self._map.get(key)
         if not _set:
             return None
-        return _set[0]
+        return next(iter(_set))
 
-    def firstKey(self) -> Optional[str]:
+    def firstKey(self) -> K:
         """Get first key."""
         return next(iter(self._map.keys()))
 
@@ -76,3 +83,6 @@ class Multimap(object):
     def clear(self) -> None:
         """Clear all entries of this map."""
         self._map.clear()
+
+
+_missing = object()
@@ -10,7 +10,9 @@ import copy
 import json
 import logging
 from types import SimpleNamespace
-from typing import Awaitable, Dict, List, Optional, Union, TYPE_CHECKING
+from pathlib import Path
+from typing import Any, Awaitable, Dict, IO, List, Optional, Tuple
+from typing import TYPE_CHECKING, Union
 from urllib.parse import unquote
 
 from pyee import EventEmitter
@@ -20,9 +22,12 @@ from pyppeteer.errors import NetworkError
 from pyppeteer.frame_manager import FrameManager, Frame
 from pyppeteer.helper import debugError
 from pyppeteer.multimap import Multimap
+from pyppeteer.response_cache import ResponseCache
+from pyppeteer.router import Route, Router
 
 if TYPE_CHECKING:
     from typing import Set  # noqa: F401
+    from pyppeteer.har import HarReplay  # noqa: F401
 
 logger = logging.getLogger(__name__)
 
@@ -44,21 +49,22 @@ class NetworkManager(EventEmitter):
         self._frameManager = frameManager
         self._requestIdToRequest: Dict[Optional[str], Request] = dict()
         self._requestIdToResponseWillBeSent: Dict[Optional[str], Dict] = dict()
+        self._requestIdToRequestHash: Dict[Optional[str], Tuple] = dict()
+        self._requestIdToInterceptionId: Dict[Optional[str], str] = dict()
+        # Whether ``Network.requestIntercepted`` has ``requestId`` to match
+        # ``Network.requestWillBeSent`` directly (newer browsers).
+        self._interceptionHasRequestId = False
         self._extraHTTPHeaders: OrderedDict[str, str] = OrderedDict()
         self._offline: bool = False
         self._credentials: Optional[Dict[str, str]] = None
         self._attemptedAuthentications: Set[Optional[str]] = set()
         self._userRequestInterceptionEnabled = False
         self._protocolRequestInterceptionEnabled = False
-        self._requestHashToRequestIds = Multimap()
-        self._requestHashToInterceptionIds = Multimap()
+        self._requestHashToRequestIds: Multimap[Tuple] = Multimap()
+        self._requestHashToInterceptionIds: Multimap[Tuple] = Multimap()
+        self._router = Router(client, self._onResponseStream)
 
-        self._client.on(
-            'Network.requestWillBeSent',
-            lambda event: self._client._loop.create_task(
-                self._onRequestWillBeSent(event)
-            ),
-        )
+        self._client.on('Network.requestWillBeSent', self._onRequestWillBeSent)  # noqa: E501
         self._client.on('Network.requestIntercepted', self._onRequestIntercepted)  # noqa: E501
         self._client.on('Network.requestServedFromCache', self._onRequestServedFromCache)  # noqa: #501
         self._client.on('Network.responseReceived', self._onResponseReceived)
@@ -109,6 +115,26 @@ class NetworkManager(EventEmitter):
         self._userRequestInterceptionEnabled = value
         await self._updateProtocolRequestInterception()
 
+    async def addRoute(self, options: dict = None, **kwargs: Any) -> Route:
+        """Add a routing rule."""
+        return await self._router.addRoute(options, **kwargs)
+
+    async def removeRoute(self, route: Route) -> None:
+        """Remove a routing rule."""
+        await self._router.removeRoute(route)
+
+    async def clearRoutes(self) -> None:
+        """Remove all routing rules."""
+        await self._router.clearRoutes()
+
+    async def setResponseCache(self, cache: Optional[ResponseCache]) -> None:
+        """Set response cache for static resources."""
+        await self._router.setResponseCache(cache)
+
+    async def setReplay(self, replay: Optional['HarReplay']) -> None:
+        """Set HAR replay to serve requests."""
+        await self._router.setReplay(replay)
+
     async def _updateProtocolRequestInterception(self) -> None:
         enabled = (self._userRequestInterceptionEnabled or
                    bool(self._credentials))
@@ -127,16 +153,25 @@ class NetworkManager(EventEmitter):
             )
         )
 
-    async def _onRequestWillBeSent(self, event: Dict) -> None:
+    def _onRequestWillBeSent(self, event: Dict) -> None:
         if self._protocolRequestInterceptionEnabled:
+            requestId = event.get('requestId')
+            interceptionId = self._requestIdToInterceptionId.pop(requestId, None)  # noqa: E501
+            if interceptionId:
+                self._onRequest(event, interceptionId)
+                return
+            if self._interceptionHasRequestId:
+                self._requestIdToResponseWillBeSent[requestId] = event
+                return
             requestHash = generateRequestHash(event.get('request', {}))
             interceptionId = self._requestHashToInterceptionIds.firstValue(requestHash)  # noqa: E501
             if interceptionId:
                 self._onRequest(event, interceptionId)
                 self._requestHashToInterceptionIds.delete(requestHash, interceptionId)  # noqa: E501
             else:
-                self._requestHashToRequestIds.set(requestHash, event.get('requestId'))  # noqa: E501
-                self._requestIdToResponseWillBeSent[event.get('requestId')] = event  # noqa: E501
+                self._requestHashToRequestIds.set(requestHash, requestId)
+                self._requestIdToResponseWillBeSent[requestId] = event
+                self._requestIdToRequestHash[requestId] = requestHash
             return
         self._onRequest(event, None)
 
@@ -177,16 +212,29 @@ class NetworkManager(EventEmitter):
                 }
             ))
 
+        if event.get('requestId'):
+            self._interceptionHasRequestId = True
+            self._matchInterception(event['requestId'], event)
+            return
+
         requestHash = generateRequestHash(event['request'])
         requestId = self._requestHashToRequestIds.firstValue(requestHash)
         if requestId:
-            requestWillBeSentEvent = self._requestIdToResponseWillBeSent[requestId]  # noqa: E501
-            self._onRequest(requestWillBeSentEvent, event.get('interceptionId'))  # noqa: E501
-            self._requestHashToRequestIds.delete(requestHash, requestId)
-            self._requestIdToResponseWillBeSent.pop(requestId, None)
+            self._matchInterception(requestId, event)
         else:
             self._requestHashToInterceptionIds.set(requestHash, event['interceptionId'])  # noqa: E501
 
+    def _matchInterception(self, requestId: str, event: Dict) -> None:
+        requestWillBeSentEvent = self._requestIdToResponseWillBeSent.pop(requestId, None)  # noqa: E501
+        if requestWillBeSentEvent is None:
+            # Network.requestWillBeSent comes later.
+            self._requestIdToInterceptionId[requestId] = event['interceptionId']  # noqa: E501
+            return
+        requestHash = self._requestIdToRequestHash.pop(requestId, None)
+        if requestHash is not None:
+            self._requestHashToRequestIds.delete(requestHash, requestId)
+        self._onRequest(requestWillBeSentEvent, event['interceptionId'])
+
     def _onRequest(self, event: Dict, interceptionId: Optional[str]) -> None:
         redirectChain: List[Request] = list()
         if event.get('redirectResponse'):
@@ -257,11 +305,29 @@ class NetworkManager(EventEmitter):
         self._requestIdToRequest[requestId] = request
         self.emit(NetworkManager.Events.Request, request)
 
+    def _onResponseStream(self, event: Dict, handle: str) -> None:
+        request = self._requestIdToRequest.get(event.get('networkId'))
+        if not request:
+            self._client._loop.create_task(Response._closeStream(
+                self._client, handle, event['requestId']))
+            return
+        headers = {h['name']: h['value']
+                   for h in event.get('responseHeaders', [])}
+        response = Response(self._client, request,
+                            event['responseStatusCode'], headers, False, False)
+        response._streamHandle = handle
+        response._streamRequestId = event['requestId']
+        request._response = response
+        self.emit(NetworkManager.Events.Response, response)
+
     def _onResponseReceived(self, event: dict) -> None:
         request = self._requestIdToRequest.get(event['requestId'])
         # FileUpload sends a response without a matching request.
         if not request:
             return
+        if request._response and request._response._streamRequestId:
+            # Body is taken by a ``stream`` route.
+            return
         _resp = event.get('response', {})
         response = Response(self._client, request,
                             _resp.get('status', 0),
@@ -601,6 +667,9 @@ class Response(object):
         self._fromDiskCache = fromDiskCache
         self._fromServiceWorker = fromServiceWorker
         self._headers = {k.lower(): v for k, v in headers.items()}
+        # Body stream of responses taken by ``stream`` routes.
+        self._streamHandle: Optional[str] = None
+        self._streamRequestId: Optional[str] = None
         self._securityDetails: Union[Dict, SecurityDetails] = {}
         if securityDetails:
             self._securityDetails = SecurityDetails(
@@ -647,6 +716,11 @@ class Response(object):
         return self._securityDetails
 
     async def _bufread(self) -> bytes:
+        if self._streamRequestId:
+            chunks = []
+            async for chunk in self.stream():
+                chunks.append(chunk)
+            return b''.join(chunks)
         result = await self._bodyLoadedPromise
         if isinstance(result, Exception):
             raise result
@@ -658,6 +732,107 @@ class Response(object):
             return base64.b64decode(body)
         return body
 
+    def stream(self, chunkSize: int = 65536, maxSize: Optional[int] = None
+               ) -> '_BodyStream':
+        """Iterate over the response body in chunks of bytes.
+
+        :arg int chunkSize: Maximum size of a chunk in bytes.
+        :arg int maxSize: Maximum size of the body in bytes. If the body is
+                          larger, :class:`~pyppeteer.errors.NetworkError` is
+                          raised without reading the rest.
+
+        Only bodies of responses taken by a ``stream`` route (see
+        :meth:`~pyppeteer.page.Page.addRoute`) can be streamed. They are read
+        from the browser chunk by chunk with ``IO.read``, so the whole body is
+        never held in memory, and can be read only once. For other responses,
+        :class:`~pyppeteer.errors.NetworkError` is raised; use :meth:`buffer`
+        or :meth:`save` instead.
+
+        .. warning::
+            The body of a streamed response is not passed to the page. The
+            request is aborted in the page (as ``net::ERR_ABORTED``) when the
+            stream is read to the end or closed. To pass the body to the page,
+            use a route which fulfills the request with the body instead.
+
+        Call ``aclose()`` of the returned iterator to stop reading before the
+        end.
+
+        .. code::
+
+            async for chunk in response.stream():
+                f.write(chunk)
+        """
+        if not self._streamRequestId:
+            raise NetworkError(
+                'Response body is not streamed. Add a route with the stream '
+                'action to stream it.')
+        if self._streamHandle is None:
+            raise NetworkError('Response body stream is already read.')
+        stream = _BodyStream(self._client, self._streamHandle,
+                             self._streamRequestId, chunkSize, maxSize)
+        self._streamHandle = None
+        return stream
+
+    async def _bufferBody(self, maxSize: Optional[int]) -> bytes:
+        length = self._headers.get('content-length', '')
+        if maxSize is not None and length.isdigit() and int(length) > maxSize:
+            # Do not get the body at all.
+            raise NetworkError(f'Response body exceeds {maxSize} bytes.')
+        body = await self.buffer()
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        if maxSize is not None and len(body) > maxSize:
+            raise NetworkError(f'Response body exceeds {maxSize} bytes.')
+        return body
+
+    @staticmethod
+    async def _closeStream(client: CDPSession, handle: str, requestId: str
+                           ) -> None:
+        for method, params in (
+                ('IO.close', {'handle': handle}),
+                ('Fetch.failRequest', {'requestId': requestId,
+                                       'errorReason': 'Aborted'})):
+            try:
+                await client.send(method, params)
+            except Exception as e:
+                debugError(logger, e)
+
+    async def save(self, path: Union[str, Path], chunkSize: int = 65536,
+                   maxSize: int = None) -> int:
+        """Write the response body to the file of ``path``.
+
+        Bodies of responses taken by a ``stream`` route are written chunk by
+        chunk by :meth:`stream`. Other bodies are got in one message, so they
+        are held in memory while writing. Return the number of bytes written.
+        If writing fails (e.g. the body exceeds ``maxSize``), the partial file
+        is removed.
+        """
+        file = Path(path)
+        try:
+            with file.open('wb') as f:
+                if self._streamRequestId:
+                    return await self._writeStream(f, chunkSize, maxSize)
+                body = await self._bufferBody(maxSize)
+                f.write(body)
+                return len(body)
+        except BaseException:
+            if file.exists():
+                file.unlink()
+            raise
+
+    async def _writeStream(self, f: IO[bytes], chunkSize: int,
+                           maxSize: Optional[int]) -> int:
+        size = 0
+        stream = self.stream(chunkSize, maxSize)
+        try:
+            async for chunk in stream:
+                f.write(chunk)
+                size += len(chunk)
+        except BaseException:
+            await stream.aclose()
+            raise
+        return size
+
     def buffer(self) -> Awaitable[bytes]:
         """Return awaitable which resolves to bytes with response body."""
         if not self._contentPromise.done():
@@ -696,36 +871,86 @@ class Response(object):
         return self._fromServiceWorker
 
 
-def generateRequestHash(request: dict) -> str:
-    """Generate request hash."""
+# Headers which may differ between events of the same request.
+_unstableHeaders = frozenset([
+    'accept',
+    'referer',
+    'x-devtools-emulate-network-conditions-client-id',
+    'cookie',
+])
+
+
+class _BodyStream(object):
+    """Async iterator of response body returned by :meth:`Response.stream`."""
+
+    def __init__(self, client: CDPSession, handle: str, requestId: str,
+                 chunkSize: int, maxSize: Optional[int]) -> None:
+        self._client = client
+        self._handle = handle
+        self._requestId = requestId
+        self._chunkSize = chunkSize
+        self._maxSize = maxSize
+        self._size = 0
+        self._closed = False
+
+    def __aiter__(self) -> '_BodyStream':
+        return self
+
+    async def __anext__(self) -> bytes:
+        try:
+            while not self._closed:
+                chunk, eof = await self._read()
+                if eof:
+                    await self.aclose()
+                if chunk:
+                    return chunk
+        except BaseException:
+            await self.aclose()
+            raise
+        raise StopAsyncIteration
+
+    async def _read(self) -> Tuple[bytes, bool]:
+        result = await self._client.send(
+            'IO.read', {'handle': self._handle, 'size': self._chunkSize})
+        data = result.get('data', '')
+        if result.get('base64Encoded'):
+            chunk = base64.b64decode(data)
+        else:
+            chunk = data.encode('utf-8')
+        self._size += len(chunk)
+        if self._maxSize is not None and self._size > self._maxSize:
+            raise NetworkError(f'Response body exceeds {self._maxSize} bytes.')
+        return chunk, result.get('eof', False)
+
+    async def aclose(self) -> None:
+        """Close the stream and abort the request in the page."""
+        if not self._closed:
+            self._closed = True
+            await Response._closeStream(
+                self._client, self._handle, self._requestId)
+
+
+def generateRequestHash(request: dict) -> Tuple:
+    """Generate request hash.
+
+    Return a hashable key to match events of the same request, made of the
+    url, method, post data and headers of the request.
+    """
     normalizedURL = request.get('url', '')
     try:
         normalizedURL = unquote(normalizedURL)
     except Exception:
         pass
 
-    _hash = {
-        'url': normalizedURL,
-        'method': request.get('method'),
-        'postData': request.get('postData'),
-        'headers': {},
-    }
-
+    headers: Tuple = ()
     if not normalizedURL.startswith('data:'):
-        headers = list(request['headers'].keys())
-        headers.sort()
-        for header in headers:
-            headerValue = request['headers'][header]
-            header = header.lower()
-            if header in [
-                'accept',
-                'referer',
-                'x-devtools-emulate-network-conditions-client-id',
-                'cookie',
-            ]:
-                continue
-            _hash['headers'][header] = headerValue
-    return json.dumps(_hash)
+        headers = tuple(sorted(
+            (header.lower(), value)
+            for header, value in request.get('headers', {}).items()
+            if header.lower() not in _unstableHeaders
+        ))
+    return (normalizedURL, request.get('method'), request.get('postData'),
+            headers)
 
 
 class SecurityDetails(object):
@@ -17,24 +17,29 @@ from pyee import EventEmitter
 
 from pyppeteer import helper
 from pyppeteer.connection import CDPSession
-from pyppeteer.coverage import Coverage
 from pyppeteer.dialog import Dialog
 from pyppeteer.element_handle import ElementHandle
 from pyppeteer.emulation_manager import EmulationManager
 from pyppeteer.errors import PageError
-from pyppeteer.execution_context import JSHandle  # noqa: F401
+from pyppeteer.execution_context import HandleScope, JSHandle  # noqa: F401
+from pyppeteer.extract import compile_spec
 from pyppeteer.frame_manager import Frame  # noqa: F401
 from pyppeteer.frame_manager import FrameManager
 from pyppeteer.helper import debugError
 from pyppeteer.input import Keyboard, Mouse, Touchscreen
 from pyppeteer.navigator_watcher import NavigatorWatcher
 from pyppeteer.network_manager import NetworkManager, Response, Request
-from pyppeteer.tracing import Tracing
+from pyppeteer.response_cache import ResponseCache
+from pyppeteer.router import Route
 from pyppeteer.util import merge_dict
 from pyppeteer.worker import Worker
 
 if TYPE_CHECKING:
     from pyppeteer.browser import Browser, Target  # noqa: F401
+    from pyppeteer.coverage import Coverage  # noqa: F401
+    from pyppeteer.dom_snapshot import DOMSnapshot  # noqa: F401
+    from pyppeteer.har import HAR  # noqa: F401
+    from pyppeteer.tracing import Tracing  # noqa: F401
 
 logger = logging.getLogger(__name__)
 
@@ -84,25 +89,35 @@ class Page(EventEmitter):
         a5={'width': 5.83, 'height': 8.27},
     )
 
+    #: Domains which can be selected by ``domains`` option of
+    #: :meth:`~pyppeteer.browser.Browser.newPage`.
+    Domains = ('Network', 'Target', 'Log', 'Performance')
+
+    # Domains enabled on first listener of these events.
+    _lazyDomainEvents = {
+        Events.Console: 'Log',
+        Events.Metrics: 'Performance',
+    }
+
     @staticmethod
     async def create(client: CDPSession, target: 'Target',
                      ignoreHTTPSErrors: bool, defaultViewport: Optional[Dict],
-                     screenshotTaskQueue: list = None) -> 'Page':
-        """Async function which makes new page object."""
+                     screenshotTaskQueue: list = None,
+                     domains: List[str] = None) -> 'Page':
+        """Async function which makes new page object.
+
+        ``domains`` is a list of optional domains (:attr:`Domains`) to use.
+        ``Log`` and ``Performance`` domains are enabled when they are needed.
+        """
+        if domains is None:
+            domains = list(Page.Domains)
         await client.send('Page.enable'),
         frameTree = (await client.send('Page.getFrameTree'))['frameTree']
         page = Page(client, target, frameTree, ignoreHTTPSErrors,
-                    screenshotTaskQueue)
+                    screenshotTaskQueue, domains)
 
         await asyncio.gather(
-            client.send('Target.setAutoAttach', {'autoAttach': True, 'waitForDebuggerOnStart': False}),  # noqa: E501
-            client.send('Page.setLifecycleEventsEnabled', {'enabled': True}),
-            client.send('Network.enable', {}),
-            client.send('Runtime.enable', {}),
-            client.send('Security.enable', {}),
-            client.send('Performance.enable', {}),
-            client.send('Log.enable', {}),
-        )
+            *Page._enableCommands(client, domains, ignoreHTTPSErrors))
         if ignoreHTTPSErrors:
             await client.send('Security.setOverrideCertificateErrors',
                               {'override': True})
@@ -110,12 +125,36 @@ class Page(EventEmitter):
             await page.setViewport(defaultViewport)
         return page
 
+    @staticmethod
+    def _enableCommands(client: CDPSession, domains: List[str],
+                        ignoreHTTPSErrors: bool) -> List[Awaitable]:
+        commands = [
+            client.send('Page.setLifecycleEventsEnabled', {'enabled': True}),
+            client.send('Runtime.enable', {}),
+        ]
+        if 'Target' in domains:
+            autoAttachOptions = {'autoAttach': True,
+                                 'waitForDebuggerOnStart': False}
+            if client._flatten:
+                autoAttachOptions['flatten'] = True
+            commands.append(
+                client.send('Target.setAutoAttach', autoAttachOptions))
+        if 'Network' in domains:
+            commands.append(client.send('Network.enable', {}))
+        if ignoreHTTPSErrors:
+            # Certificate errors are not handled unless ignoreHTTPSErrors.
+            commands.append(client.send('Security.enable', {}))
+        return commands
+
     def __init__(self, client: CDPSession, target: 'Target',  # noqa: C901
                  frameTree: Dict, ignoreHTTPSErrors: bool,
-                 screenshotTaskQueue: list = None) -> None:
+                 screenshotTaskQueue: list = None,
+                 domains: List[str] = None) -> None:
         super().__init__()
         self._closed = False
         self._client = client
+        self._domains = list(Page.Domains) if domains is None else domains
+        self._enabledDomains: Dict[str, Awaitable] = dict()
         self._target = target
         self._keyboard = Keyboard(client)
         self._mouse = Mouse(client, self._keyboard)
@@ -123,12 +162,13 @@ class Page(EventEmitter):
         self._frameManager = FrameManager(client, frameTree, self)
         self._networkManager = NetworkManager(client, self._frameManager)
         self._emulationManager = EmulationManager(client)
-        self._tracing = Tracing(client)
+        self._tracing: Optional['Tracing'] = None
         self._pageBindings: Dict[str, Callable[..., Any]] = dict()
         self._ignoreHTTPSErrors = ignoreHTTPSErrors
         self._defaultNavigationTimeout = 30000  # milliseconds
         self._javascriptEnabled = True
-        self._coverage = Coverage(client)
+        self._coverage: Optional['Coverage'] = None
+        self._har: Optional['HAR'] = None
         self._viewport: Optional[Dict] = None
 
         if screenshotTaskQueue is None:
@@ -215,6 +255,26 @@ class Page(EventEmitter):
             self._closed = True
 
         self._target._isClosedPromise.add_done_callback(closed)
+        self.on('new_listener', self._onNewListener)
+
+    def _onNewListener(self, event: str, listener: Any) -> None:
+        domain = self._lazyDomainEvents.get(event)
+        if domain in self._domains:
+            self._enableDomain(domain)
+
+    def _enableDomain(self, domain: str) -> Awaitable:
+        """Enable ``domain`` if it is not enabled yet."""
+        if domain not in self._domains:
+            raise PageError(f'{domain} domain is not enabled for this page.')
+        fut = self._enabledDomains.get(domain)
+        if fut is None:
+            fut = asyncio.ensure_future(
+                self._client.send(f'{domain}.enable', {}))
+            # Do not leave an unretrieved error for a closed page.
+            fut.add_done_callback(
+                lambda f: f.cancelled() or f.exception())
+            self._enabledDomains[domain] = fut
+        return fut
 
     @property
     def target(self) -> 'Target':
@@ -257,10 +317,21 @@ class Page(EventEmitter):
         return self._touchscreen
 
     @property
-    def coverage(self) -> Coverage:
+    def coverage(self) -> 'Coverage':
         """Return :class:`~pyppeteer.coverage.Coverage`."""
+        if self._coverage is None:
+            from pyppeteer.coverage import Coverage  # noqa: F811
+            self._coverage = Coverage(self._client)
         return self._coverage
 
+    @property
+    def har(self) -> 'HAR':
+        """Return :class:`~pyppeteer.har.HAR`."""
+        if self._har is None:
+            from pyppeteer.har import HAR  # noqa: F811
+            self._har = HAR(self._networkManager)
+        return self._har
+
     async def tap(self, selector: str) -> None:
         """Tap the element which matches the ``selector``.
 
@@ -274,6 +345,9 @@ class Page(EventEmitter):
     @property
     def tracing(self) -> 'Tracing':
         """Get tracing object."""
+        if self._tracing is None:
+            from pyppeteer.tracing import Tracing  # noqa: F811
+            self._tracing = Tracing(self._client)
         return self._tracing
 
     @property
@@ -321,6 +395,98 @@ class Page(EventEmitter):
         """  # noqa: E501
         return await self._networkManager.setRequestInterception(value)
 
+    async def addRoute(self, options: dict = None, **kwargs: Any) -> Route:
+        """Add a declarative routing rule for requests.
+
+        Unlike :meth:`setRequestInterception`, rules are sent to the browser
+        as patterns of the ``Fetch`` domain: requests which match no rule are
+        never paused, the browser cache is kept enabled, and matched requests
+        are continued, aborted or fulfilled by the rule without calling python
+        callbacks. Rules are checked in the order they were added and the
+        first matched rule is applied.
+
+        Available options are:
+
+        * ``url`` (str|Pattern): URL glob pattern (``*`` matches any
+          characters and ``?`` matches a character) or compiled regular
+          expression. Defaults to ``'*'``. Regular expressions are matched
+          in python, so all requests of ``resourceType`` are paused.
+        * ``resourceType`` (str): Resource type such as ``image`` or
+          ``font``. See :attr:`~pyppeteer.network_manager.Request.resourceType`
+          for available values.
+        * ``method`` (str): HTTP method such as ``GET``. Matched in python.
+        * ``action`` (str): One of ``continue``, ``abort``, ``fulfill`` or
+          ``stream``. Defaults to ``continue``. ``stream`` pauses matched
+          requests when their response headers are received, and takes the
+          body of successful (2xx) responses as a stream to read by
+          :meth:`~pyppeteer.network_manager.Response.stream` or
+          :meth:`~pyppeteer.network_manager.Response.save` without loading
+          it into memory. **The body is not passed to the page**: the
+          request fails in the page with ``net::ERR_ABORTED`` after the
+          stream is read, so use it for downloads, not for resources the page
+          needs.
+        * ``errorCode`` (str): Error code to abort request with. Defaults to
+          ``failed``. See :meth:`~pyppeteer.network_manager.Request.abort`
+          for available values.
+        * ``response`` (dict): Response to fulfill request with. Same as the
+          argument of :meth:`~pyppeteer.network_manager.Request.respond`.
+        * ``headers`` (dict): Request headers to set when continuing the
+          request. Headers with ``None`` value are removed.
+
+        Return :class:`~pyppeteer.router.Route` object, which can be removed
+        by :meth:`removeRoute`.
+
+        .. code::
+
+            # Block images and fonts.
+            await page.addRoute(resourceType='image', action='abort')
+            await page.addRoute(resourceType='font', action='abort')
+            # Stub an API.
+            await page.addRoute(url='*/api/status', action='fulfill',
+                                response={'body': '{"ok": true}',
+                                          'contentType': 'application/json'})
+            # Save large media to files.
+            await page.addRoute(resourceType='media', action='stream')
+
+        .. note::
+            The ``Fetch`` domain is available on Chromium 74 or later. On
+            older browsers, raise :class:`~pyppeteer.errors.BrowserError`.
+        """
+        return await self._networkManager.addRoute(options, **kwargs)
+
+    async def removeRoute(self, route: Route) -> None:
+        """Remove routing rule added by :meth:`addRoute`."""
+        await self._networkManager.removeRoute(route)
+
+    async def clearRoutes(self) -> None:
+        """Remove all routing rules."""
+        await self._networkManager.clearRoutes()
+
+    async def setResponseCache(self, cache: Optional[ResponseCache]) -> None:
+        """Serve static resources of this page from ``cache``.
+
+        :arg cache: :class:`~pyppeteer.response_cache.ResponseCache` object,
+                    or ``None`` to stop using the cache.
+
+        Cacheable responses are stored in ``cache`` and repeated GET requests
+        for them are fulfilled from it without hitting the network. The cache
+        is kept in python, so it works while the browser cache is disabled by
+        :meth:`setRequestInterception`, and one cache can be shared by many
+        pages and browsers. Rules added by :meth:`addRoute` take precedence
+        over the cache.
+
+        .. code::
+
+            cache = ResponseCache(maxSize=256 * 1024 * 1024)
+            for page in pages:
+                await page.setResponseCache(cache)
+
+        .. note::
+            The ``Fetch`` domain is available on Chromium 74 or later. On
+            older browsers, raise :class:`~pyppeteer.errors.BrowserError`.
+        """
+        await self._networkManager.setResponseCache(cache)
+
     async def setOfflineMode(self, enabled: bool) -> None:
         """Set offline mode enable/disable."""
         await self._networkManager.setOfflineMode(enabled)
@@ -372,6 +538,31 @@ class Page(EventEmitter):
             raise PageError('no main frame.')
         return await frame.querySelector(selector)
 
+    def handleScope(self) -> HandleScope:
+        """Make a scope to release handles created in the main frame at once.
+
+        Return an async context manager. Objects of handles created while
+        the scope is active belong to an object group of the browser, and
+        they are released with a single protocol call on exit, instead of
+        one call per :meth:`~pyppeteer.execution_context.JSHandle.dispose`.
+        Handles are disposed on exit.
+
+        .. code::
+
+            async with page.handleScope():
+                for link in await page.querySelectorAll('a'):
+                    print(await page.evaluate('a => a.href', link))
+            # all handles of the links are released here
+
+        The number of live handles can be checked by
+        :attr:`~pyppeteer.execution_context.ExecutionContext.handleCount`.
+        Details see
+        :meth:`~pyppeteer.execution_context.ExecutionContext.handleScope`.
+        """
+        if not self.mainFrame:
+            raise PageError('no main frame.')
+        return self.mainFrame.handleScope()
+
     async def evaluateHandle(self, pageFunction: str, *args: Any
                              ) -> JSHandle:
         """Execute function on this page.
@@ -459,6 +650,56 @@ class Page(EventEmitter):
             raise PageError('no main frame.')
         return await frame.xpath(expression)
 
+    async def extract(self, spec: Any, allFrames: bool = False) -> Any:
+        """Extract data from the page by declarative ``spec``.
+
+        The spec is compiled to one in-page function, so all data is
+        extracted and returned as plain python objects in a single round
+        trip, without creating element handles.
+
+        ``spec`` is one of:
+
+        * ``str``: A field of the first element which matches the selector.
+          The selector is followed by a getter:
+
+          * ``'h2'`` or ``'h2::text'``: Trimmed text content.
+          * ``'div::html'``: Inner HTML.
+          * ``'a@href'``: Value of the attribute.
+          * ``'input::prop(value)'``: Value of the property. The value must
+            be JSON-serializable.
+
+          If the selector is omitted (e.g. ``'@href'``), the field is read
+          from the current element. If no element matches, the field is
+          ``None``.
+
+        * ``dict``: Dictionary of the extracted fields.
+        * ``tuple`` of ``(selector, spec)``: List of data extracted by
+          ``spec`` from each element which matches the selector. Selectors in
+          ``spec`` are relative to the element.
+
+        .. code::
+
+            data = await page.extract({
+                'title': 'h1',
+                'items': ('.row', {'title': 'h2::text', 'href': 'a@href'}),
+            })
+            # {'title': '...', 'items': [{'title': '...', 'href': '...'}]}
+
+        :arg bool allFrames: If ``True``, extract from all frames
+                             concurrently and return a list of results in the
+                             order of :attr:`frames`.
+
+        Raise :class:`ValueError` if ``spec`` is invalid.
+        """
+        plan = compile_spec(spec)
+        if allFrames:
+            return await asyncio.gather(
+                *(frame._extract(plan) for frame in self.frames))
+        frame = self.mainFrame
+        if not frame:
+            raise PageError('no main frame.')
+        return await frame._extract(plan)
+
     #: alias to :meth:`querySelector`
     J = querySelector
     #: alias to :meth:`querySelectorEval`
@@ -678,6 +919,44 @@ function addPageBinding(bindingName) {
         """
         return await self._networkManager.setUserAgent(userAgent)
 
+    async def domSnapshot(self, options: dict = None, **kwargs: Any
+                          ) -> 'DOMSnapshot':
+        """Capture snapshot of the DOM tree, layout and computed styles.
+
+        Return :class:`~pyppeteer.dom_snapshot.DOMSnapshot`, which keeps the
+        result of ``DOMSnapshot.captureSnapshot`` in columnar form (numpy
+        arrays if numpy is installed) with filters by tag, computed style
+        and bounding box. The whole page, including iframes, is captured by
+        a single protocol call.
+
+        Available options are:
+
+        * ``computedStyles`` (List[str]): Names of computed styles to
+          capture, e.g. ``['display', 'visibility']``. Defaults to none.
+        * ``includePaintOrder`` (bool): Capture paint order of layout
+          objects as ``paintOrders`` of the documents. Defaults to
+          ``False``.
+        * ``includeDOMRects`` (bool): Capture offset, scroll and client
+          rects of layout objects as ``offsetRects``, ``scrollRects`` and
+          ``clientRects`` of the documents. Defaults to ``False``.
+
+        .. code::
+
+            snapshot = await page.domSnapshot(computedStyles=['display'])
+            doc = snapshot.document
+            links = doc.nodesByTag('a')
+            hrefs = [doc.attributes(i).get('href') for i in links]
+        """
+        from pyppeteer.dom_snapshot import DOMSnapshot
+        options = merge_dict(options, kwargs)
+        computedStyles = list(options.get('computedStyles') or [])
+        result = await self._client.send('DOMSnapshot.captureSnapshot', {
+            'computedStyles': computedStyles,
+            'includePaintOrder': bool(options.get('includePaintOrder')),
+            'includeDOMRects': bool(options.get('includeDOMRects')),
+        })
+        return DOMSnapshot(result, computedStyles)
+
     async def metrics(self) -> Dict[str, Any]:
         """Get metrics.
 
@@ -702,6 +981,7 @@ function addPageBinding(bindingName) {
         * ``JSHeapUsedSize`` (float): Used JavaScript heap size.
         * ``JSHeapTotalSize`` (float): Total JavaScript heap size.
         """
+        await self._enableDomain('Performance')
         response = await self._client.send('Performance.getMetrics')
         return self._buildMetricsObject(response['metrics'])
 
@@ -1120,6 +1400,26 @@ function addPageBinding(bindingName) {
             'value': not enabled,
         })
 
+    def setScriptCacheEnabled(self, enabled: bool = True,
+                              size: int = 100) -> None:
+        """Enable/Disable cache of functions evaluated in this page.
+
+        By default, each :meth:`evaluate` call (and other methods which take
+        ``pageFunction``) sends the source of the function to the browser,
+        which parses it again. When the cache is enabled, each function is
+        installed once per execution context and called by reference from
+        the next time, which reduces protocol payload and parse time of
+        functions called many times.
+
+        Installed functions are released when the execution context is
+        destroyed (e.g. by navigation).
+
+        :arg bool enabled: Whether to enable the cache.
+        :arg int size: Max number of functions cached per execution context.
+                       The least recently used ones are released first.
+        """
+        self._frameManager._setScriptCache(size if enabled else 0)
+
     async def setBypassCSP(self, enabled: bool) -> None:
         """Toggles bypassing page's Content-Security-Policy.
 
@@ -1648,6 +1948,12 @@ function addPageBinding(bindingName) {
           properties. Defaults to ``False``.
         * ``timeout`` (int|float): Maximum time to wait for in milliseconds.
           Defaults to 30000 (30 seconds). Pass ``0`` to disable timeout.
+        * ``polling`` (str|number): How to check the element. Defaults to
+          ``mutation``, or ``raf`` with ``visible`` or ``hidden`` options. See
+          :meth:`waitForFunction` for available values. ``mutation`` checks
+          visibility only when the DOM (including ``class`` and ``style``
+          attributes) changes, which is much cheaper than ``raf`` but misses
+          changes by stylesheets or animations.
         """
         frame = self.mainFrame
         if not frame:
@@ -1678,6 +1984,8 @@ function addPageBinding(bindingName) {
           properties. Defaults to ``False``.
         * ``timeout`` (int|float): maximum time to wait for in milliseconds.
           Defaults to 30000 (30 seconds). Pass ``0`` to disable timeout.
+        * ``polling`` (str|number): How to check the element. Same as
+          :meth:`waitForSelector`.
         """
         frame = self.mainFrame
         if not frame:
@@ -1706,9 +2014,25 @@ function addPageBinding(bindingName) {
             ``requestAnimationFrame`` callback. This is the tightest polling
             mode which is suitable to observe styling changes.
           * ``mutation``: to execute ``pageFunction`` on every DOM mutation.
+          * ``idle``: to execute ``pageFunction`` in ``requestIdleCallback``
+            callback, i.e. when the page is idle, and at least once a second.
+          * ``backoff``: to execute ``pageFunction`` at exponentially
+            increasing intervals from 10 ms up to 1 second.
+
+          Pending functions with the same polling in a frame share one
+          observer, animation frame loop or timer.
 
         * ``timeout`` (int|float): maximum time to wait for in milliseconds.
           Defaults to 30000 (30 seconds). Pass ``0`` to disable timeout.
+
+        The returned object has ``stats`` property, which reports how many
+        times ``pageFunction`` was called and time spent in it:
+
+        .. code::
+
+            task = page.waitForFunction('() => window.ready', polling='idle')
+            await task
+            print(task.stats)  # {'invocations': 12, 'predicateTime': 0.3}
         """
         frame = self.mainFrame
         if not frame:
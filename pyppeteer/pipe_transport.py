@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Pipe transport module (``--remote-debugging-pipe``)."""
+
+import asyncio
+import os
+import sys
+from typing import Any, Optional, Tuple
+
+
+class PipeTransport(object):
+    """Transport to talk to the browser over pipes.
+
+    When chrome is launched with ``--remote-debugging-pipe``, it reads
+    protocol messages from fd 3 and writes to fd 4. Each message is a JSON
+    string terminated by a NUL byte.
+
+    This class provides the same interface with the websockets' connection
+    used by :class:`~pyppeteer.connection.Connection` (``recv``, ``send``,
+    ``close`` and async context manager).
+    """
+
+    def __init__(self, readFd: int, writeFd: int,
+                 loop: asyncio.AbstractEventLoop) -> None:
+        """Make new pipe transport.
+
+        :arg int readFd: File descriptor to read messages from the browser.
+        :arg int writeFd: File descriptor to write messages to the browser.
+        """
+        self._readFd = readFd
+        self._writeFd = writeFd
+        self._loop = loop
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.WriteTransport] = None
+
+    async def __aenter__(self) -> 'PipeTransport':
+        # Messages (e.g. screenshots) may be large, so do not limit the size.
+        reader = asyncio.StreamReader(limit=sys.maxsize)
+        self._reader = reader
+        await self._loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader),
+            os.fdopen(self._readFd, 'rb', 0),
+        )
+        self._writer, _ = await self._loop.connect_write_pipe(
+            asyncio.Protocol,
+            os.fdopen(self._writeFd, 'wb', 0),
+        )
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    async def recv(self) -> str:
+        """Receive a message from the browser."""
+        if self._reader is None:
+            raise ConnectionResetError('Pipe is not opened.')
+        try:
+            data = await self._reader.readuntil(b'\0')
+        except asyncio.IncompleteReadError:
+            raise ConnectionResetError('Pipe closed.')
+        return data[:-1].decode('utf-8')
+
+    async def send(self, message: str) -> None:
+        """Send a message to the browser."""
+        if self._writer is None or self._writer.is_closing():
+            raise ConnectionResetError('Pipe closed.')
+        self._writer.write(message.encode('utf-8') + b'\0')
+
+    async def close(self) -> None:
+        """Close pipes."""
+        if self._writer is not None and not self._writer.is_closing():
+            self._writer.close()
+        if self._reader is not None:
+            self._reader.feed_eof()
+
+
+def create_pipes() -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """Create pipes to communicate with the browser.
+
+    Return a pair of ``(readFd, writeFd)`` tuples: the first is for this
+    process and the second is for the browser process.
+    """
+    browserRead, write = os.pipe()
+    read, browserWrite = os.pipe()
+    return (read, write), (browserRead, browserWrite)
+
+
+def redirect_browser_pipes(browserRead: int, browserWrite: int) -> None:
+    """Move browser side of pipes to fd 3 and 4 in the child process.
+
+    This function is intended to be used as ``preexec_fn`` of
+    :class:`subprocess.Popen` with ``pass_fds=(3, 4)``. Pipes made by
+    :func:`create_pipes` take the lowest free fds, so fd 3 and 4 are open
+    in this process as ``pass_fds`` requires.
+    """
+    import fcntl
+    # Duplicate to fd >= 5 first, so that the original fds are not clobbered
+    # by ``dup2`` when they are 3 or 4.
+    read = fcntl.fcntl(browserRead, fcntl.F_DUPFD_CLOEXEC, 5)
+    write = fcntl.fcntl(browserWrite, fcntl.F_DUPFD_CLOEXEC, 5)
+    os.dup2(read, 3)
+    os.dup2(write, 4)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Browser pool module."""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set
+
+from pyppeteer.browser import Browser, BrowserContext
+from pyppeteer.errors import BrowserError
+from pyppeteer.helper import debugError
+from pyppeteer.launcher import launch
+from pyppeteer.page import Page
+from pyppeteer.util import merge_dict
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool(object):
+    """Pool of warm browsers.
+
+    BrowserPool keeps ``size`` browsers running and leases incognito browser
+    contexts or pages of them. Browsers are recycled after they served
+    ``maxPages`` leases, lived longer than ``maxUptime``, or used more memory
+    than ``maxMemory``. A replacement browser is launched in background as
+    soon as a browser is retired, and the retired browser is closed after all
+    of its leases are released.
+
+    .. code::
+
+        async with BrowserPool(size=4, maxPages=100) as pool:
+            async with pool.page() as page:
+                await page.goto('https://example.com')
+
+    Available options are:
+
+    * ``size`` (int): Number of browsers to keep. Defaults to ``1``.
+    * ``launchOptions`` (dict): Options passed to
+      :func:`~pyppeteer.launcher.launch`.
+    * ``factory`` (Callable[[], Awaitable[Browser]]): Coroutine function to
+      make a new browser, e.g. ``lambda: connect(browserWSEndpoint=...)``.
+      If specified, ``launchOptions`` is ignored.
+    * ``maxPages`` (int): Recycle a browser after this number of leases.
+    * ``maxUptime`` (int|float): Recycle a browser after this time in
+      milliseconds.
+    * ``maxMemory`` (int): Recycle a browser when resident memory of the
+      browser process and its child processes (renderers, etc.) exceeds this
+      size in bytes. Requires `psutil <https://pypi.org/project/psutil/>`_
+      and is ignored for browsers without process (e.g. connected ones).
+    * ``healthCheckInterval`` (int|float): Interval in milliseconds to check
+      that idle browsers respond. Unhealthy browsers are replaced. ``0``
+      disables health check. Defaults to ``30000``.
+    * ``loop`` (asyncio.AbstractEventLoop): Event loop (**experimental**).
+    """
+
+    def __init__(self, options: dict = None, **kwargs: Any) -> None:
+        options = merge_dict(options, kwargs)
+        self._size = options.get('size', 1)
+        launchOptions = options.get('launchOptions', {})
+        self._factory: Callable[[], Awaitable[Browser]] = options.get(
+            'factory', lambda: launch(launchOptions))
+        self._maxPages: Optional[int] = options.get('maxPages')
+        self._maxUptime: Optional[float] = options.get('maxUptime')
+        self._maxMemory: Optional[int] = options.get('maxMemory')
+        self._healthCheckInterval = options.get('healthCheckInterval', 30000)
+        self._loop = options.get('loop', asyncio.get_event_loop())
+        if self._maxMemory:
+            import psutil  # noqa: F401
+        self._browsers: List[PooledBrowser] = list()
+        self._launching: List[asyncio.Future] = list()
+        self._closing: Set[asyncio.Future] = set()
+        self._healthCheckTask: Optional[asyncio.Future] = None
+        self._closed = False
+
+    async def __aenter__(self) -> 'BrowserPool':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    @property
+    def browsers(self) -> List[Browser]:
+        """Get list of active (not retired) browsers in this pool."""
+        return [entry.browser for entry in self._browsers]
+
+    async def start(self) -> None:
+        """Launch browsers and wait until they are ready."""
+        for _ in range(self._size - len(self._browsers) -
+                       len(self._launching)):
+            self._spawn()
+        await asyncio.gather(*self._launching)
+        if self._healthCheckInterval and self._healthCheckTask is None:
+            self._healthCheckTask = self._loop.create_task(
+                self._healthCheckLoop())
+
+    async def close(self) -> None:
+        """Close all browsers in this pool."""
+        self._closed = True
+        if self._healthCheckTask:
+            self._healthCheckTask.cancel()
+        for fut in self._launching:
+            fut.cancel()
+        entries, self._browsers = self._browsers, []
+        for entry in entries:
+            entry.retired = True
+            self._closeEntry(entry)
+        await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def context(self) -> 'Lease':
+        """Lease a new incognito browser context.
+
+        Return an async context manager. The context is closed on exit.
+
+        .. code::
+
+            async with pool.context() as context:
+                page = await context.newPage()
+        """
+        return Lease(self, False)
+
+    def page(self, options: dict = None, **kwargs: Any) -> 'Lease':
+        """Lease a new page in a new incognito browser context.
+
+        Return an async context manager. The page and its context are closed
+        on exit. Options are passed to
+        :meth:`~pyppeteer.browser.BrowserContext.newPage`.
+
+        .. code::
+
+            async with pool.page() as page:
+                await page.goto('https://example.com')
+        """
+        return Lease(self, True, merge_dict(options, kwargs))
+
+    def _spawn(self) -> None:
+        fut = self._loop.create_task(self._launch())
+        self._launching.append(fut)
+        fut.add_done_callback(self._launched)
+
+    def _launched(self, fut: asyncio.Future) -> None:
+        self._launching.remove(fut)
+        if not fut.cancelled() and fut.exception():
+            logger.error(f'failed to launch browser: {fut.exception()}')
+
+    async def _launch(self) -> None:
+        browser = await self._factory()
+        if self._closed:
+            await browser.close()
+            return
+        entry = PooledBrowser(browser, self._loop.time())
+        browser.on(Browser.Events.Disconnected,
+                   lambda: self._retire(entry, 'disconnected'))
+        self._browsers.append(entry)
+
+    def _retireExpired(self) -> None:
+        if not self._maxUptime:
+            return
+        for entry in list(self._browsers):
+            uptime = (self._loop.time() - entry.startTime) * 1000
+            if uptime > self._maxUptime:
+                self._retire(entry, 'uptime limit')
+
+    async def _acquire(self) -> 'PooledBrowser':
+        while True:
+            if self._closed:
+                raise BrowserError('BrowserPool is closed.')
+            self._retireExpired()
+            if self._browsers:
+                entry = min(self._browsers, key=lambda e: e.leases)
+                entry.leases += 1
+                entry.pages += 1
+                if self._maxPages and entry.pages >= self._maxPages:
+                    # Launch replacement now; close after this lease ends.
+                    self._retire(entry, 'page limit')
+                return entry
+            await self._waitLaunch()
+
+    async def _waitLaunch(self) -> None:
+        if not self._launching:
+            self._spawn()
+        done, _ = await asyncio.wait(list(self._launching),
+                                     return_when=asyncio.FIRST_COMPLETED)
+        for fut in done:
+            if not fut.cancelled():
+                # Re-raise launch error, if any.
+                fut.result()
+
+    async def _release(self, entry: 'PooledBrowser') -> None:
+        entry.leases -= 1
+        if entry.retired:
+            if entry.leases == 0:
+                self._closeEntry(entry)
+        elif self._maxMemory:
+            # Walking the process tree blocks, so do not run it on the loop.
+            memory = await self._loop.run_in_executor(None, entry.memory)
+            if memory > self._maxMemory:
+                self._retire(entry, 'memory limit')
+
+    def _retire(self, entry: 'PooledBrowser', reason: str) -> None:
+        if entry.retired:
+            return
+        logger.info(f'retire browser: {reason}')
+        entry.retired = True
+        if entry in self._browsers:
+            self._browsers.remove(entry)
+        if not self._closed:
+            self._spawn()
+        if entry.leases == 0:
+            self._closeEntry(entry)
+
+    def _closeEntry(self, entry: 'PooledBrowser') -> None:
+        task = self._loop.create_task(entry.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _healthCheckLoop(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self._healthCheckInterval / 1000)
+            for entry in list(self._browsers):
+                if entry.leases == 0 and not await entry.isHealthy(
+                        self._healthCheckInterval / 1000):
+                    self._retire(entry, 'health check failed')
+
+
+class PooledBrowser(object):
+    """Browser and its usage in :class:`BrowserPool`."""
+
+    def __init__(self, browser: Browser, startTime: float) -> None:
+        self.browser = browser
+        self.startTime = startTime
+        self.leases = 0
+        self.pages = 0
+        self.retired = False
+        self._closed = False
+
+    def memory(self) -> int:
+        """Get resident memory size of the browser process tree in bytes."""
+        if self.browser.process is None:
+            return 0
+        import psutil
+        try:
+            proc = psutil.Process(self.browser.process.pid)
+            return sum(p.memory_info().rss
+                       for p in [proc] + proc.children(recursive=True))
+        except psutil.Error as e:
+            debugError(logger, e)
+            return 0
+
+    async def isHealthy(self, timeout: float) -> bool:
+        """Check the browser responds within ``timeout`` seconds."""
+        try:
+            await asyncio.wait_for(self.browser.version(), timeout)
+        except Exception as e:
+            debugError(logger, e)
+            return False
+        return True
+
+    async def close(self) -> None:
+        """Close the browser."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self.browser.close()
+        except Exception as e:
+            debugError(logger, e)
+
+
+class Lease(object):
+    """Async context manager to lease a context or page from the pool."""
+
+    def __init__(self, pool: BrowserPool, newPage: bool,
+                 pageOptions: dict = None) -> None:
+        self._pool = pool
+        self._newPage = newPage
+        self._pageOptions = pageOptions
+        self._entry: Optional[PooledBrowser] = None
+        self._context: Optional[BrowserContext] = None
+
+    async def __aenter__(self) -> Any:
+        self._entry = await self._pool._acquire()
+        try:
+            browser = self._entry.browser
+            self._context = await browser.createIncognitoBrowserContext()
+            if self._newPage:
+                page: Page = await self._context.newPage(
+                    self._pageOptions)
+                return page
+            return self._context
+        except Exception:
+            await self._release()
+            raise
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self._release()
+
+    async def _release(self) -> None:
+        if self._context is not None:
+            try:
+                await self._context.close()
+            except Exception as e:
+                debugError(logger, e)
+            self._context = None
+        if self._entry is not None:
+            await self._pool._release(self._entry)
+            self._entry = None
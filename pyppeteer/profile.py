@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Profile (user data directory) template module."""
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+import queue
+import shutil
+import socket
+import sys
+import threading
+import time
+from typing import Any, Iterator, List, Optional, Set, Tuple, Union
+
+from pyppeteer.util import merge_dict
+
+logger = logging.getLogger(__name__)
+
+# ioctl request to clone file contents (copy-on-write) on Linux.
+FICLONE = 0x40049409
+
+# Marker file written into temporary user data directories by pyppeteer. It
+# holds "<hostname>-<pid>" of the process which owns the directory.
+OWNER_FILE = '.pyppeteer-owner'
+
+# Files which only make sense for a running browser.
+VOLATILE_FILES = [
+    OWNER_FILE,
+    'SingletonLock',
+    'SingletonSocket',
+    'SingletonCookie',
+    'DevToolsActivePort',
+    'lockfile',
+]
+
+CLONE_METHODS = ('auto', 'reflink', 'hardlink', 'copy')
+
+
+def _reflink(src: str, dst: str) -> None:
+    import fcntl
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    shutil.copystat(src, dst)
+
+
+def _clone_file(src: str, dst: str, method: str) -> str:
+    """Clone a file and return the method to use for the next files."""
+    if method == 'hardlink':
+        os.link(src, dst)
+    elif method in ('auto', 'reflink'):
+        try:
+            _reflink(src, dst)
+        except (OSError, ImportError):
+            if method == 'reflink':
+                raise
+            # File system does not support reflink; do not try it for the
+            # rest of files.
+            shutil.copy2(src, dst)
+            return 'copy'
+    else:
+        shutil.copy2(src, dst)
+    return method
+
+
+def clone_profile(template: Union[str, Path], dest: Union[str, Path],
+                  method: str = 'auto') -> None:
+    """Clone profile ``template`` directory into ``dest`` directory.
+
+    ``method`` is one of:
+
+    * ``'auto'``: Use reflink (copy-on-write clone) where the file system
+      supports it, and copy otherwise.
+    * ``'reflink'``: Use reflink only. Raise :class:`OSError` if not
+      supported.
+    * ``'hardlink'``: Make hard links. This is the fastest, but files are
+      shared with the template, so chrome may modify the template. Use this
+      only for a disposable copy of the template.
+    * ``'copy'``: Copy files.
+    """
+    if method not in CLONE_METHODS:
+        raise ValueError(f'Unknown clone method: {method}')
+    if method == 'auto' and not sys.platform.startswith('linux'):
+        method = 'copy'
+    template = str(template)
+    for root, dirs, files in os.walk(template):
+        target = os.path.normpath(
+            os.path.join(str(dest), os.path.relpath(root, template)))
+        os.makedirs(target, exist_ok=True)
+        for name in files:
+            src = os.path.join(root, name)
+            if name in VOLATILE_FILES or os.path.islink(src):
+                continue
+            method = _clone_file(src, os.path.join(target, name), method)
+
+
+def cleanup_profile(path: Union[str, Path]) -> None:
+    """Remove files which are valid only while the browser is running."""
+    for root, dirs, files in os.walk(str(path)):
+        for name in files:
+            if name in VOLATILE_FILES:
+                os.remove(os.path.join(root, name))
+
+
+async def create_profile_template(path: Union[str, Path],
+                                  urls: List[str] = None,
+                                  options: dict = None, **kwargs: Any
+                                  ) -> None:
+    """Create a profile template from a warmed-up browser run.
+
+    Launch browser with ``path`` as user data directory, open ``urls`` to
+    fill caches (HTTP cache, code cache, etc.), then close the browser. The
+    created template can be used by ``profileTemplate`` option of
+    :func:`~pyppeteer.launcher.launch`.
+
+    ``options`` and keyword arguments are passed to
+    :func:`~pyppeteer.launcher.launch`.
+
+    .. code::
+
+        await create_profile_template('/path/to/template',
+                                      ['https://example.com'])
+        browser = await launch(profileTemplate='/path/to/template')
+    """
+    from pyppeteer.launcher import launch
+    options = merge_dict(options, kwargs)
+    options['userDataDir'] = str(path)
+    options.pop('profileTemplate', None)
+    browser = await launch(options)
+    try:
+        page = await browser.newPage()
+        for url in urls or []:
+            await page.goto(url, waitUntil='networkidle0')
+        await page.close()
+    finally:
+        await browser.close()
+        process = browser.process
+        if process is not None:
+            await asyncio.get_event_loop().run_in_executor(
+                None, process.wait)
+    cleanup_profile(path)
+    logger.info(f'profile template created at: {path}')
+
+
+class ProfileReaper(object):
+    """Delete user data directories in a background thread.
+
+    Deleting a large profile blocks for a long time, so
+    :class:`~pyppeteer.launcher.Launcher` hands temporary user data
+    directories of closed browsers to the reaper instead of deleting them in
+    the event loop. Directories queued at the same time are deleted in one
+    batch.
+
+    The reaper also sweeps orphaned directories left by crashed runs: ones
+    marked by :func:`mark_owner` whose owner process is not running.
+    Directories without the mark are never swept.
+
+    Total reclaimed bytes and number of removed directories are available
+    as :attr:`reclaimedBytes` and :attr:`removedDirs`.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._swept: Set[str] = set()
+        #: Total size of removed files in bytes.
+        self.reclaimedBytes = 0
+        #: Number of removed directories.
+        self.removedDirs = 0
+
+    def reap(self, path: Union[str, Path]) -> None:
+        """Schedule deletion of ``path``."""
+        self._put(('reap', str(path)))
+
+    def sweep(self, root: Union[str, Path]) -> None:
+        """Schedule deletion of orphaned directories under ``root``.
+
+        Each ``root`` is swept only once per process.
+        """
+        root = str(root)
+        with self._lock:
+            if root in self._swept:
+                return
+            self._swept.add(root)
+        self._put(('sweep', root))
+
+    def join(self) -> None:
+        """Block until all scheduled directories are deleted."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _put(self, item: Tuple[str, str]) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='pyppeteer-profile-reaper',
+                    daemon=True)
+                self._thread.start()
+        self._queue.put(item)
+
+    def _getBatch(self) -> List[Tuple[str, str]]:
+        items = [self._queue.get()]
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                return items
+
+    def _run(self) -> None:
+        while True:
+            items = self._getBatch()
+            try:
+                self._removeAll(items)
+            except Exception as e:
+                logger.error(f'failed to remove user data dirs: {e}')
+            for _ in items:
+                self._queue.task_done()
+
+    def _removeAll(self, items: List[Tuple[str, str]]) -> None:
+        paths: List[str] = list()
+        for kind, path in items:
+            if kind == 'sweep':
+                paths.extend(_find_orphans(path))
+            else:
+                paths.append(path)
+        reclaimed = 0
+        removed = 0
+        for path in paths:
+            size = _remove_dir(path)
+            if size is not None:
+                reclaimed += size
+                removed += 1
+        self.reclaimedBytes += reclaimed
+        self.removedDirs += removed
+        if removed:
+            logger.info(f'removed {removed} user data dirs '
+                        f'({reclaimed} bytes reclaimed)')
+
+
+def _dir_size(path: str) -> int:
+    size = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+def _remove_dir(path: str) -> Optional[int]:
+    """Remove directory and return its size, or ``None`` if failed."""
+    if not os.path.exists(path):
+        return None
+    size = _dir_size(path)
+    for retry in range(100):
+        shutil.rmtree(path, ignore_errors=True)
+        if not os.path.exists(path):
+            return size
+        time.sleep(0.01)
+    logger.warning(f'Unable to remove user data dir: {path}')
+    return None
+
+
+def mark_owner(path: Union[str, Path]) -> None:
+    """Mark user data directory ``path`` as owned by this process.
+
+    :class:`ProfileReaper` sweeps the directory only after this process
+    exits.
+    """
+    with open(os.path.join(str(path), OWNER_FILE), 'w') as f:
+        f.write(f'{socket.gethostname()}-{os.getpid()}')
+
+
+def _is_running(pid: int) -> bool:
+    """Check if process of ``pid`` is running."""
+    if sys.platform.startswith('win'):
+        # os.kill() terminates the process on Windows.
+        import ctypes
+        kernel32 = ctypes.windll.kernel32  # type: ignore
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            # ERROR_ACCESS_DENIED means the process exists.
+            return kernel32.GetLastError() == 5
+        try:
+            code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+            return code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def _is_orphan(path: str) -> bool:
+    """Check if user data directory is marked and its owner is dead."""
+    try:
+        with open(os.path.join(path, OWNER_FILE)) as f:
+            owner = f.read().strip()
+    except OSError:
+        # Not made by pyppeteer, or being made right now.
+        return False
+    hostname, _, pid = owner.rpartition('-')
+    if hostname != socket.gethostname() or not pid.isdigit():
+        # Can't check processes on other hosts
+        return False
+    return not _is_running(int(pid))
+
+
+def _find_orphans(root: str) -> Iterator[str]:
+    if not os.path.isdir(root):
+        return
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if os.path.isdir(path) and _is_orphan(path):
+            yield path
+
+
+_reaper: Optional[ProfileReaper] = None
+
+
+def get_reaper() -> ProfileReaper:
+    """Get the process-wide :class:`ProfileReaper`."""
+    global _reaper
+    if _reaper is None:
+        _reaper = ProfileReaper()
+    return _reaper
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Response cache module.
+
+:class:`ResponseCache` keeps responses of static resources and serves
+repeated requests for them with ``Fetch.fulfillRequest``, independently of
+the browser's HTTP cache (which is disabled by request interception and not
+shared between browsers).
+"""
+
+import asyncio
+import base64
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+DEFAULT_RESOURCE_TYPES = ('script', 'stylesheet', 'font', 'image')
+
+# Headers which do not apply to the decoded body served from the cache.
+_droppedHeaders = frozenset([
+    'content-encoding',
+    'content-length',
+    'transfer-encoding',
+    'connection',
+    'keep-alive',
+    'set-cookie',
+])
+
+_Vary = Tuple[Tuple[str, Optional[str]], ...]
+
+
+def _directives(value: str) -> Dict[str, Optional[str]]:
+    """Parse ``Cache-Control`` header value."""
+    result: Dict[str, Optional[str]] = dict()
+    for directive in value.split(','):
+        name, sep, arg = directive.strip().partition('=')
+        if name:
+            result[name.lower()] = arg.strip('"') if sep else None
+    return result
+
+
+def _vary_names(headers: Dict[str, str]) -> List[str]:
+    return sorted(set(
+        name.strip().lower()
+        for name in headers.get('vary', '').split(',') if name.strip()
+    ))
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    """Write ``data`` to ``path`` atomically via a unique temporary file."""
+    fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=str(path.parent))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, str(path))
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _parse_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def _lifetime(headers: Dict[str, str], cc: Dict[str, Optional[str]],
+              date: float) -> Optional[float]:
+    if 'max-age' in cc:
+        return float(cc['max-age'] or '')
+    if 'expires' in headers:
+        return (_parse_date(headers['expires']) or 0) - date
+    if 'last-modified' in headers:
+        lastModified = _parse_date(headers['last-modified'])
+        return (date - lastModified) / 10 if lastModified else 0
+    return None
+
+
+def freshness_lifetime(headers: Dict[str, str], now: float = None
+                       ) -> Optional[float]:
+    """Get seconds for which a response with ``headers`` stays fresh.
+
+    ``headers`` must have lower-case names. Freshness is computed from
+    ``Cache-Control: max-age``, ``Expires``, or heuristically from
+    ``Last-Modified`` (10% of its age), minus ``Age``. Return ``None`` if
+    the response must not be stored (e.g. ``no-store``, ``no-cache``,
+    ``Vary: *`` or already stale).
+    """
+    now = time.time() if now is None else now
+    cc = _directives(headers.get('cache-control', ''))
+    if 'no-store' in cc or 'no-cache' in cc:
+        return None
+    if headers.get('vary', '').strip() == '*':
+        return None
+    try:
+        age = float(headers.get('age') or 0)
+        date = _parse_date(headers.get('date')) or now
+        lifetime = _lifetime(headers, cc, date)
+    except ValueError:
+        return None
+    if lifetime is None:
+        return None
+    ttl = lifetime - age
+    return ttl if ttl > 0 else None
+
+
+class _Entry(object):
+    def __init__(self, key: str, url: str, vary: _Vary, status: int,
+                 headers: List[Dict[str, str]], expires: float, size: int,
+                 body: Optional[bytes] = None) -> None:
+        self.key = key
+        self.url = url
+        self.vary = vary
+        self.status = status
+        self.headers = headers
+        self.expires = expires
+        self.size = size
+        self.body = body
+
+    def _meta(self) -> Dict[str, Any]:
+        return {'url': self.url, 'vary': self.vary, 'status': self.status,
+                'headers': self.headers, 'expires': self.expires,
+                'size': self.size}
+
+
+class ResponseCache(object):
+    """LRU cache of responses of static resources.
+
+    Enable the cache on pages by
+    :meth:`~pyppeteer.page.Page.setResponseCache`. A cache can be shared by
+    any number of pages (of any browsers in the same process).
+
+    GET requests of ``resourceTypes`` are served from the cache if a fresh
+    response for the URL (and the request headers listed in its ``Vary``
+    header) is cached. Otherwise the response is stored if its
+    ``Cache-Control`` or ``Expires`` header allows, unless it is
+    ``Cache-Control: private``, varies by ``Cookie``, or is larger than
+    ``maxSize``.
+
+    :arg int maxSize: Maximum total size of cached bodies in bytes. Least
+                      recently used responses are evicted over this size.
+    :arg path: Directory to store responses in. If given, bodies are kept on
+               disk instead of memory and reused by later processes.
+    :arg resourceTypes: Resource types to cache. Defaults to ``script``,
+                        ``stylesheet``, ``font`` and ``image``.
+    """
+
+    def __init__(self, maxSize: int = DEFAULT_MAX_SIZE,
+                 path: Union[str, Path] = None,
+                 resourceTypes: Sequence[str] = DEFAULT_RESOURCE_TYPES
+                 ) -> None:
+        from pyppeteer.router import resourceTypes as _resourceTypes
+        for resourceType in resourceTypes:
+            if resourceType not in _resourceTypes:
+                raise ValueError(f'Unknown resource type: {resourceType}')
+        self.maxSize = maxSize
+        self._types = frozenset(_resourceTypes[t] for t in resourceTypes)
+        self._path = Path(path) if path is not None else None
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._variants: Dict[str, List[str]] = dict()
+        #: Total size of cached bodies in bytes.
+        self.size = 0
+        #: Number of requests served from the cache.
+        self.hits = 0
+        #: Number of cacheable requests not found in the cache.
+        self.misses = 0
+        if self._path is not None:
+            self._path.mkdir(parents=True, exist_ok=True)
+            self._load()
+
+    def __len__(self) -> int:
+        """Get number of cached responses."""
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        for key in list(self._entries):
+            self._remove(key)
+
+    def _patterns(self) -> List[Dict[str, str]]:
+        return [{'urlPattern': '*', 'resourceType': t, 'requestStage': stage}
+                for t in sorted(self._types)
+                for stage in ('Request', 'Response')]
+
+    def _cacheable(self, event: Dict) -> bool:
+        request = event.get('request', {})
+        if (request.get('method') != 'GET' or
+                event.get('resourceType') not in self._types):
+            return False
+        headers = {k.lower(): v for k, v in request.get('headers', {}).items()}
+        cc = _directives(headers.get('cache-control', ''))
+        return ('range' not in headers and 'no-store' not in cc and
+                'no-cache' not in cc)
+
+    def _lookup(self, event: Dict) -> Optional[_Entry]:
+        """Find fresh response for request paused at request stage."""
+        if not self._cacheable(event):
+            return None
+        request = event['request']
+        headers = {k.lower(): v for k, v in request.get('headers', {}).items()}
+        for key in self._variants.get(request.get('url', ''), []):
+            entry = self._entries[key]
+            if all(headers.get(name) == value for name, value in entry.vary):
+                if entry.expires <= time.time():
+                    self._remove(key)
+                    break
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        self.misses += 1
+        return None
+
+    def _storable(self, event: Dict) -> bool:
+        """Check if response paused at response stage can be stored.
+
+        Checked before getting the body, so that responses which are not
+        stored are continued without ``Fetch.getResponseBody``.
+        """
+        if not (event.get('responseStatusCode') == 200 and
+                self._cacheable(event)):
+            return False
+        headers = {h['name'].lower(): h['value']
+                   for h in event.get('responseHeaders', [])}
+        if freshness_lifetime(headers) is None:
+            return False
+        if 'private' in _directives(headers.get('cache-control', '')):
+            return False
+        if 'cookie' in _vary_names(headers):
+            return False
+        length = headers.get('content-length', '')
+        return not (length.isdigit() and int(length) > self.maxSize)
+
+    async def _store(self, event: Dict, body: bytes) -> None:
+        responseHeaders = event.get('responseHeaders', [])
+        headers = {h['name'].lower(): h['value'] for h in responseHeaders}
+        ttl = freshness_lifetime(headers)
+        if ttl is None or len(body) > self.maxSize:
+            return
+        request = event['request']
+        requestHeaders = {k.lower(): v for k, v in
+                          request.get('headers', {}).items()}
+        vary = tuple((name, requestHeaders.get(name))
+                     for name in _vary_names(headers))
+        url = request['url']
+        key = hashlib.sha256(
+            json.dumps([url, vary]).encode('utf-8')).hexdigest()
+        entry = _Entry(
+            key, url, vary, 200,
+            [h for h in responseHeaders
+             if h['name'].lower() not in _droppedHeaders],
+            time.time() + ttl, len(body))
+        if self._path is None:
+            entry.body = body
+        else:
+            await asyncio.get_event_loop().run_in_executor(
+                None, self._write, entry, body)
+        if key in self._entries:
+            # Files of the old entry are already replaced.
+            self._remove(key, keepFiles=True)
+        self._add(entry)
+        self._evict()
+
+    def _fulfillParams(self, entry: _Entry, requestId: str
+                       ) -> Optional[Dict[str, Any]]:
+        """Make ``Fetch.fulfillRequest`` parameters to serve ``entry``."""
+        body = entry.body
+        if body is None:
+            try:
+                body = (self._path / f'{entry.key}.body').read_bytes()  # type: ignore  # noqa: E501
+            except OSError as e:
+                logger.warning(f'failed to read cached response: {e}')
+                self._remove(entry.key)
+                return None
+        return {
+            'requestId': requestId,
+            'responseCode': entry.status,
+            'responseHeaders': entry.headers,
+            'body': base64.b64encode(body).decode('ascii'),
+        }
+
+    def _add(self, entry: _Entry) -> None:
+        self._entries[entry.key] = entry
+        self._variants.setdefault(entry.url, []).append(entry.key)
+        self.size += entry.size
+
+    def _remove(self, key: str, keepFiles: bool = False) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+        variants = self._variants[entry.url]
+        variants.remove(key)
+        if not variants:
+            del self._variants[entry.url]
+        if self._path is not None and not keepFiles:
+            for suffix in ('.json', '.body'):
+                try:
+                    os.remove(str(self._path / f'{key}{suffix}'))
+                except OSError:
+                    pass
+
+    def _evict(self) -> None:
+        while self.size > self.maxSize:
+            self._remove(next(iter(self._entries)))
+
+    def _write(self, entry: _Entry, body: bytes) -> None:
+        path = self._path / entry.key  # type: ignore
+        _write_file(path.with_suffix('.body'), body)
+        _write_file(path.with_suffix('.json'),
+                    json.dumps(entry._meta()).encode('utf-8'))
+
+    def _load(self) -> None:
+        """Load index of responses stored in the directory."""
+        metas = sorted(self._path.glob('*.json'),  # type: ignore
+                       key=lambda p: p.stat().st_mtime)
+        now = time.time()
+        for meta in metas:
+            try:
+                data = json.loads(meta.read_text())
+                vary = tuple((name, value) for name, value in data['vary'])
+                entry = _Entry(meta.stem, data['url'], vary, data['status'],
+                               data['headers'], data['expires'], data['size'])
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f'ignore broken cache entry {meta}: {e}')
+                continue
+            self._add(entry)
+            if entry.expires <= now or \
+                    not meta.with_suffix('.body').exists():
+                self._remove(entry.key)
+        self._evict()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Declarative request routing module.
+
+Routing rules are pushed to the browser as ``Fetch.enable`` patterns, so
+requests which do not match any rule are never paused, and the action of a
+matched rule is applied right in the ``Fetch.requestPaused`` handler without
+calling back user code.
+"""
+
+import base64
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional, Pattern, Union
+from typing import TYPE_CHECKING
+
+from pyppeteer.connection import CDPSession
+from pyppeteer.errors import BrowserError, NetworkError
+from pyppeteer.helper import debugError
+from pyppeteer.response_cache import ResponseCache
+from pyppeteer.util import merge_dict
+
+if TYPE_CHECKING:
+    from pyppeteer.har import HarReplay  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+#: Route actions.
+ACTIONS = ('continue', 'abort', 'fulfill', 'stream')
+
+# Resource types in ``Request.resourceType`` form to protocol form.
+resourceTypes = {
+    'document': 'Document',
+    'stylesheet': 'Stylesheet',
+    'image': 'Image',
+    'media': 'Media',
+    'font': 'Font',
+    'script': 'Script',
+    'texttrack': 'TextTrack',
+    'xhr': 'XHR',
+    'fetch': 'Fetch',
+    'eventsource': 'EventSource',
+    'websocket': 'WebSocket',
+    'manifest': 'Manifest',
+    'signedexchange': 'SignedExchange',
+    'ping': 'Ping',
+    'cspviolationreport': 'CSPViolationReport',
+    'other': 'Other',
+}
+
+
+def glob_to_regex(pattern: str) -> Pattern:
+    r"""Convert URL pattern of the protocol to regular expression.
+
+    ``*`` matches zero or more characters, ``?`` matches one character, and
+    ``\`` escapes the next character.
+    """
+    parts = []
+    escaped = False
+    for c in pattern:
+        if escaped:
+            parts.append(re.escape(c))
+            escaped = False
+        elif c == '\\':
+            escaped = True
+        elif c == '*':
+            parts.append('.*')
+        elif c == '?':
+            parts.append('.')
+        else:
+            parts.append(re.escape(c))
+    return re.compile(''.join(parts) + r'\Z', re.DOTALL)
+
+
+class Route(object):
+    """Routing rule made by :meth:`pyppeteer.page.Page.addRoute`."""
+
+    def __init__(self, options: dict) -> None:
+        url = options.get('url', '*')
+        action = options.get('action', 'continue')
+        if action not in ACTIONS:
+            raise ValueError(f'Unknown route action: {action}')
+        resourceType = options.get('resourceType')
+        if resourceType is not None and resourceType not in resourceTypes:
+            raise ValueError(f'Unknown resource type: {resourceType}')
+        # network_manager module imports this module.
+        from pyppeteer.network_manager import errorReasons
+        errorCode = options.get('errorCode', 'failed')
+        if action == 'abort' and errorCode not in errorReasons:
+            raise ValueError(f'Unknown error code: {errorCode}')
+
+        self._url: Union[str, Pattern] = url
+        if isinstance(url, str):
+            self._urlRegex = glob_to_regex(url)
+            self._urlPattern = url
+        else:
+            # Regex can not be a protocol pattern; let the browser pause
+            # all URLs and match in python.
+            self._urlRegex = url
+            self._urlPattern = '*'
+        self._resourceType: Optional[str] = resourceType
+        self._protocolResourceType: Optional[str] = resourceTypes.get(
+            resourceType or '')
+        method = options.get('method')
+        self._method = method.upper() if method else None
+        self._action: str = action
+        self._errorReason = errorReasons.get(errorCode)
+        self._response: Dict[str, Any] = options.get('response') or {}
+        self._headers: Dict[str, Optional[str]] = {
+            k.lower(): v for k, v in (options.get('headers') or {}).items()}
+        #: Number of requests handled by this route.
+        self.hits = 0
+
+    @property
+    def action(self) -> str:
+        """Action of this route."""
+        return self._action
+
+    def _pattern(self) -> Dict[str, str]:
+        stage = 'Response' if self._action == 'stream' else 'Request'
+        pattern = {'urlPattern': self._urlPattern, 'requestStage': stage}
+        if self._protocolResourceType is not None:
+            pattern['resourceType'] = self._protocolResourceType
+        return pattern
+
+    def _match(self, event: Dict) -> bool:
+        request = event.get('request', {})
+        if self._method and request.get('method') != self._method:
+            return False
+        if (self._resourceType and
+                event.get('resourceType') != self._protocolResourceType):
+            return False
+        return bool(self._urlRegex.match(request.get('url', '')))
+
+    def _command(self, event: Dict) -> Dict[str, Any]:
+        """Get protocol command to apply this route to paused request."""
+        requestId = event['requestId']
+        if self._action == 'abort':
+            return {'method': 'Fetch.failRequest', 'params': {
+                'requestId': requestId, 'errorReason': self._errorReason}}
+        if self._action == 'fulfill':
+            return {'method': 'Fetch.fulfillRequest',
+                    'params': fulfillParams(requestId, self._response)}
+        params: Dict[str, Any] = {'requestId': requestId}
+        if self._headers:
+            headers = {k.lower(): v for k, v in
+                       event.get('request', {}).get('headers', {}).items()}
+            headers.update(self._headers)
+            params['headers'] = [{'name': k, 'value': v}
+                                 for k, v in headers.items() if v is not None]
+        return {'method': 'Fetch.continueRequest', 'params': params}
+
+
+def fulfillParams(requestId: str, response: Dict[str, Any]) -> Dict[str, Any]:
+    """Make ``Fetch.fulfillRequest`` parameters from ``response``.
+
+    ``response`` has the same fields as the argument of
+    :meth:`pyppeteer.network_manager.Request.respond`.
+    """
+    body = response.get('body')
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    headers = {k.lower(): str(v)
+               for k, v in (response.get('headers') or {}).items()}
+    if response.get('contentType'):
+        headers['content-type'] = response['contentType']
+    if body and 'content-length' not in headers:
+        headers['content-length'] = str(len(body))
+    params: Dict[str, Any] = {
+        'requestId': requestId,
+        'responseCode': response.get('status', 200),
+        'responseHeaders': [{'name': k, 'value': v}
+                            for k, v in headers.items()],
+    }
+    if body:
+        params['body'] = base64.b64encode(body).decode('ascii')
+    return params
+
+
+class Router(object):
+    """Apply routes to requests on the Fetch domain of a session.
+
+    Requests paused by the patterns of the routes but matched by none of
+    them (e.g. by a method or a regular expression) are served from the HAR
+    replay or the response cache if set, or continued.
+    """
+
+    def __init__(self, client: CDPSession,
+                 onResponseStream: Optional[Callable[[Dict, str], None]] = None
+                 ) -> None:
+        self._client = client
+        # Called with the paused event and the stream handle of the body of
+        # responses taken by ``stream`` routes.
+        self._onResponseStream = onResponseStream
+        self._routes: List[Route] = list()
+        self._cache: Optional[ResponseCache] = None
+        self._replay: Optional['HarReplay'] = None
+        self._enabled = False
+        self._client.on('Fetch.requestPaused', self._onRequestPaused)
+
+    @property
+    def routes(self) -> List[Route]:
+        """List of the routes in order of priority."""
+        return list(self._routes)
+
+    async def addRoute(self, options: dict = None, **kwargs: Any) -> Route:
+        """Add a route. Details see :meth:`pyppeteer.page.Page.addRoute`."""
+        route = Route(merge_dict(options, kwargs))
+        self._routes.append(route)
+        try:
+            await self._update()
+        except BrowserError:
+            self._routes.remove(route)
+            raise
+        return route
+
+    async def removeRoute(self, route: Route) -> None:
+        """Remove ``route``."""
+        if route in self._routes:
+            self._routes.remove(route)
+            await self._update()
+
+    async def clearRoutes(self) -> None:
+        """Remove all routes."""
+        self._routes.clear()
+        await self._update()
+
+    async def setResponseCache(self, cache: Optional[ResponseCache]
+                               ) -> None:
+        """Set response cache, or unset it by ``None``."""
+        oldCache, self._cache = self._cache, cache
+        try:
+            await self._update()
+        except BrowserError:
+            self._cache = oldCache
+            raise
+
+    async def setReplay(self, replay: Optional['HarReplay']) -> None:
+        """Set HAR replay, or unset it by ``None``."""
+        oldReplay, self._replay = self._replay, replay
+        try:
+            await self._update()
+        except BrowserError:
+            self._replay = oldReplay
+            raise
+
+    async def _update(self) -> None:
+        patterns: List[Dict[str, str]] = list()
+        for route in self._routes:
+            pattern = route._pattern()
+            if pattern not in patterns:
+                patterns.append(pattern)
+        if self._replay is not None:
+            patterns.extend(self._replay._patterns())
+        if self._cache is not None:
+            patterns.extend(self._cache._patterns())
+        if not patterns:
+            if self._enabled:
+                self._enabled = False
+                await self._client.send('Fetch.disable')
+            return
+        await self._enable(patterns)
+        self._enabled = True
+
+    async def _enable(self, patterns: List[Dict[str, str]]) -> None:
+        try:
+            await self._client.send('Fetch.enable', {'patterns': patterns})
+        except NetworkError as e:
+            # Browsers older than Chromium 74 do not have the Fetch domain.
+            if "'Fetch.enable' wasn't found" in str(e):
+                raise BrowserError(
+                    'Routing needs the Fetch domain of the protocol, which '
+                    'is available on Chromium 74 or later.') from None
+            raise
+
+    def _onRequestPaused(self, event: Dict) -> None:
+        if not self._enabled:
+            # Paused by other users of the Fetch domain.
+            return
+        if event.get('responseStatusCode') is not None:
+            self._onResponsePaused(event)
+            return
+        command = self._requestCommand(event)
+        self._client._loop.create_task(
+            self._send(command['method'], command['params']))
+
+    def _onResponsePaused(self, event: Dict) -> None:
+        requestId = event['requestId']
+        loop = self._client._loop
+        streamRoutes = [r for r in self._routes if r._action == 'stream']
+        if 200 <= event['responseStatusCode'] < 300:
+            for route in streamRoutes:
+                if route._match(event):
+                    route.hits += 1
+                    loop.create_task(self._takeResponseStream(event))
+                    return
+        if self._cache is not None and self._cache._storable(event):
+            loop.create_task(self._storeResponse(self._cache, event))
+        elif self._cache is not None or streamRoutes:
+            loop.create_task(self._send(
+                'Fetch.continueRequest', {'requestId': requestId}))
+        # Otherwise paused by other users of the Fetch domain.
+
+    def _requestCommand(self, event: Dict) -> Dict[str, Any]:
+        """Get protocol command for request paused at request stage."""
+        for route in self._routes:
+            if route._action != 'stream' and route._match(event):
+                route.hits += 1
+                return route._command(event)
+        if self._replay is not None:
+            command = self._replay._command(event)
+            if command is not None:
+                return command
+        requestId = event['requestId']
+        entry = self._cache._lookup(event) if self._cache else None
+        params = entry and self._cache._fulfillParams(  # type: ignore
+            entry, requestId)
+        if params:
+            return {'method': 'Fetch.fulfillRequest', 'params': params}
+        return {'method': 'Fetch.continueRequest',
+                'params': {'requestId': requestId}}
+
+    async def _storeResponse(self, cache: ResponseCache, event: Dict
+                             ) -> None:
+        requestId = event['requestId']
+        try:
+            result = await self._client.send(
+                'Fetch.getResponseBody', {'requestId': requestId})
+            body = result.get('body', '')
+            if result.get('base64Encoded'):
+                await cache._store(event, base64.b64decode(body))
+            else:
+                await cache._store(event, body.encode('utf-8'))
+        except Exception as e:
+            debugError(logger, e)
+        await self._send('Fetch.continueRequest', {'requestId': requestId})
+
+    async def _takeResponseStream(self, event: Dict) -> None:
+        requestId = event['requestId']
+        try:
+            result = await self._client.send(
+                'Fetch.takeResponseBodyAsStream', {'requestId': requestId})
+        except Exception as e:
+            debugError(logger, e)
+            await self._send('Fetch.continueRequest', {'requestId': requestId})
+            return
+        if self._onResponseStream is not None:
+            self._onResponseStream(event, result['stream'])
+        else:
+            await self._send('IO.close', {'handle': result['stream']})
+            await self._send('Fetch.failRequest', {
+                'requestId': requestId, 'errorReason': 'Aborted'})
+
+    async def _send(self, method: str, params: Dict) -> None:
+        try:
+            await self._client.send(method, params)
+        except Exception as e:
+            debugError(logger, e)
@@ -58,6 +58,9 @@ class Target(object):
         If the target is not of type "page" or "background_page", return
         ``None``.
         """
+        return await self._getPage()
+
+    async def _getPage(self, domains: List[str] = None) -> Optional[Page]:
         if (self._targetInfo['type'] in ['page', 'background_page'] and
                 self._page is None):
             client = await self._sessionFactory()
@@ -66,6 +69,7 @@ class Target(object):
                 self._ignoreHTTPSErrors,
                 self._defaultViewport,
                 self._screenshotTaskQueue,
+                domains,
             )
             self._page = new_page
             return new_page
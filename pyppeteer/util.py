@@ -8,13 +8,14 @@ import socket
 from typing import Dict, Optional
 
 from pyppeteer.chromium_downloader import check_chromium, chromium_executable
-from pyppeteer.chromium_downloader import download_chromium
+from pyppeteer.chromium_downloader import download_chromium, install_chromium
 
 __all__ = [
     'check_chromium',
     'chromium_executable',
     'download_chromium',
     'get_free_port',
+    'install_chromium',
     'merge_dict',
 ]
 
@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
 import unittest
 
+from pyee import EventEmitter
 from syncer import sync
 
 from pyppeteer import launch
@@ -12,6 +14,9 @@ from .server import get_application
 
 DEFAULT_OPTIONS = {'args': ['--no-sandbox']}
 
+# The Fetch domain of the protocol is available on Chromium 74 or later.
+FETCH_VERSION = 74
+
 
 class BaseTestCase(unittest.TestCase):
     @classmethod
@@ -39,3 +44,76 @@ class BaseTestCase(unittest.TestCase):
 
     def set_result(self, value):
         self.result = value
+
+
+class FetchTestCase(BaseTestCase):
+    """Test case skipped on browsers without the Fetch domain."""
+
+    def setUp(self):
+        version = sync(self.browser.version())
+        if int(version.split('/')[-1].split('.')[0]) < FETCH_VERSION:
+            self.skipTest(f'{version} does not have the Fetch domain')
+        super().setUp()
+
+
+class LoopTestCase(unittest.TestCase):
+    """Test case which runs coroutines on its own event loop."""
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_loop(self, coro=None):
+        """Run ``coro`` and then callbacks scheduled by it."""
+        result = None
+        if coro is not None:
+            result = self.loop.run_until_complete(coro)
+        self.loop.run_until_complete(asyncio.sleep(0.01))
+        return result
+
+
+class FakeSession(EventEmitter):
+    """Session which records sent messages and returns canned replies.
+
+    ``replies`` maps a protocol method to its result, or to a function which
+    takes the params and returns the result.
+    """
+
+    def __init__(self, loop, replies=None):
+        super().__init__()
+        self._loop = loop
+        self.replies = dict(replies or {})
+        self.sent = []
+
+    @property
+    def methods(self):
+        return [method for method, _ in self.sent]
+
+    async def send(self, method, params=None):
+        self.sent.append((method, params))
+        reply = self.replies.get(method, {})
+        if callable(reply):
+            return reply(params)
+        return reply
+
+
+def paused(url, method='GET', resourceType='Image', headers=None,
+           status=None, responseHeaders=None, **fields):
+    """Make ``Fetch.requestPaused`` event.
+
+    The event is paused at response stage if ``status`` is given.
+    """
+    event = {
+        'requestId': 'interception-1',
+        'resourceType': resourceType,
+        'request': {'url': url, 'method': method, 'headers': headers or {}},
+    }
+    if status is not None:
+        event['responseStatusCode'] = status
+        event['responseHeaders'] = [
+            {'name': k, 'value': v}
+            for k, v in (responseHeaders or {}).items()]
+    event.update(fields)
+    return event
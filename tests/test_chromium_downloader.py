@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import base64
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import io
+import os
+from pathlib import Path
+import re
+import socketserver
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import zipfile
+
+from urllib3.exceptions import HTTPError
+
+from pyppeteer import chromium_downloader
+from pyppeteer.chromium_downloader import chromium_executable, download_zip
+from pyppeteer.chromium_downloader import extract_zip, install_chromium
+
+
+class _Server(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def _respond(self, head):
+        app = self.server.app
+        body = app.body
+        match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if not head:
+            app.ranges.append(match.group(0) if match else None)
+        if match and app.acceptRanges:
+            start = int(match.group(1))
+            end = int(match.group(2) or len(body) - 1) + 1
+            self.send_response(206)
+            self.send_header('Content-Range',
+                             f'bytes {start}-{end - 1}/{len(body)}')
+        else:
+            start, end = 0, len(body)
+            self.send_response(200)
+        if app.acceptRanges:
+            self.send_header('Accept-Ranges', 'bytes')
+        if app.md5:
+            self.send_header('x-goog-hash', f'crc32c=AAAAAA==, md5={app.md5}')
+        self.send_header('Content-Length', str(end - start))
+        self.end_headers()
+        if head:
+            return
+        if app.breakAfter is not None:
+            # Simulate broken connection.
+            end = min(end, start + app.breakAfter)
+            app.breakAfter = None
+        self.wfile.write(body[start:end])
+
+
+class _ServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.server = _Server(('127.0.0.1', 0), _Handler)
+        self.server.app = self
+        self.ranges = []
+        self.acceptRanges = True
+        self.breakAfter = None
+        self.md5 = None
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.host = 'http://127.0.0.1:{}'.format(
+            self.server.server_address[1])
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self._tmpdir.cleanup()
+
+
+class TestDownload(_ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.body = os.urandom(300 * 1024 + 7)
+        self.url = self.host + '/chrome.zip'
+        self.path = self.root / 'chrome.zip'
+        self.part = self.root / 'chrome.zip.part'
+
+    def test_download(self):
+        path = download_zip(self.url, self.path)
+        self.assertEqual(path, self.path)
+        self.assertEqual(path.read_bytes(), self.body)
+        self.assertFalse(self.part.exists())
+        self.assertEqual(self.ranges, [None])
+
+    def test_resume_broken_connection(self):
+        self.breakAfter = breakAfter = 100000
+        path = download_zip(self.url, self.path)
+        self.assertEqual(path.read_bytes(), self.body)
+        self.assertEqual(len(self.ranges), 2)
+        self.assertIsNone(self.ranges[0])
+        # Resumed from the last complete chunk, whose size depends on urllib3
+        match = re.fullmatch(r'bytes=(\d+)-307206', self.ranges[1])
+        self.assertTrue(match, self.ranges[1])
+        self.assertGreater(int(match.group(1)), 0)
+        self.assertLessEqual(int(match.group(1)), breakAfter)
+
+    def test_resume_partial_file(self):
+        self.part.write_bytes(self.body[:12345])
+        path = download_zip(self.url, self.path)
+        self.assertEqual(path.read_bytes(), self.body)
+        self.assertEqual(self.ranges, ['bytes=12345-307206'])
+
+    def test_resume_without_range_support(self):
+        self.acceptRanges = False
+        self.part.write_bytes(b'garbage')
+        path = download_zip(self.url, self.path)
+        self.assertEqual(path.read_bytes(), self.body)
+
+    def test_segments(self):
+        path = download_zip(self.url, self.path, segments=4)
+        self.assertEqual(path.read_bytes(), self.body)
+        self.assertEqual(len(self.ranges), 4)
+        self.assertIn('bytes=0-76801', self.ranges)
+        self.assertIn('bytes=230406-307206', self.ranges)
+
+    def test_segments_broken_connection(self):
+        self.breakAfter = 1000
+        path = download_zip(self.url, self.path, segments=3)
+        self.assertEqual(path.read_bytes(), self.body)
+        self.assertEqual(len(self.ranges), 4)
+
+    def test_resume_segments(self):
+        self.breakAfter = 1000
+        with mock.patch.object(chromium_downloader, 'DOWNLOAD_RETRIES', 0):
+            with self.assertRaises(HTTPError):
+                download_zip(self.url, self.path, segments=3)
+        self.assertTrue(self.part.exists())
+        state = self.root / 'chrome.zip.part.json'
+        self.assertTrue(state.exists())
+        self.ranges.clear()
+        path = download_zip(self.url, self.path, segments=3)
+        self.assertEqual(path.read_bytes(), self.body)
+        # Only the rest of the interrupted segment is downloaded again.
+        self.assertEqual(len(self.ranges), 1)
+        self.assertRegex(self.ranges[0], r'bytes=\d+-(102402|204805|307206)')
+        self.assertFalse(state.exists())
+
+    def test_resume_segments_without_state(self):
+        self.part.write_bytes(bytes(len(self.body)))
+        (self.root / 'chrome.zip.part.json').write_text('broken')
+        path = download_zip(self.url, self.path, segments=3)
+        self.assertEqual(path.read_bytes(), self.body)
+        self.assertEqual(len(self.ranges), 3)
+
+    def test_digest(self):
+        digest = 'sha256:' + hashlib.sha256(self.body).hexdigest()
+        path = download_zip(self.url, self.path, digest=digest)
+        self.assertEqual(path.read_bytes(), self.body)
+
+    def test_digest_mismatch(self):
+        with self.assertRaises(IOError):
+            download_zip(self.url, self.path, digest='sha256:' + '0' * 64)
+        self.assertFalse(self.path.exists())
+        self.assertFalse(self.part.exists())
+
+    def test_server_digest(self):
+        self.md5 = base64.b64encode(hashlib.md5(self.body).digest()).decode()
+        path = download_zip(self.url, self.path)
+        self.assertEqual(path.read_bytes(), self.body)
+
+    def test_server_digest_mismatch(self):
+        self.md5 = base64.b64encode(hashlib.md5(b'').digest()).decode()
+        with self.assertRaises(IOError):
+            download_zip(self.url, self.path)
+        self.assertFalse(self.part.exists())
+
+
+def _make_zip() -> bytes:
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, 'w') as zf:
+        zf.writestr('chrome-linux/chrome', b'#!/bin/sh\n')
+    return data.getvalue()
+
+
+@unittest.skipIf(chromium_downloader.current_platform() == 'mac',
+                 'mac uses unzip command')
+class TestExtract(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmpdir.name)
+        self.zip_path = self.root / 'chrome.zip'
+        self.zip_path.write_bytes(_make_zip())
+        self.dest = self.root / 'extracted'
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_extract_path(self):
+        extract_zip(self.zip_path, self.dest, 'linux')
+        exec_path = self.dest / 'chrome-linux' / 'chrome'
+        self.assertEqual(exec_path.read_bytes(), b'#!/bin/sh\n')
+        self.assertTrue(os.access(str(exec_path), os.X_OK))
+
+    def test_extract_fileobj(self):
+        extract_zip(io.BytesIO(_make_zip()), self.dest, 'linux')
+        self.assertTrue((self.dest / 'chrome-linux' / 'chrome').exists())
+
+    def test_extract_broken(self):
+        with self.assertRaises(IOError):
+            extract_zip(self.zip_path, self.dest, 'win64')
+
+
+@unittest.skipIf(chromium_downloader.current_platform() == 'mac',
+                 'mac uses unzip command')
+class TestInstall(_ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.body = _make_zip()
+        for name, value in (('DOWNLOADS_FOLDER', self.root),
+                            ('BASE_URL', self.host)):
+            patcher = mock.patch.object(chromium_downloader, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.exec_path = self.root / 'linux-1234' / 'chrome-linux' / 'chrome'
+
+    def test_install(self):
+        exec_path = install_chromium('1234', 'linux')
+        self.assertEqual(exec_path, self.exec_path)
+        self.assertTrue(exec_path.exists())
+        self.assertEqual(len(self.ranges), 1)
+        # Only the installed build and the lock file are left.
+        self.assertEqual(sorted(p.name for p in self.root.iterdir()),
+                         ['.linux-1234.lock', 'linux-1234'])
+        self.assertEqual(chromium_executable('1234', 'linux'), exec_path)
+
+    def test_installed(self):
+        install_chromium('1234', 'linux')
+        install_chromium('1234', 'linux')
+        self.assertEqual(len(self.ranges), 1)
+
+    def test_multiple_revisions(self):
+        install_chromium('1234', 'linux')
+        install_chromium('5678', 'linux')
+        self.assertEqual(len(self.ranges), 2)
+        self.assertTrue(self.exec_path.exists())
+        self.assertTrue(chromium_executable('5678', 'linux').exists())
+
+    def test_concurrent_install(self):
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(
+                lambda _: install_chromium('1234', 'linux'), range(4)))
+        self.assertEqual(results, [self.exec_path] * 4)
+        self.assertEqual(len(self.ranges), 1)
+
+    def test_failed_install(self):
+        self.body = b'not a zip file'
+        with self.assertRaises(Exception):
+            install_chromium('1234', 'linux')
+        self.assertFalse(self.exec_path.parent.parent.exists())
+        self.body = _make_zip()
+        self.assertEqual(install_chromium('1234', 'linux'), self.exec_path)
+
+    def test_legacy_path(self):
+        legacy = self.root / '1234' / 'chrome-linux' / 'chrome'
+        legacy.parent.mkdir(parents=True)
+        legacy.touch()
+        self.assertEqual(install_chromium('1234', 'linux'), legacy)
+        self.assertEqual(self.ranges, [])
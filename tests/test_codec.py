@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import unittest
+
+from pyppeteer.codec import JSONCodec, StdlibCodec, get_codec
+
+MESSAGE = {
+    'id': 1,
+    'method': 'Runtime.evaluate',
+    'params': {'expression': '"あ" + 1', 'returnByValue': True},
+}
+
+
+class TestCodec(unittest.TestCase):
+    def check_codec(self, codec):
+        data = codec.dumps(MESSAGE)
+        self.assertIsInstance(data, str)
+        self.assertEqual(json.loads(data), MESSAGE)
+        self.assertEqual(codec.loads(data), MESSAGE)
+        self.assertEqual(codec.loads(data.encode()), MESSAGE)
+
+    def test_auto(self):
+        self.check_codec(get_codec())
+        self.check_codec(get_codec(None))
+
+    def test_stdlib(self):
+        codec = get_codec('json')
+        self.assertIsInstance(codec, StdlibCodec)
+        self.check_codec(codec)
+
+    def test_optional_codecs(self):
+        for name in ('orjson', 'msgspec'):
+            try:
+                codec = get_codec(name)
+            except ImportError:
+                continue
+            self.assertEqual(codec.name, name)
+            self.check_codec(codec)
+
+    def test_stdlib_compatible(self):
+        # Accepted by the standard library but not by orjson.
+        obj = {'params': {1: 'a', 'b': 2 ** 70}}
+        for name in ('auto', 'orjson', 'msgspec'):
+            try:
+                codec = get_codec(name)
+            except ImportError:
+                continue
+            self.assertEqual(json.loads(codec.dumps(obj)),
+                             json.loads(json.dumps(obj)))
+
+    def test_lone_surrogate(self):
+        # Chrome sends lone surrogates in strings from javascript as-is.
+        data = '{"id": 1, "result": {"value": "\\ud800"}}'
+        obj = {'id': 1, 'result': {'value': '\ud800'}}
+        for name in ('auto', 'json', 'orjson', 'msgspec'):
+            try:
+                codec = get_codec(name)
+            except ImportError:
+                continue
+            self.assertEqual(codec.loads(data), obj)
+            self.assertEqual(codec.loads(data.encode()), obj)
+            self.assertEqual(codec.loads(codec.dumps(obj)), obj)
+
+    def test_instance(self):
+        codec = StdlibCodec()
+        self.assertIs(get_codec(codec), codec)
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            get_codec('yaml')
+
+    def test_base_codec(self):
+        with self.assertRaises(NotImplementedError):
+            JSONCodec().dumps(MESSAGE)
@@ -1,11 +1,19 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
+import json
+import unittest
+
 from syncer import sync
 
+from pyppeteer import launch
+from pyppeteer.codec import get_codec
+from pyppeteer.connection import Connection
 from pyppeteer.errors import NetworkError
 
-from .base import BaseTestCase
+from .base import BaseTestCase, DEFAULT_OPTIONS, LoopTestCase
+from .utils import waitEvent
 
 
 class TestConnection(BaseTestCase):
@@ -15,6 +23,71 @@ class TestConnection(BaseTestCase):
             await self.page._client.send('ThisCommand.DoesNotExists')
         self.assertIn('ThisCommand.DoesNotExists', cm.exception.args[0])
 
+    @sync
+    async def test_concurrent_send(self):
+        results = await asyncio.gather(*[
+            self.page._client.send('Runtime.evaluate', {
+                'expression': f'{i} * 2', 'returnByValue': True,
+            }) for i in range(100)
+        ])
+        self.assertEqual([r['result']['value'] for r in results],
+                         [i * 2 for i in range(100)])
+
+
+class EchoTransport(object):
+    """Transport which replies to each command with its ``params``."""
+
+    def __init__(self):
+        self._messages = asyncio.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def recv(self):
+        message = await self._messages.get()
+        if message is None:
+            raise ConnectionResetError('Transport closed.')
+        return message
+
+    async def send(self, message):
+        msg = json.loads(message)
+        # Encode by hand to keep lone surrogates escaped, as Chrome does.
+        self._messages.put_nowait(
+            '{"id": %d, "result": %s}' % (msg['id'], msg['params']['raw']))
+
+    async def close(self):
+        self._messages.put_nowait(None)
+
+
+class TestConnectionCodec(LoopTestCase):
+    def check_codec(self, codec):
+        async def run():
+            connection = Connection('', self.loop, codec=codec,
+                                    transport=EchoTransport())
+            # A message which kills the connection never gets a reply
+            result = await asyncio.wait_for(connection.send(
+                'Runtime.evaluate', {'raw': '{"value": "\\ud800"}'}), 5)
+            self.assertEqual(result, {'value': '\ud800'})
+            # The connection is still alive
+            result = await connection.send(
+                'Runtime.evaluate', {'raw': '{"value": 1}'})
+            self.assertEqual(result, {'value': 1})
+            await connection.dispose()
+
+        self.run_loop(run())
+
+    def test_lone_surrogate(self):
+        for name in ('json', 'orjson', 'msgspec'):
+            try:
+                codec = get_codec(name)
+            except ImportError:
+                continue
+            with self.subTest(codec=name):
+                self.check_codec(codec)
+
 
 class TestCDPSession(BaseTestCase):
     @sync
@@ -57,3 +130,52 @@ class TestCDPSession(BaseTestCase):
                 'Runtime.evaluate',
                 {'expression': '1 + 3', 'returnByValue': True}
             )
+
+
+class TestFlattenSession(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.browser = sync(launch(DEFAULT_OPTIONS, flatten=True))
+
+    @classmethod
+    def tearDownClass(cls):
+        sync(cls.browser.close())
+
+    def setUp(self):
+        self.page = sync(self.browser.newPage())
+
+    def tearDown(self):
+        sync(self.page.close())
+
+    @sync
+    async def test_flatten_session(self):
+        self.assertTrue(self.page._client._flatten)
+        self.assertIs(self.page._client._connection,
+                      self.browser._connection)
+        self.assertEqual(await self.page.evaluate('1 + 2'), 3)
+
+    @sync
+    async def test_create_session(self):
+        client = await self.page.target.createCDPSession()
+        self.assertTrue(client._flatten)
+        await client.send('Runtime.enable')
+        await client.send('Runtime.evaluate',
+                          {'expression': 'window.foo = "bar"'})
+        foo = await self.page.evaluate('window.foo')
+        self.assertEqual(foo, 'bar')
+
+    @sync
+    async def test_detach(self):
+        client = await self.page.target.createCDPSession()
+        await client.detach()
+        with self.assertRaises(NetworkError):
+            await client.send('Runtime.evaluate', {'expression': '1 + 3'})
+
+    @sync
+    async def test_worker(self):
+        workerCreated = waitEvent(self.page, 'workercreated')
+        await self.page.evaluate(
+            '() => new Worker("data:text/javascript,1")')
+        worker = await workerCreated
+        self.assertTrue(worker._client._flatten)
+        self.assertEqual(await worker.evaluate('1 + 2'), 3)
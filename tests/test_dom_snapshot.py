@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from syncer import sync
+
+from pyppeteer.dom_snapshot import DOMSnapshot, _numpy
+
+from .base import BaseTestCase
+
+# <html><body><div id="a">x</div><span>y</span></body></html>
+RESULT = {
+    'strings': ['#document', 'HTML', 'BODY', 'DIV', 'id', 'a', '#text', 'x',
+                'SPAN', 'y', 'block', 'inline', 'http://test/', 'Title'],
+    'documents': [{
+        'documentURL': 12,
+        'title': 13,
+        'nodes': {
+            'parentIndex': [-1, 0, 1, 2, 3, 2, 5],
+            'nodeType': [9, 1, 1, 1, 3, 1, 3],
+            'nodeName': [0, 1, 2, 3, 6, 8, 6],
+            'nodeValue': [-1, -1, -1, -1, 7, -1, 9],
+            'backendNodeId': [1, 2, 3, 4, 5, 6, 7],
+            'attributes': [[], [], [], [4, 5], [], [], []],
+        },
+        'layout': {
+            'nodeIndex': [1, 2, 3, 5],
+            'styles': [[10], [10], [10], [11]],
+            'bounds': [[0, 0, 800, 600], [8, 8, 784, 40], [8, 8, 784, 20],
+                       [8, 28, 10, 20]],
+            'text': [-1, -1, -1, -1],
+            'paintOrders': [1, 2, 3, 4],
+            'offsetRects': [[], [8, 8, 784, 40], [8, 8, 784, 20], []],
+        },
+    }],
+}
+
+
+class TestDOMSnapshot(unittest.TestCase):
+    useNumpy = False
+
+    def setUp(self):
+        self.snapshot = DOMSnapshot(RESULT, ['display'],
+                                    useNumpy=self.useNumpy)
+        self.doc = self.snapshot.document
+
+    def test_document(self):
+        self.assertEqual(self.doc.url, 'http://test/')
+        self.assertEqual(self.doc.title, 'Title')
+        self.assertEqual(len(self.doc), 7)
+        self.assertEqual(self.doc.name(3), 'DIV')
+        self.assertEqual(self.doc.value(4), 'x')
+        self.assertIsNone(self.doc.value(3))
+        self.assertEqual(self.doc.attributes(3), {'id': 'a'})
+
+    def test_by_tag(self):
+        self.assertEqual(list(self.doc.nodesByTag('div')), [3])
+        self.assertEqual(list(self.doc.nodesByTag('#text')), [4, 6])
+        self.assertEqual(list(self.doc.nodesByTag('table')), [])
+
+    def test_by_style(self):
+        layout = self.doc.layoutByStyle('display', 'block')
+        self.assertEqual(list(layout), [0, 1, 2])
+        self.assertEqual(list(self.doc.layoutNodes(layout)), [1, 2, 3])
+        self.assertEqual(list(self.doc.layoutByStyle('display', 'flex')), [])
+        with self.assertRaises(ValueError):
+            self.doc.layoutByStyle('color', 'red')
+
+    def test_layout_columns(self):
+        self.assertEqual(list(self.doc.paintOrders), [1, 2, 3, 4])
+        rects = self.doc.offsetRects
+        self.assertEqual(len(rects), 4)
+        self.assertEqual(list(rects[1]), [8, 8, 784, 40])
+        self.assertEqual(len(self.doc.clientRects), 0)
+
+    def test_in_box(self):
+        self.assertEqual(list(self.doc.layoutInBox(0, 30, 20, 10)),
+                         [0, 1, 3])
+        self.assertEqual(
+            list(self.doc.layoutInBox(0, 25, 20, 30, contain=True)), [3])
+
+
+@unittest.skipIf(_numpy() is None, 'numpy is not installed')
+class TestDOMSnapshotNumpy(TestDOMSnapshot):
+    useNumpy = True
+
+
+class TestPageDOMSnapshot(BaseTestCase):
+    @sync
+    async def test_snapshot(self):
+        await self.page.goto(self.url + 'empty')
+        await self.page.setContent(
+            '<div id="a">one</div><div style="display: none">two</div>'
+            '<span>three</span>')
+        snapshot = await self.page.domSnapshot(computedStyles=['display'])
+        doc = snapshot.document
+        divs = list(doc.nodesByTag('div'))
+        self.assertEqual(len(divs), 2)
+        self.assertEqual(doc.attributes(divs[0]), {'id': 'a'})
+        # Elements with display: none have no layout object.
+        blocks = set(doc.layoutNodes(doc.layoutByStyle('display', 'block')))
+        self.assertIn(divs[0], blocks)
+        self.assertNotIn(divs[1], blocks)
+        inline = set(doc.layoutNodes(doc.layoutByStyle('display', 'inline')))
+        self.assertEqual(inline & set(doc.nodesByTag('span')),
+                         set(doc.nodesByTag('span')))
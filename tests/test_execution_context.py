@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import asyncio
+
 from syncer import sync
 
 from pyppeteer.errors import ElementHandleError, NetworkError
+from pyppeteer.execution_context import ExecutionContext, JSHandle
 
-from .base import BaseTestCase
+from .base import BaseTestCase, FakeSession, LoopTestCase
 
 
 class TestQueryObject(BaseTestCase):
@@ -143,3 +146,129 @@ class TestJSHandle(BaseTestCase):
     async def test_to_string_complicated_object(self):
         handle = await self.page.evaluateHandle('() => window')
         self.assertEqual(handle.toString(), 'JSHandle@object')
+
+
+class TestHandleScopeTask(LoopTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = FakeSession(self.loop, {'Runtime.evaluate': {
+            'result': {'type': 'object', 'objectId': 'object'}}})
+        self.context = ExecutionContext(
+            self.client, {'id': 1},
+            lambda obj: JSHandle(self.context, self.client, obj))
+
+    def groups(self):
+        return [params.get('objectGroup') for method, params
+                in self.client.sent if method == 'Runtime.evaluate']
+
+    def test_other_task(self):
+        async def scoped(entered, exit):
+            async with self.context.handleScope() as scope:
+                entered.set()
+                await exit.wait()
+                handle = await self.context.evaluateHandle('({})')
+            self.assertTrue(handle._disposed)
+            return scope
+
+        async def other(entered, exit):
+            await entered.wait()
+            handle = await self.context.evaluateHandle('({})')
+            exit.set()
+            return handle
+
+        async def run():
+            entered, exit = asyncio.Event(), asyncio.Event()
+            return await asyncio.gather(
+                scoped(entered, exit), other(entered, exit))
+
+        scope, handle = self.run_loop(run())
+        self.assertFalse(handle._disposed)
+        self.assertEqual(self.groups(), [None, scope.objectGroup])
+        self.assertEqual(self.context.handleCount, 1)
+
+
+class TestHandleScope(BaseTestCase):
+    @sync
+    async def test_release(self):
+        await self.page.setContent('<a>1</a><a>2</a><a>3</a>')
+        context = await self.page.mainFrame.executionContext()
+        count = context.handleCount
+        async with self.page.handleScope():
+            links = await self.page.querySelectorAll('a')
+            self.assertEqual(len(links), 3)
+            self.assertEqual(
+                await self.page.evaluate('a => a.textContent', links[1]), '2')
+            self.assertEqual(context.handleCount, count + 3)
+        self.assertEqual(context.handleCount, count)
+        for link in links:
+            self.assertTrue(link._disposed)
+        with self.assertRaises(ElementHandleError):
+            await self.page.evaluate('a => a.textContent', links[0])
+        # Cached document handle is still usable
+        self.assertEqual(len(await self.page.querySelectorAll('a')), 3)
+
+    @sync
+    async def test_single_release_call(self):
+        client = self.page._client
+        send = client.send
+        methods = []
+
+        def _send(method, params=None):
+            methods.append(method)
+            return send(method, params)
+
+        async with self.page.handleScope():
+            for i in range(5):
+                await self.page.evaluateHandle('() => ({})')
+            client.send = _send
+        client.send = send
+        self.assertEqual(methods, ['Runtime.releaseObjectGroup'])
+
+    @sync
+    async def test_nested(self):
+        async with self.page.handleScope():
+            outer = await self.page.evaluateHandle('() => ({a: 1})')
+            async with self.page.handleScope():
+                inner = await self.page.evaluateHandle('() => ({b: 2})')
+            self.assertTrue(inner._disposed)
+            self.assertFalse(outer._disposed)
+            self.assertEqual(await outer.jsonValue(), {'a': 1})
+        self.assertTrue(outer._disposed)
+
+    @sync
+    async def test_handle_outside_scope(self):
+        handle = await self.page.evaluateHandle('() => ({a: 1})')
+        async with self.page.handleScope():
+            await self.page.evaluateHandle('() => ({b: 2})')
+        self.assertFalse(handle._disposed)
+        self.assertEqual(await handle.jsonValue(), {'a': 1})
+
+    @sync
+    async def test_concurrent_task(self):
+        entered = asyncio.Event()
+        exit = asyncio.Event()
+
+        async def other():
+            await entered.wait()
+            handle = await self.page.evaluateHandle('() => ({a: 1})')
+            exit.set()
+            return handle
+
+        task = asyncio.ensure_future(other())
+        async with self.page.handleScope():
+            entered.set()
+            await exit.wait()
+        handle = await task
+        self.assertFalse(handle._disposed)
+        self.assertEqual(await handle.jsonValue(), {'a': 1})
+
+    @sync
+    async def test_handle_count(self):
+        context = await self.page.mainFrame.executionContext()
+        count = context.handleCount
+        handle = await self.page.evaluateHandle('() => ({})')
+        primitive = await self.page.evaluateHandle('() => 1')
+        self.assertEqual(context.handleCount, count + 1)
+        await handle.dispose()
+        await primitive.dispose()
+        self.assertEqual(context.handleCount, count)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from syncer import sync
+
+from pyppeteer.extract import compile_spec
+
+from .base import BaseTestCase
+from .frame_utils import attachFrame
+
+LISTING = '''
+<h1> Listing </h1>
+<div class="row" id="r1"><h2> one </h2><a href="/1">link</a></div>
+<div class="row" id="r2"><h2>two</h2><a href="/2"><b>bold</b></a></div>
+<div class="row" id="r3"><h2>three</h2></div>
+<input value="typed">
+'''
+
+
+class TestCompile(unittest.TestCase):
+    def test_field(self):
+        self.assertEqual(compile_spec('h2'),
+                         {'t': 'field', 's': 'h2', 'g': 'text'})
+        self.assertEqual(compile_spec('h2::text'),
+                         {'t': 'field', 's': 'h2', 'g': 'text'})
+        self.assertEqual(compile_spec('div > p::html'),
+                         {'t': 'field', 's': 'div > p', 'g': 'html'})
+        self.assertEqual(compile_spec('a@href'),
+                         {'t': 'field', 's': 'a', 'g': 'attr', 'n': 'href'})
+        self.assertEqual(compile_spec('input::prop(value)'),
+                         {'t': 'field', 's': 'input', 'g': 'prop',
+                          'n': 'value'})
+
+    def test_self(self):
+        self.assertEqual(compile_spec('@id'),
+                         {'t': 'field', 's': '', 'g': 'attr', 'n': 'id'})
+        self.assertEqual(compile_spec('::text'),
+                         {'t': 'field', 's': '', 'g': 'text'})
+
+    def test_attribute_selector(self):
+        self.assertEqual(compile_spec('a[href$="@x"]'),
+                         {'t': 'field', 's': 'a[href$="@x"]', 'g': 'text'})
+
+    def test_invalid_getter(self):
+        for spec in ('a::txt', 'a::attr(href)', 'a::prop()', 'a@',
+                     'a::before'):
+            with self.assertRaises(ValueError, msg=spec):
+                compile_spec(spec)
+
+    def test_nested(self):
+        plan = compile_spec({'items': ('.row', {'title': 'h2'})})
+        self.assertEqual(plan, {'t': 'obj', 'f': {'items': {
+            't': 'all', 's': '.row', 'f': {'t': 'obj', 'f': {
+                'title': {'t': 'field', 's': 'h2', 'g': 'text'}}}}}})
+
+    def test_invalid(self):
+        for spec in (1, None, ('.row',), ('', 'h2'), {1: 'h2'},
+                     {'a': ('.row', 1)}):
+            with self.assertRaises(ValueError):
+                compile_spec(spec)
+
+
+class TestExtract(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        sync(self.page.goto(self.url + 'empty'))
+        sync(self.page.setContent(LISTING))
+
+    @sync
+    async def test_extract(self):
+        data = await self.page.extract({
+            'title': 'h1',
+            'value': 'input::prop(value)',
+            'items': ('.row', {'id': '@id', 'title': 'h2::text',
+                               'href': 'a@href', 'html': 'a::html'}),
+        })
+        self.assertEqual(data, {
+            'title': 'Listing',
+            'value': 'typed',
+            'items': [
+                {'id': 'r1', 'title': 'one', 'href': '/1', 'html': 'link'},
+                {'id': 'r2', 'title': 'two', 'href': '/2',
+                 'html': '<b>bold</b>'},
+                {'id': 'r3', 'title': 'three', 'href': None, 'html': None},
+            ],
+        })
+
+    @sync
+    async def test_list_of_fields(self):
+        self.assertEqual(await self.page.extract(('.row', 'h2')),
+                         ['one', 'two', 'three'])
+        self.assertEqual(await self.page.extract(('.nothing', 'h2')), [])
+
+    @sync
+    async def test_single_round_trip(self):
+        sent = []
+        client = self.page._client
+        send = client.send
+
+        def _send(method, params=None):
+            sent.append(method)
+            return send(method, params)
+
+        client.send = _send
+        await self.page.extract({'items': ('.row', {'title': 'h2'})})
+        self.assertEqual(sent, ['Runtime.callFunctionOn'])
+
+    @sync
+    async def test_all_frames(self):
+        await attachFrame(self.page, 'frame1', self.url + 'static/grid.html')
+        results = await self.page.extract('h1', allFrames=True)
+        self.assertEqual(results, ['Listing', None])
+
+    @sync
+    async def test_frame(self):
+        await attachFrame(self.page, 'frame1', self.url + 'empty')
+        frame = self.page.frames[1]
+        await frame.setContent('<p class="row">inner</p>')
+        self.assertEqual(await frame.extract(('.row', '::text')), ['inner'])
@@ -171,6 +171,36 @@ class TestWaitForFunction(BaseTestCase):
         await fut
         self.assertTrue(result)
 
+    @sync
+    async def test_poll_on_idle(self):
+        fut = asyncio.ensure_future(self.page.waitForFunction(
+            '() => window.__FOO === "hit"', polling='idle',
+        ))
+        await asyncio.sleep(0)  # once switch task
+        await self.page.evaluate('window.__FOO = "hit"')
+        await fut
+
+    @sync
+    async def test_poll_on_backoff(self):
+        task = self.page.waitForFunction(
+            '() => window.__FOO === "hit"', polling='backoff')
+        await asyncio.sleep(0.5)
+        await self.page.evaluate('window.__FOO = "hit"')
+        await task
+        # 10, 20, 40, 80, 160, 320 ms... instead of every frame.
+        self.assertLess(task.stats['invocations'], 10)
+
+    @sync
+    async def test_stats(self):
+        task = self.page.waitForFunction(
+            '() => ++window.__counter > 3', polling=10)
+        self.assertEqual(task.stats,
+                         {'invocations': 0, 'predicateTime': 0.0})
+        await self.page.evaluate('window.__counter = 0')
+        await task
+        self.assertGreaterEqual(task.stats['invocations'], 4)
+        self.assertGreaterEqual(task.stats['predicateTime'], 0)
+
     @sync
     async def test_csp(self):
         await self.page.goto(self.url + 'csp')
@@ -373,6 +403,18 @@ class TestWaitForSelector(BaseTestCase):
         await fut
         self.assertTrue(div)
 
+    @sync
+    async def test_wait_for_selector_visible_on_mutation(self):
+        await self.page.setContent('<div style="display: none">1</div>')
+        task = self.page.waitForSelector('div', visible=True,
+                                         polling='mutation')
+        await asyncio.sleep(0.1)
+        self.assertFalse(task.promise.done())
+        await self.page.evaluate('() => document.querySelector("div").style.removeProperty("display")')  # noqa: E501
+        await task
+        # Checked only on start and on the style change.
+        self.assertEqual(task.stats['invocations'], 2)
+
     @sync
     async def test_wait_for_selector_visible_inner(self):
         div = []
@@ -473,6 +515,66 @@ class TestWaitForSelector(BaseTestCase):
         )
 
 
+class TestWaitDispatcher(BaseTestCase):
+    async def pending(self, polling):
+        frame = self.page.mainFrame
+        context = await frame.executionContext()
+        dispatcher = await frame._waitDispatcher(context)
+        return await self.page.evaluate(
+            '(d, polling) => d.pending(polling)', dispatcher, polling)
+
+    @sync
+    async def test_shared_observer(self):
+        await self.page.goto(self.url + 'empty')
+        waits = [asyncio.ensure_future(self.page.waitForSelector(f'.c{i}'))
+                 for i in range(20)]
+        waits.append(asyncio.ensure_future(
+            self.page.waitForSelector('.c0', visible=True)))
+        while await self.pending('mutation') < 20:
+            await asyncio.sleep(0.01)
+        self.assertEqual(await self.pending('raf'), 1)
+        await self.page.setContent(''.join(
+            f'<div class="c{i}">{i}</div>' for i in range(20)))
+        await asyncio.gather(*waits)
+        self.assertEqual(await self.pending('mutation'), 0)
+        self.assertEqual(await self.pending('raf'), 0)
+
+    @sync
+    async def test_install_once_per_context(self):
+        sent = []
+        client = self.page._client
+        send = client.send
+
+        def _send(method, params=None):
+            if 'createWaitDispatcher' in (params or {}).get(
+                    'functionDeclaration', ''):
+                sent.append(method)
+            return send(method, params)
+
+        client.send = _send
+        await self.page.goto(self.url + 'empty')
+        await self.page.waitForFunction('() => true')
+        await self.page.waitForSelector('body')
+        self.assertEqual(len(sent), 1)
+        await self.page.reload()
+        await self.page.waitForSelector('body')
+        self.assertEqual(len(sent), 2)
+
+    @sync
+    async def test_predicate_error(self):
+        await self.page.goto(self.url + 'empty')
+        fut = asyncio.ensure_future(self.page.waitForFunction(
+            '() => { if (window.__FAIL) throw new Error("bad"); }',
+            polling=10))
+        other = asyncio.ensure_future(self.page.waitForFunction(
+            '() => window.__DONE', polling=10))
+        await self.page.evaluate('window.__FAIL = true')
+        with self.assertRaises(ElementHandleError):
+            await fut
+        await self.page.evaluate('window.__DONE = true')
+        await other
+
+
 class TestWaitForXPath(BaseTestCase):
     @sync
     async def test_fancy_xpath(self):
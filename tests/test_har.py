@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import base64
+import json
+import os
+import tempfile
+import unittest
+
+from syncer import sync
+
+from pyppeteer.errors import PageError
+from pyppeteer.har import HAR, HarReplay
+from pyppeteer.network_manager import NetworkManager
+
+from .base import FakeSession, FetchTestCase, LoopTestCase, paused
+
+
+def entry(url, status=200, text='', method='GET', encoding=None):
+    content = {'size': len(text), 'mimeType': 'text/plain', 'text': text}
+    if encoding:
+        content['encoding'] = encoding
+    return {
+        'request': {'method': method, 'url': url},
+        'response': {'status': status, 'content': content, 'headers': [
+            {'name': 'Content-Type', 'value': 'text/plain'},
+            {'name': 'Content-Encoding', 'value': 'gzip'},
+        ]},
+    }
+
+
+class TestHARRecorder(LoopTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = FakeSession(self.loop, {'Network.getResponseBody': {
+            'body': base64.b64encode(b'\xff\x00').decode('ascii'),
+            'base64Encoded': True}})
+        self.manager = NetworkManager(self.client, None)
+        self.har = HAR(self.manager)
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'test.har')
+
+    def tearDown(self):
+        self.dir.cleanup()
+        super().tearDown()
+
+    def load(self, requestId, url='http://a/b?x=1', status=200):
+        self.client.emit('Network.requestWillBeSent', {
+            'requestId': requestId, 'loaderId': 'l', 'type': 'Script',
+            'request': {'url': url, 'method': 'GET',
+                        'headers': {'Accept': '*/*'}}})
+        self.client.emit('Network.responseReceived', {
+            'requestId': requestId,
+            'response': {'status': status,
+                         'headers': {'Content-Type': 'text/javascript'}}})
+        self.client.emit('Network.loadingFinished', {'requestId': requestId})
+
+    def test_record(self):
+        self.run_loop(self.har.start(self.path))
+        self.assertTrue(self.har.recording)
+        self.load('1')
+        self.load('2', 'http://a/c', 404)
+        self.client.emit('Network.requestWillBeSent', {
+            'requestId': '3', 'request': {'url': 'http://a/d'}})
+        self.client.emit('Network.loadingFailed', {
+            'requestId': '3', 'errorText': 'net::ERR_FAILED'})
+        self.run_loop(self.har.stop())
+        self.assertFalse(self.har.recording)
+        with open(self.path) as f:
+            log = json.load(f)['log']
+        self.assertEqual(log['version'], '1.2')
+        entries = log['entries']
+        self.assertEqual(len(entries), 3)
+        request = entries[0]['request']
+        self.assertEqual(request['url'], 'http://a/b?x=1')
+        self.assertEqual(request['queryString'], [{'name': 'x', 'value': '1'}])
+        self.assertEqual(request['headers'],
+                         [{'name': 'accept', 'value': '*/*'}])
+        response = entries[0]['response']
+        self.assertEqual(response['status'], 200)
+        self.assertEqual(response['statusText'], 'OK')
+        self.assertEqual(response['content'],
+                         {'size': -1, 'mimeType': 'text/javascript'})
+        self.assertEqual(entries[1]['response']['status'], 404)
+        self.assertEqual(entries[2]['response']['status'], 0)
+        self.assertEqual(entries[2]['_failureText'], 'net::ERR_FAILED')
+        # Listeners are removed.
+        self.load('4')
+
+    def test_content(self):
+        self.run_loop(self.har.start(self.path, content=True))
+        self.load('1')
+        self.run_loop(self.har.stop())
+        with open(self.path) as f:
+            content = json.load(f)['log']['entries'][0]['response']['content']
+        self.assertEqual(content['size'], 2)
+        self.assertEqual(content['encoding'], 'base64')
+        self.assertEqual(base64.b64decode(content['text']), b'\xff\x00')
+
+    def test_empty(self):
+        self.run_loop(self.har.start(self.path))
+        with self.assertRaises(PageError):
+            self.run_loop(self.har.start(self.path))
+        self.run_loop(self.har.stop())
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)['log']['entries'], [])
+        with self.assertRaises(PageError):
+            self.run_loop(self.har.stop())
+
+
+class TestHarReplay(unittest.TestCase):
+    def test_fulfill(self):
+        replay = HarReplay([entry('http://a/', text='hello')])
+        command = replay._command(paused('http://a/'))
+        self.assertEqual(command['method'], 'Fetch.fulfillRequest')
+        params = command['params']
+        self.assertEqual(params['responseCode'], 200)
+        self.assertEqual(params['responseHeaders'],
+                         [{'name': 'Content-Type', 'value': 'text/plain'}])
+        self.assertEqual(base64.b64decode(params['body']), b'hello')
+
+    def test_order(self):
+        replay = HarReplay([
+            entry('http://a/', text='1'),
+            entry('http://a/', text='Mg==', encoding='base64'),
+            entry('http://a/', method='POST', text='post'),
+        ])
+        bodies = [base64.b64decode(
+            replay._command(paused('http://a/'))['params']['body'])
+            for _ in range(3)]
+        self.assertEqual(bodies, [b'1', b'2', b'2'])
+
+    def test_not_found(self):
+        replay = HarReplay([entry('http://a/', status=0)])
+        self.assertEqual(replay._command(paused('http://a/'))['params'],
+                         {'requestId': 'interception-1',
+                          'errorReason': 'Failed'})
+        self.assertEqual(replay._command(paused('http://b/'))['params'],
+                         {'requestId': 'interception-1',
+                          'errorReason': 'InternetDisconnected'})
+        replay = HarReplay([], notFound='continue')
+        self.assertIsNone(replay._command(paused('http://b/')))
+        with self.assertRaises(ValueError):
+            HarReplay([], notFound='ignore')
+
+
+class TestPageHAR(FetchTestCase):
+    @sync
+    async def test_record_and_replay(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'test.har')
+            await self.page.har.start(path, content=True)
+            await self.page.goto(self.url + 'static/one-style.html')
+            await self.page.har.stop()
+            with open(path) as f:
+                entries = json.load(f)['log']['entries']
+            urls = [e['request']['url'] for e in entries]
+            self.assertIn(self.url + 'static/one-style.css', urls)
+
+            page = await self.context.newPage()
+            await page.har.replay(path)
+            failed = []
+            page.on('requestfailed', failed.append)
+            response = await page.goto(self.url + 'static/one-style.html')
+            self.assertEqual(response.status, 200)
+            color = await page.evaluate(
+                '() => getComputedStyle(document.body).backgroundColor')
+            self.assertEqual(color, 'rgb(255, 192, 203)')
+            self.assertEqual(failed, [])
+            with self.assertRaises(PageError):
+                await page.goto(self.url + 'empty')
+            self.assertEqual(len(failed), 1)
+            await page.close()
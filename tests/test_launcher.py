@@ -17,9 +17,10 @@ from unittest import mock
 from syncer import sync
 import websockets
 
-from pyppeteer import connect, launch, executablePath, defaultArgs
+from pyppeteer import connect, launch, launch_many, executablePath
+from pyppeteer import defaultArgs
 from pyppeteer.chromium_downloader import chromium_executable, current_platform
-from pyppeteer.errors import NetworkError
+from pyppeteer.errors import BrowserError, NetworkError, TimeoutError
 from pyppeteer.launcher import Launcher
 from pyppeteer.util import get_free_port
 
@@ -88,6 +89,54 @@ class TestLauncher(unittest.TestCase):
                       launcher.chromeArguments)
         self.assertIsNone(launcher.temporaryUserDataDir)
 
+    def test_pipe(self):
+        launcher = Launcher(pipe=True)
+        self.check_default_args(launcher)
+        self.assertIn('--remote-debugging-pipe', launcher.chromeArguments)
+        self.assertFalse(any(arg for arg in launcher.chromeArguments
+                             if arg.startswith('--remote-debugging-port')))
+        self.assertIsNone(launcher.port)
+
+    @sync
+    async def test_launch_pipe(self):
+        browser = await launch(DEFAULT_OPTIONS, pipe=True)
+        self.assertEqual(browser.wsEndpoint, '')
+        page = await browser.newPage()
+        self.assertEqual(await page.evaluate('1 + 2'), 3)
+        await browser.close()
+
+    @sync
+    async def test_launch_many(self):
+        browsers = []
+        async for browser in launch_many(3, DEFAULT_OPTIONS):
+            browsers.append(browser)
+        self.assertEqual(len(browsers), 3)
+        self.assertEqual(len({b.wsEndpoint for b in browsers}), 3)
+        for browser in browsers:
+            page = await browser.newPage()
+            self.assertEqual(await page.evaluate('1 + 2'), 3)
+        await asyncio.gather(*[browser.close() for browser in browsers])
+
+    @sync
+    async def test_launch_timeout(self):
+        with self.assertRaises(TimeoutError):
+            await launch(
+                executablePath=sys.executable,
+                ignoreDefaultArgs=True,
+                args=['-c', 'import time; time.sleep(10)'],
+                timeout=100,
+            )
+
+    @sync
+    async def test_launch_crash(self):
+        with self.assertRaises(BrowserError) as cm:
+            await launch(
+                executablePath=sys.executable,
+                ignoreDefaultArgs=True,
+                args=['-c', 'print("CRASH_TEST")'],
+            )
+        self.assertIn('CRASH_TEST', cm.exception.args[0])
+
     @sync
     async def test_close_no_connection(self):
         browser = await launch(args=['--no-sandbox'])
@@ -2,10 +2,13 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import subprocess
+import sys
 import unittest
 
 import pyppeteer
 from pyppeteer.helper import debugError, get_positive_int
+from pyppeteer.multimap import Multimap
 from pyppeteer.page import convertPrintParameterToInches
 
 
@@ -22,6 +25,38 @@ class TestVersion(unittest.TestCase):
             self.assertTrue(isinstance(i, int))
 
 
+class TestLazyImport(unittest.TestCase):
+    @unittest.skipIf(sys.version_info < (3, 7), 'requires PEP 562')
+    def test_import(self):
+        code = ('import sys, pyppeteer; print(sorted(m for m in ['
+                '"pyppeteer.launcher", "pyppeteer.page", "urllib3", "tqdm", '
+                '"appdirs"] '
+                'if m in sys.modules))')
+        out = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(out.decode().strip(), '[]')
+
+    def test_attributes(self):
+        from pyppeteer import launcher
+        self.assertIs(pyppeteer.launch, launcher.launch)
+        self.assertIs(pyppeteer.connect, launcher.connect)
+        for name in pyppeteer.__all__:
+            self.assertIn(name, dir(pyppeteer))
+        with self.assertRaises(AttributeError):
+            pyppeteer.no_such_attribute
+
+    def test_home(self):
+        from pyppeteer import __pyppeteer_home__
+        self.assertIsInstance(__pyppeteer_home__, str)
+        self.assertIn('__pyppeteer_home__', dir(pyppeteer))
+
+    def test_downloader(self):
+        code = ('import sys, pyppeteer.launcher; print(sorted(m for m in ['
+                '"urllib3", "tqdm", "pyppeteer.coverage"] '
+                'if m in sys.modules))')
+        out = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(out.decode().strip(), '[]')
+
+
 class TestDefaultArgs(unittest.TestCase):
     def test_default_args(self):
         self.assertIn('--no-first-run', pyppeteer.defaultArgs())
@@ -101,3 +136,31 @@ class TestDebugError(unittest.TestCase):
         with self.assertRaises(AssertionError):
             with self.assertLogs('pyppeteer', logging.DEBUG):
                 debugError(logging.getLogger('test'), 'test message')
+
+
+class TestMultimap(unittest.TestCase):
+    def test_multimap(self):
+        m = Multimap()
+        m.set('a', 1)
+        m.set('a', 2)
+        m.set('a', 1)
+        m.set('b', 3)
+        self.assertEqual(m.get('a'), [1, 2])
+        self.assertEqual(m.firstValue('a'), 1)
+        self.assertEqual(m.firstKey(), 'a')
+        self.assertEqual(m.size(), 2)
+        self.assertTrue(m.hasValue('a', 2))
+        self.assertFalse(m.hasValue('c', 2))
+        self.assertEqual(m.valuesArray(), [1, 2, 3])
+
+    def test_delete(self):
+        m = Multimap()
+        m.set('a', 1)
+        m.set('a', 2)
+        self.assertTrue(m.delete('a', 1))
+        self.assertFalse(m.delete('a', 1))
+        self.assertEqual(m.firstValue('a'), 2)
+        self.assertTrue(m.delete('a', 2))
+        self.assertFalse(m.has('a'))
+        self.assertIsNone(m.firstValue('a'))
+        self.assertFalse(m.delete('a', 2))
@@ -2,15 +2,198 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
+import base64
 from pathlib import Path
 import sys
+import tempfile
 import unittest
 
 from syncer import sync
 
 from pyppeteer.errors import NetworkError, PageError
+from pyppeteer.network_manager import NetworkManager, generateRequestHash
 
-from .base import BaseTestCase
+from .base import BaseTestCase, FakeSession, LoopTestCase, paused
+
+
+def _willBeSent(requestId, url='http://a/', headers=None):
+    return {'requestId': requestId, 'loaderId': 'l', 'type': 'Script',
+            'request': {'url': url, 'method': 'GET',
+                        'headers': headers or {'Accept': '*/*'}}}
+
+
+def _intercepted(interceptionId, url='http://a/', requestId=None):
+    event = {'interceptionId': interceptionId,
+             'request': {'url': url, 'method': 'GET', 'headers': {}}}
+    if requestId:
+        event['requestId'] = requestId
+    return event
+
+
+class TestRequestCorrelation(LoopTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = FakeSession(self.loop)
+        self.manager = NetworkManager(self.client, None)
+        self.manager._userRequestInterceptionEnabled = True
+        self.manager._protocolRequestInterceptionEnabled = True
+        self.requests = []
+        self.manager.on('request', self.requests.append)
+
+    def assertClean(self):
+        m = self.manager
+        self.assertFalse(m._requestIdToResponseWillBeSent)
+        self.assertFalse(m._requestIdToRequestHash)
+        self.assertFalse(m._requestIdToInterceptionId)
+        self.assertEqual(m._requestHashToRequestIds.size(), 0)
+        self.assertEqual(m._requestHashToInterceptionIds.size(), 0)
+
+    def test_hash(self):
+        self.assertEqual(
+            generateRequestHash({'url': 'http://a/%20', 'method': 'GET',
+                                 'headers': {'Referer': 'x', 'X-A': '1'}}),
+            generateRequestHash({'url': 'http://a/ ', 'method': 'GET',
+                                 'headers': {'x-a': '1'}}))
+
+    def test_sync_dispatch(self):
+        self.manager._protocolRequestInterceptionEnabled = False
+        self.client.emit('Network.requestWillBeSent', _willBeSent('1'))
+        self.assertEqual(len(self.requests), 1)
+
+    def test_match_by_hash(self):
+        self.client.emit('Network.requestWillBeSent', _willBeSent('1'))
+        self.assertFalse(self.requests)
+        self.client.emit('Network.requestIntercepted', _intercepted('i1'))
+        self.assertEqual(self.requests[0]._interceptionId, 'i1')
+        self.client.emit('Network.requestIntercepted',
+                         _intercepted('i2', 'http://b/'))
+        self.client.emit('Network.requestWillBeSent',
+                         _willBeSent('2', 'http://b/'))
+        self.assertEqual(self.requests[1]._interceptionId, 'i2')
+        self.assertClean()
+
+    def test_match_by_request_id(self):
+        self.client.emit('Network.requestIntercepted',
+                         _intercepted('i1', requestId='1'))
+        self.client.emit('Network.requestWillBeSent', _willBeSent('1'))
+        self.assertEqual(self.requests[0]._interceptionId, 'i1')
+        # Same url and headers, told apart by the request id.
+        self.client.emit('Network.requestWillBeSent', _willBeSent('3'))
+        self.client.emit('Network.requestWillBeSent', _willBeSent('2'))
+        self.client.emit('Network.requestIntercepted',
+                         _intercepted('i2', requestId='2'))
+        self.client.emit('Network.requestIntercepted',
+                         _intercepted('i3', requestId='3'))
+        self.assertEqual([r._requestId for r in self.requests],
+                         ['1', '2', '3'])
+        self.assertEqual([r._interceptionId for r in self.requests],
+                         ['i1', 'i2', 'i3'])
+        self.assertClean()
+
+
+def _streamSession(loop, data):
+    def read(params):
+        nonlocal data
+        chunk, data = data[:params['size']], data[params['size']:]
+        return {'data': base64.b64encode(chunk).decode('ascii'),
+                'base64Encoded': True, 'eof': not data}
+
+    return FakeSession(loop, {
+        'IO.read': read,
+        'Fetch.takeResponseBodyAsStream': {'stream': 'stream-1'},
+        'Network.getResponseBody': {'body': 'hello', 'base64Encoded': False},
+    })
+
+
+async def _collect(chunks):
+    result = []
+    async for chunk in chunks:
+        result.append(chunk)
+    return result
+
+
+class TestResponseStream(LoopTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = _streamSession(self.loop, b'0123456789')
+        self.manager = NetworkManager(self.client, None)
+        self.responses = []
+        self.manager.on('response', self.responses.append)
+        self.client.emit('Network.requestWillBeSent',
+                         _willBeSent('1', 'http://a/data.bin'))
+
+    def paused(self, status=200):
+        return paused('http://a/data.bin', resourceType='Script',
+                      status=status, networkId='1', responseHeaders={
+                          'Content-Type': 'application/octet-stream'})
+
+    def test_stream_route(self):
+        self.run_loop(self.manager.addRoute(url='*.bin', action='stream'))
+        self.client.emit('Fetch.requestPaused', self.paused(404))
+        self.client.emit('Fetch.requestPaused', self.paused())
+        self.run_loop()
+        self.assertEqual(self.client.methods, [
+            'Fetch.enable', 'Fetch.continueRequest',
+            'Fetch.takeResponseBodyAsStream'])
+        response = self.responses[0]
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.headers,
+                         {'content-type': 'application/octet-stream'})
+        self.assertEqual(self.run_loop(_collect(response.stream(4))),
+                         [b'0123', b'4567', b'89'])
+        self.assertEqual(self.client.methods[-2:],
+                         ['IO.close', 'Fetch.failRequest'])
+        with self.assertRaises(NetworkError):
+            self.run_loop(_collect(response.stream()))
+        # Network.responseReceived does not replace the streamed response.
+        self.client.emit('Network.responseReceived', {
+            'requestId': '1', 'response': {'status': 200, 'headers': {}}})
+        self.assertEqual(len(self.responses), 1)
+
+    def test_close(self):
+        self.manager._onResponseStream(self.paused(), 'stream-1')
+        stream = self.responses[0].stream(4)
+        self.assertIs(stream.__aiter__(), stream)
+        self.assertEqual(self.run_loop(stream.__anext__()), b'0123')
+        self.run_loop(stream.aclose())
+        self.assertEqual(self.client.methods[-2:],
+                         ['IO.close', 'Fetch.failRequest'])
+        with self.assertRaises(StopAsyncIteration):
+            self.run_loop(stream.__anext__())
+
+    def test_save(self):
+        self.manager._onResponseStream(self.paused(), 'stream-1')
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / 'data.bin'
+            self.assertEqual(
+                self.run_loop(self.responses[0].save(path, chunkSize=3)), 10)
+            self.assertEqual(path.read_bytes(), b'0123456789')
+
+    def test_max_size(self):
+        self.manager._onResponseStream(self.paused(), 'stream-1')
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / 'data.bin'
+            with self.assertRaises(NetworkError):
+                self.run_loop(self.responses[0].save(path, maxSize=5))
+            self.assertFalse(path.exists())
+        self.assertEqual(self.client.methods[-2:],
+                         ['IO.close', 'Fetch.failRequest'])
+
+    def test_buffered(self):
+        self.client.emit('Network.responseReceived', {
+            'requestId': '1', 'response': {
+                'status': 200, 'headers': {'Content-Length': '100'}}})
+        self.client.emit('Network.loadingFinished', {'requestId': '1'})
+        response = self.responses[0]
+        with self.assertRaises(NetworkError):
+            self.run_loop(_collect(response.stream()))
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / 'data.bin'
+            with self.assertRaises(NetworkError):
+                self.run_loop(response.save(path, maxSize=10))
+            self.assertNotIn('Network.getResponseBody', self.client.methods)
+            self.assertEqual(self.run_loop(response.save(path)), 5)
+            self.assertEqual(path.read_bytes(), b'hello')
 
 
 class TestNetworkEvent(BaseTestCase):
@@ -13,6 +13,7 @@ from syncer import sync
 
 from pyppeteer.errors import ElementHandleError, NetworkError, PageError
 from pyppeteer.errors import TimeoutError
+from pyppeteer.execution_context import CALL_CACHED_FUNCTION
 
 from .base import BaseTestCase
 from .frame_utils import attachFrame
@@ -43,6 +44,27 @@ class TestEvaluate(BaseTestCase):
         result = await self.page.evaluate('() => Promise.resolve(8 * 7)')
         self.assertEqual(result, 56)
 
+    @sync
+    async def test_single_round_trip(self):
+        client = self.page._client
+        send = client.send
+        methods = []
+
+        def _send(method, params=None):
+            methods.append(method)
+            return send(method, params)
+
+        client.send = _send
+        try:
+            result = await self.page.evaluate('(a, b) => a + b', 1, 2)
+            self.assertEqual(result, 3)
+            result = await self.page.evaluate('document.title')
+            self.assertEqual(result, '')
+        finally:
+            client.send = send
+        self.assertEqual(methods,
+                         ['Runtime.callFunctionOn', 'Runtime.evaluate'])
+
     @sync
     async def test_error_on_reload(self):
         with self.assertRaises(Exception) as cm:
@@ -244,6 +266,83 @@ class TestEvaluate(BaseTestCase):
         self.assertIn('navigation', cm.exception.args[0])
 
 
+class TestScriptCache(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page.setScriptCacheEnabled()
+        self.sent = []
+        client = self.page._client
+        send = client.send
+
+        def _send(method, params=None):
+            self.sent.append((method, params))
+            return send(method, params)
+
+        client.send = _send
+
+    @sync
+    async def test_cache(self):
+        func = '(a, b) => a * b'
+        self.assertEqual(await self.page.evaluate(func, 3, 4), 12)
+        self.assertEqual([m for m, _ in self.sent],
+                         ['Runtime.evaluate', 'Runtime.callFunctionOn'])
+        self.sent.clear()
+        self.assertEqual(await self.page.evaluate(func, 5, 6), 30)
+        self.assertEqual([m for m, _ in self.sent],
+                         ['Runtime.callFunctionOn'])
+        self.assertEqual(self.sent[0][1]['functionDeclaration'],
+                         CALL_CACHED_FUNCTION)
+
+    @sync
+    async def test_concurrent(self):
+        func = 'a => a + 1'
+        results = await asyncio.gather(
+            *[self.page.evaluate(func, i) for i in range(5)])
+        self.assertEqual(results, [1, 2, 3, 4, 5])
+        self.assertEqual([m for m, _ in self.sent].count('Runtime.evaluate'),
+                         1)
+
+    @sync
+    async def test_navigation(self):
+        func = '() => location.href'
+        await self.page.evaluate(func)
+        await self.page.goto(self.url + 'empty')
+        self.assertEqual(await self.page.evaluate(func), self.url + 'empty')
+
+    @sync
+    async def test_element_handle(self):
+        await self.page.setContent('<section>42</section>')
+        element = await self.page.J('section')
+        func = 'e => e.textContent'
+        self.assertEqual(await self.page.evaluate(func, element), '42')
+        self.assertEqual(await self.page.evaluate(func, element), '42')
+
+    @sync
+    async def test_error(self):
+        with self.assertRaises(ElementHandleError):
+            await self.page.evaluate('() => not.a.function')
+        with self.assertRaises(ElementHandleError) as cm:
+            await self.page.evaluate('() => { throw new Error("qwerty"); }')
+        self.assertIn('qwerty', cm.exception.args[0])
+
+    @sync
+    async def test_eviction(self):
+        self.page.setScriptCacheEnabled(size=1)
+        await self.page.evaluate('() => 1')
+        await self.page.evaluate('() => 2')
+        self.sent.clear()
+        self.assertEqual(await self.page.evaluate('() => 1'), 1)
+        self.assertEqual([m for m, _ in self.sent],
+                         ['Runtime.evaluate', 'Runtime.callFunctionOn'])
+
+    @sync
+    async def test_disable(self):
+        self.page.setScriptCacheEnabled(False)
+        await self.page.evaluate('() => 1')
+        self.assertEqual([m for m, _ in self.sent],
+                         ['Runtime.callFunctionOn'])
+
+
 class TestOfflineMode(BaseTestCase):
     @sync
     async def test_offline_mode(self):
@@ -431,6 +530,39 @@ class TestMetrics(BaseTestCase):
         self.checkMetrics(metrics['metrics'])
 
 
+class TestDomains(BaseTestCase):
+    @sync
+    async def test_no_optional_domains(self):
+        page = await self.context.newPage(domains=[])
+        self.assertIsNone(await page.goto(self.url + 'empty'))
+        self.assertEqual(await page.evaluate('() => 7 * 3'), 21)
+        messages = []
+        page.on('console', lambda m: messages.append(m))
+        await page.evaluate('() => console.log("hello")')
+        await asyncio.sleep(0.01)
+        self.assertEqual([msg.text for msg in messages], ['hello'])
+        with self.assertRaises(PageError):
+            await page.metrics()
+
+    @sync
+    async def test_network_only(self):
+        page = await self.context.newPage(domains=['Network'])
+        requests = []
+        page.on('request', lambda req: requests.append(req))
+        response = await page.goto(self.url + 'empty')
+        self.assertTrue(response.ok)
+        self.assertEqual(len(requests), 1)
+
+    @sync
+    async def test_lazy_domains(self):
+        self.assertEqual(self.page._enabledDomains, {})
+        await self.page.metrics()
+        self.assertEqual(list(self.page._enabledDomains), ['Performance'])
+        self.page.on('console', lambda m: None)
+        self.assertEqual(sorted(self.page._enabledDomains),
+                         ['Log', 'Performance'])
+
+
 class TestGoto(BaseTestCase):
     @sync
     async def test_get_http(self):
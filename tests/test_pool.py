@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import unittest
+
+from syncer import sync
+
+from pyppeteer.browser import BrowserContext
+from pyppeteer.errors import BrowserError
+from pyppeteer.page import Page
+from pyppeteer.pool import BrowserPool
+
+from .base import DEFAULT_OPTIONS
+
+
+class TestBrowserPool(unittest.TestCase):
+    @sync
+    async def test_lease_page(self):
+        async with BrowserPool(size=2, launchOptions=DEFAULT_OPTIONS) as pool:
+            self.assertEqual(len(pool.browsers), 2)
+            async with pool.page() as page:
+                self.assertIsInstance(page, Page)
+                self.assertEqual(await page.evaluate('1 + 2'), 3)
+                context = page.target.browserContext
+            self.assertNotIn(context, page.browser.browserContexts)
+
+    @sync
+    async def test_lease_context(self):
+        async with BrowserPool(launchOptions=DEFAULT_OPTIONS) as pool:
+            async with pool.context() as context:
+                self.assertIsInstance(context, BrowserContext)
+                self.assertTrue(context.isIncognito())
+
+    @sync
+    async def test_concurrent_lease(self):
+        async def lease(pool):
+            async with pool.page() as page:
+                return page.browser
+
+        async with BrowserPool(size=2, launchOptions=DEFAULT_OPTIONS) as pool:
+            browsers = await asyncio.gather(*[lease(pool) for _ in range(4)])
+            self.assertEqual(len(set(browsers)), 2)
+
+    @sync
+    async def test_recycle_max_pages(self):
+        async with BrowserPool(maxPages=2,
+                               launchOptions=DEFAULT_OPTIONS) as pool:
+            browser = pool.browsers[0]
+            for _ in range(2):
+                async with pool.page():
+                    pass
+            self.assertNotIn(browser, pool.browsers)
+            async with pool.page() as page:
+                self.assertIsNot(page.browser, browser)
+
+    @sync
+    async def test_prune_closed_browsers(self):
+        async with BrowserPool(maxPages=1, healthCheckInterval=0,
+                               launchOptions=DEFAULT_OPTIONS) as pool:
+            for _ in range(3):
+                async with pool.page():
+                    pass
+            await asyncio.gather(*pool._closing)
+            await asyncio.sleep(0)
+            self.assertEqual(pool._closing, set())
+
+    @sync
+    async def test_recycle_disconnected(self):
+        async with BrowserPool(launchOptions=DEFAULT_OPTIONS) as pool:
+            browser = pool.browsers[0]
+            await browser.disconnect()
+            async with pool.page() as page:
+                self.assertIsNot(page.browser, browser)
+
+    @sync
+    async def test_closed_pool(self):
+        pool = BrowserPool(launchOptions=DEFAULT_OPTIONS)
+        await pool.start()
+        await pool.close()
+        with self.assertRaises(BrowserError):
+            async with pool.page():
+                pass
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+from pathlib import Path
+import shutil
+import socket
+import tempfile
+import unittest
+
+from syncer import sync
+
+from pyppeteer import launch
+from pyppeteer.errors import BrowserError
+from pyppeteer.launcher import Launcher
+from pyppeteer.profile import OWNER_FILE, ProfileReaper, mark_owner
+from pyppeteer.profile import clone_profile, create_profile_template
+from pyppeteer.util import get_free_port
+
+from .base import DEFAULT_OPTIONS
+from .server import get_application
+
+
+class TestCloneProfile(unittest.TestCase):
+    def setUp(self):
+        self.template = Path(tempfile.mkdtemp())
+        (self.template / 'Default' / 'Cache').mkdir(parents=True)
+        (self.template / 'Default' / 'Preferences').write_text('{}')
+        (self.template / 'Default' / 'Cache' / 'data_0').write_text('data')
+        (self.template / 'SingletonLock').write_text('')
+        self.dest = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(str(self.template))
+        shutil.rmtree(str(self.dest))
+
+    def check_clone(self, method):
+        clone_profile(self.template, self.dest, method)
+        self.assertEqual(
+            (self.dest / 'Default' / 'Preferences').read_text(), '{}')
+        self.assertEqual(
+            (self.dest / 'Default' / 'Cache' / 'data_0').read_text(), 'data')
+        self.assertFalse((self.dest / 'SingletonLock').exists())
+
+    def test_auto(self):
+        self.check_clone('auto')
+        # must not share files with template
+        (self.dest / 'Default' / 'Preferences').write_text('changed')
+        self.assertEqual(
+            (self.template / 'Default' / 'Preferences').read_text(), '{}')
+
+    def test_copy(self):
+        self.check_clone('copy')
+
+    def test_hardlink(self):
+        self.check_clone('hardlink')
+        self.assertTrue(os.path.samefile(
+            str(self.template / 'Default' / 'Preferences'),
+            str(self.dest / 'Default' / 'Preferences'),
+        ))
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            clone_profile(self.template, self.dest, 'symlink')
+
+    def test_template_not_found(self):
+        with self.assertRaises(BrowserError):
+            Launcher(profileTemplate='/path/to/no/template',
+                     executablePath='/path/to/chrome')
+
+
+class TestProfileReaper(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.reaper = ProfileReaper()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def make_profile(self, name, size=0, ownerPid=None):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.join(path, 'Default'))
+        with open(os.path.join(path, 'Default', 'data'), 'wb') as f:
+            f.write(b'x' * size)
+        if ownerPid is not None:
+            with open(os.path.join(path, OWNER_FILE), 'w') as f:
+                f.write(f'{socket.gethostname()}-{ownerPid}')
+        return path
+
+    def test_reap(self):
+        path1 = self.make_profile('profile1', 100)
+        path2 = self.make_profile('profile2', 50)
+        self.reaper.reap(path1)
+        self.reaper.reap(path2)
+        self.reaper.join()
+        self.assertFalse(os.path.exists(path1))
+        self.assertFalse(os.path.exists(path2))
+        self.assertEqual(self.reaper.reclaimedBytes, 150)
+        self.assertEqual(self.reaper.removedDirs, 2)
+
+    def test_sweep(self):
+        crashed = self.make_profile('crashed', 10, ownerPid=2 ** 22 + 1)
+        running = self.make_profile('running', ownerPid=os.getpid())
+        unmarked = self.make_profile('unmarked', 10)
+        otherHost = os.path.join(self.make_profile('other'), OWNER_FILE)
+        with open(otherHost, 'w') as f:
+            f.write(f'not-{socket.gethostname()}-{2 ** 22 + 1}')
+        self.reaper.sweep(self.root)
+        self.reaper.join()
+        self.assertFalse(os.path.exists(crashed))
+        self.assertTrue(os.path.exists(running))
+        self.assertTrue(os.path.exists(unmarked))
+        self.assertTrue(os.path.exists(otherHost))
+        self.assertGreaterEqual(self.reaper.reclaimedBytes, 10)
+        self.assertEqual(self.reaper.removedDirs, 1)
+
+        # sweep only once
+        crashed = self.make_profile('crashed', ownerPid=2 ** 22 + 1)
+        self.reaper.sweep(self.root)
+        self.reaper.join()
+        self.assertTrue(os.path.exists(crashed))
+
+    def test_mark_owner(self):
+        path = self.make_profile('marked')
+        mark_owner(path)
+        self.reaper.sweep(self.root)
+        self.reaper.join()
+        self.assertTrue(os.path.exists(path))
+        with open(os.path.join(path, OWNER_FILE)) as f:
+            self.assertEqual(f.read(), f'{socket.gethostname()}-{os.getpid()}')
+
+
+class TestProfileTemplate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.port = get_free_port()
+        cls.app = get_application()
+        cls.server = cls.app.listen(cls.port)
+        cls.url = 'http://localhost:{}/'.format(cls.port)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.template = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.template, ignore_errors=True)
+
+    @sync
+    async def test_launch_with_template(self):
+        await create_profile_template(
+            self.template, [self.url + 'empty'], DEFAULT_OPTIONS)
+        self.assertTrue(os.path.exists(os.path.join(self.template, 'Default')))
+        self.assertFalse(
+            os.path.exists(os.path.join(self.template, 'SingletonLock')))
+
+        browser = await launch(DEFAULT_OPTIONS, profileTemplate=self.template)
+        page = await browser.newPage()
+        await page.goto(self.url + 'empty')
+        self.assertEqual(await page.evaluate('1 + 2'), 3)
+        await browser.close()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import base64
+from pathlib import Path
+import tempfile
+import time
+import unittest
+
+from syncer import sync
+
+from pyppeteer.response_cache import ResponseCache, freshness_lifetime
+from pyppeteer.router import Router
+
+from .base import FakeSession, FetchTestCase, LoopTestCase, paused
+
+DATE = 'Wed, 21 Oct 2015 07:28:00 GMT'
+NOW = 1445412480.0  # DATE
+
+
+def request(url='http://a/app.js', **kwargs):
+    kwargs.setdefault('resourceType', 'Script')
+    return paused(url, **kwargs)
+
+
+def response(url='http://a/app.js', cacheControl='max-age=60', **kwargs):
+    responseHeaders = {'Cache-Control': cacheControl,
+                       'Content-Type': 'text/javascript',
+                       'Content-Encoding': 'gzip'}
+    responseHeaders.update(kwargs.pop('responseHeaders', {}))
+    return request(url, status=200, responseHeaders=responseHeaders,
+                   **kwargs)
+
+
+def store(cache, event, body):
+    sync(cache._store(event, body))
+
+
+class TestFreshness(unittest.TestCase):
+    def test_max_age(self):
+        self.assertEqual(freshness_lifetime({'cache-control': 'max-age=60'}),
+                         60)
+        self.assertEqual(freshness_lifetime(
+            {'cache-control': 'public, max-age=60', 'age': '20'}), 40)
+        self.assertIsNone(freshness_lifetime(
+            {'cache-control': 'max-age=60', 'age': '60'}))
+        self.assertIsNone(freshness_lifetime({'cache-control': 'max-age=x'}))
+
+    def test_not_storable(self):
+        for headers in ({'cache-control': 'no-store, max-age=60'},
+                        {'cache-control': 'no-cache'},
+                        {'cache-control': 'max-age=60', 'vary': '*'},
+                        {}):
+            self.assertIsNone(freshness_lifetime(headers), headers)
+
+    def test_expires(self):
+        self.assertEqual(freshness_lifetime({
+            'date': DATE, 'expires': 'Wed, 21 Oct 2015 08:28:00 GMT'}), 3600)
+        self.assertIsNone(freshness_lifetime({'date': DATE, 'expires': '0'}))
+
+    def test_last_modified(self):
+        self.assertEqual(freshness_lifetime({
+            'date': DATE,
+            'last-modified': 'Wed, 21 Oct 2015 06:28:00 GMT'}), 360)
+        self.assertEqual(freshness_lifetime(
+            {'last-modified': 'Wed, 21 Oct 2015 06:28:00 GMT'},
+            now=NOW), 360)
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_store_and_lookup(self):
+        cache = ResponseCache()
+        self.assertIsNone(cache._lookup(request()))
+        self.assertTrue(cache._storable(response()))
+        store(cache, response(), b'code')
+        entry = cache._lookup(request())
+        self.assertEqual(cache._fulfillParams(entry, 'interception-2'), {
+            'requestId': 'interception-2',
+            'responseCode': 200,
+            'responseHeaders': [
+                {'name': 'Cache-Control', 'value': 'max-age=60'},
+                {'name': 'Content-Type', 'value': 'text/javascript'},
+            ],
+            'body': base64.b64encode(b'code').decode('ascii'),
+        })
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual((len(cache), cache.size), (1, 4))
+
+    def test_not_cacheable(self):
+        cache = ResponseCache()
+        self.assertFalse(cache._storable(response(method='POST')))
+        self.assertFalse(cache._storable(
+            request(resourceType='Document', status=200)))
+        self.assertFalse(cache._storable(request(status=404)))
+        self.assertFalse(cache._storable(response(headers={'Range': 'x'})))
+        self.assertFalse(cache._storable(response(cacheControl='no-store')))
+        self.assertFalse(cache._storable(
+            response(cacheControl='private, max-age=60')))
+        self.assertFalse(cache._storable(
+            response(responseHeaders={'Vary': 'Accept, Cookie'})))
+        self.assertFalse(cache._storable(
+            response(responseHeaders={'Content-Length': str(2 ** 30)})))
+        store(cache, response(cacheControl='no-store'), b'code')
+        store(cache, response(), b'code')
+        self.assertIsNone(cache._lookup(
+            request(headers={'Cache-Control': 'no-cache'})))
+        self.assertEqual(cache.misses, 0)
+
+    def test_vary(self):
+        cache = ResponseCache()
+        vary = {'Vary': 'Accept-Language'}
+        store(cache, response(headers={'Accept-Language': 'en'},
+                              responseHeaders=vary), b'en')
+        store(cache, response(headers={'Accept-Language': 'ja'},
+                              responseHeaders=vary), b'ja')
+        self.assertEqual(len(cache), 2)
+        entry = cache._lookup(request(headers={'accept-language': 'ja'}))
+        self.assertEqual(entry.body, b'ja')
+        self.assertIsNone(cache._lookup(request(headers={})))
+
+    def test_expired(self):
+        cache = ResponseCache()
+        store(cache, response(), b'code')
+        next(iter(cache._entries.values())).expires = time.time() - 1
+        self.assertIsNone(cache._lookup(request()))
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+    def test_lru(self):
+        cache = ResponseCache(maxSize=10)
+        store(cache, response('http://a/1.js'), b'1111')
+        store(cache, response('http://a/2.js'), b'2222')
+        cache._lookup(request('http://a/1.js'))
+        store(cache, response('http://a/3.js'), b'3333')
+        self.assertIsNotNone(cache._lookup(request('http://a/1.js')))
+        self.assertIsNone(cache._lookup(request('http://a/2.js')))
+        self.assertEqual(cache.size, 8)
+        store(cache, response('http://a/4.js'), b'too large body')
+        self.assertEqual(len(cache), 2)
+        cache.clear()
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as path:
+            cache = ResponseCache(path=path)
+            store(cache, response(), b'code')
+            store(cache, response(), b'code')
+            self.assertEqual(len(cache), 1)
+            self.assertEqual(sorted(p.suffix for p in Path(path).iterdir()),
+                             ['.body', '.json'])
+            self.assertIsNone(next(iter(cache._entries.values())).body)
+            cache = ResponseCache(path=path)
+            entry = cache._lookup(request())
+            params = cache._fulfillParams(entry, 'interception-1')
+            self.assertEqual(base64.b64decode(params['body']), b'code')
+            cache = ResponseCache(maxSize=2, path=path)
+            self.assertEqual(len(cache), 0)
+            self.assertEqual(len(ResponseCache(path=path)), 0)
+
+    def test_invalid_type(self):
+        with self.assertRaises(ValueError):
+            ResponseCache(resourceTypes=['Script'])
+
+
+class TestRouterCache(LoopTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = FakeSession(self.loop, {'Fetch.getResponseBody': {
+            'body': base64.b64encode(b'code').decode('ascii'),
+            'base64Encoded': True}})
+        self.router = Router(self.client)
+        self.cache = ResponseCache(resourceTypes=['script'])
+
+    def test_cache(self):
+        self.run_loop(self.router.setResponseCache(self.cache))
+        self.assertEqual(self.client.sent, [('Fetch.enable', {'patterns': [
+            {'urlPattern': '*', 'resourceType': 'Script',
+             'requestStage': 'Request'},
+            {'urlPattern': '*', 'resourceType': 'Script',
+             'requestStage': 'Response'},
+        ]})])
+        self.client.sent.clear()
+
+        self.client.emit('Fetch.requestPaused', request())
+        self.client.emit('Fetch.requestPaused', response())
+        self.run_loop()
+        self.assertEqual(self.client.methods, [
+            'Fetch.continueRequest',
+            'Fetch.getResponseBody',
+            'Fetch.continueRequest',
+        ])
+        self.client.sent.clear()
+
+        self.client.emit('Fetch.requestPaused', request())
+        self.run_loop()
+        method, params = self.client.sent[0]
+        self.assertEqual(method, 'Fetch.fulfillRequest')
+        self.assertEqual(base64.b64decode(params['body']), b'code')
+        self.assertEqual(self.cache.hits, 1)
+
+        self.run_loop(self.router.setResponseCache(None))
+        self.assertEqual(self.client.sent[-1], ('Fetch.disable', None))
+
+    def test_not_storable(self):
+        self.run_loop(self.router.setResponseCache(self.cache))
+        self.client.sent.clear()
+        self.client.emit('Fetch.requestPaused',
+                         response(cacheControl='private, max-age=60'))
+        self.run_loop()
+        self.assertEqual(self.client.methods, ['Fetch.continueRequest'])
+        self.assertEqual(len(self.cache), 0)
+
+    def test_route_first(self):
+        self.run_loop(self.router.setResponseCache(self.cache))
+        store(self.cache, response(), b'code')
+        self.run_loop(self.router.addRoute(url='*.js', action='abort'))
+        self.client.sent.clear()
+        self.client.emit('Fetch.requestPaused', request())
+        self.run_loop()
+        self.assertEqual(self.client.sent[0][0], 'Fetch.failRequest')
+        self.assertEqual(self.cache.hits, 0)
+
+
+class TestPageResponseCache(FetchTestCase):
+    @sync
+    async def test_cache(self):
+        cache = ResponseCache(resourceTypes=['stylesheet'])
+        await self.page.setResponseCache(cache)
+        await self.page.goto(self.url + 'static/cached/one-style.html')
+        self.assertEqual(len(cache), 1)
+        # Cache is shared across pages.
+        page = await self.context.newPage()
+        await page.setResponseCache(cache)
+        responses = []
+        page.on('response', responses.append)
+        await page.goto(self.url + 'static/cached/one-style.html')
+        self.assertEqual(cache.hits, 1)
+        color = await page.evaluate(
+            '() => getComputedStyle(document.body).backgroundColor')
+        self.assertEqual(color, 'rgb(255, 192, 203)')
+        self.assertTrue(all(r.ok for r in responses))
+        await page.close()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import asyncio
+import base64
+from pathlib import Path
+import re
+import tempfile
+import unittest
+
+from syncer import sync
+
+from pyppeteer.errors import BrowserError, NetworkError
+from pyppeteer.router import Route, Router, glob_to_regex
+
+from .base import FakeSession, FetchTestCase, LoopTestCase, paused
+
+
+class TestGlob(unittest.TestCase):
+    def test_glob(self):
+        regex = glob_to_regex('*.png')
+        self.assertTrue(regex.match('http://a/b.png'))
+        self.assertFalse(regex.match('http://a/b.png?x'))
+        self.assertTrue(glob_to_regex('http://?/*').match('http://a/b'))
+        self.assertFalse(glob_to_regex('http://?/*').match('http://ab/c'))
+
+    def test_escape(self):
+        self.assertTrue(glob_to_regex(r'*\?x=1').match('http://a/?x=1'))
+        self.assertFalse(glob_to_regex(r'*\?x=1').match('http://a/ax=1'))
+        self.assertTrue(glob_to_regex('*.js').match('http://a/b.js'))
+        self.assertFalse(glob_to_regex('*.js').match('http://a/bajs'))
+
+
+class TestRoute(unittest.TestCase):
+    def test_pattern(self):
+        route = Route({'url': '*.png', 'resourceType': 'image'})
+        self.assertEqual(route._pattern(), {
+            'urlPattern': '*.png', 'requestStage': 'Request',
+            'resourceType': 'Image'})
+        route = Route({'url': re.compile(r'.*\.png'), 'method': 'post'})
+        self.assertEqual(route._pattern(),
+                         {'urlPattern': '*', 'requestStage': 'Request'})
+        route = Route({'url': '*.mp4', 'action': 'stream'})
+        self.assertEqual(route._pattern(),
+                         {'urlPattern': '*.mp4', 'requestStage': 'Response'})
+
+    def test_match(self):
+        route = Route({'url': '*.png', 'resourceType': 'image',
+                       'method': 'get'})
+        self.assertTrue(route._match(paused('http://a/b.png')))
+        self.assertFalse(route._match(paused('http://a/b.jpg')))
+        self.assertFalse(route._match(paused('http://a/b.png', 'POST')))
+        self.assertFalse(route._match(
+            paused('http://a/b.png', resourceType='Script')))
+
+    def test_abort(self):
+        route = Route({'action': 'abort', 'errorCode': 'blockedbyclient'})
+        self.assertEqual(route._command(paused('http://a/')), {
+            'method': 'Fetch.failRequest',
+            'params': {'requestId': 'interception-1',
+                       'errorReason': 'BlockedByClient'}})
+
+    def test_fulfill(self):
+        route = Route({'action': 'fulfill', 'response': {
+            'status': 201, 'body': 'hi', 'contentType': 'text/plain'}})
+        command = route._command(paused('http://a/'))
+        self.assertEqual(command['method'], 'Fetch.fulfillRequest')
+        params = command['params']
+        self.assertEqual(params['responseCode'], 201)
+        self.assertEqual(base64.b64decode(params['body']), b'hi')
+        self.assertEqual(params['responseHeaders'], [
+            {'name': 'content-type', 'value': 'text/plain'},
+            {'name': 'content-length', 'value': '2'},
+        ])
+
+    def test_headers(self):
+        route = Route({'headers': {'X-Foo': 'bar', 'Referer': None}})
+        command = route._command(paused('http://a/', headers={
+            'Referer': 'http://b/', 'Accept': '*/*'}))
+        self.assertEqual(command, {
+            'method': 'Fetch.continueRequest',
+            'params': {'requestId': 'interception-1', 'headers': [
+                {'name': 'accept', 'value': '*/*'},
+                {'name': 'x-foo', 'value': 'bar'},
+            ]}})
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            Route({'action': 'block'})
+        with self.assertRaises(ValueError):
+            Route({'resourceType': 'Image'})
+        with self.assertRaises(ValueError):
+            Route({'action': 'abort', 'errorCode': 'unknown'})
+
+
+class TestRouter(LoopTestCase):
+    def test_disabled(self):
+        client = FakeSession(self.loop)
+        router = Router(client)
+        # Paused by other users of the Fetch domain.
+        client.emit('Fetch.requestPaused', paused('http://a/b.png'))
+        self.run_loop()
+        self.assertEqual(client.sent, [])
+        self.run_loop(router.addRoute(url='*.png', action='abort'))
+        client.emit('Fetch.requestPaused', paused('http://a/b.png'))
+        self.run_loop()
+        self.assertEqual(client.methods, ['Fetch.enable', 'Fetch.failRequest'])
+
+
+class TestRouterUnsupported(LoopTestCase):
+    def test_unsupported(self):
+        def enable(params):
+            raise NetworkError(
+                "Protocol error (Fetch.enable): 'Fetch.enable' wasn't found")
+
+        router = Router(FakeSession(self.loop, {'Fetch.enable': enable}))
+        with self.assertRaises(BrowserError):
+            self.run_loop(router.addRoute(url='*.png', action='abort'))
+        self.assertEqual(router.routes, [])
+
+
+class TestPageRoute(FetchTestCase):
+    @sync
+    async def test_abort(self):
+        route = await self.page.addRoute(url='*.css', action='abort')
+        failed = []
+        self.page.on('requestfailed', lambda r: failed.append(r.url))
+        await self.page.goto(self.url + 'static/one-style.html')
+        self.assertEqual(len(failed), 1)
+        self.assertTrue(failed[0].endswith('one-style.css'))
+        self.assertEqual(route.hits, 1)
+
+    @sync
+    async def test_fulfill(self):
+        await self.page.addRoute(
+            url='*/stub', action='fulfill',
+            response={'body': 'stubbed', 'contentType': 'text/plain'})
+        response = await self.page.goto(self.url + 'stub')
+        self.assertEqual(response.status, 200)
+        self.assertEqual(await response.text(), 'stubbed')
+
+    @sync
+    async def test_not_matched(self):
+        await self.page.addRoute(url='*', method='POST', action='abort')
+        response = await self.page.goto(self.url + 'empty')
+        self.assertTrue(response.ok)
+
+    @sync
+    async def test_remove(self):
+        route = await self.page.addRoute(url='*/empty', action='abort')
+        await self.page.removeRoute(route)
+        response = await self.page.goto(self.url + 'empty')
+        self.assertTrue(response.ok)
+        await self.page.addRoute(url='*/empty', action='abort')
+        await self.page.clearRoutes()
+        response = await self.page.goto(self.url + 'empty')
+        self.assertTrue(response.ok)
+
+    @sync
+    async def test_stream(self):
+        route = await self.page.addRoute(url='*.css', action='stream')
+        with tempfile.TemporaryDirectory() as d:
+            path = Path(d) / 'style.css'
+            saved = []
+
+            def save(response):
+                if response.url.endswith('.css'):
+                    saved.append(asyncio.ensure_future(response.save(path)))
+
+            self.page.on('response', save)
+            await self.page.goto(self.url + 'static/one-style.html')
+            self.assertEqual(route.hits, 1)
+            self.assertGreater(await saved[0], 0)
+            self.assertIn(b'pink', path.read_bytes())